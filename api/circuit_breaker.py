@@ -0,0 +1,123 @@
+import time
+from urllib.parse import urlsplit
+
+from utils.logger import log
+from api.exchanges import EXCHANGE_HOSTS, ENDPOINT_FAMILIES
+from utils.constants import (
+    DEFAULT_ENDPOINT_FAMILY,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_FAILURE_STATUSES,
+)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    closed — запити йдуть як звичайно, рахуються невдачі поспіль;
+    open — запити одразу падають з CircuitOpenError, без очікування таймауту;
+    half-open — після reset_timeout пропускається один пробний запит:
+    успіх закриває breaker, невдача знову відкриває з подвоєною паузою.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_TIMEOUT, max_reset_timeout=BREAKER_MAX_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.opened = 0  # скільки разів відкривався
+        self.rejected = 0  # запитів відхилено без звернення до біржі
+
+    def set_state(self, state):
+        log(f"[Info] {self.name} circuit: {self.state} -> {state}")
+        self.state = state
+
+    def allow(self):
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit open")
+            self.set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self.probing:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit half-open, probe in flight")
+            self.probing = True
+
+    def release(self):
+        # пробний запит скасовано, не дочекавшись відповіді — наступний запит стане пробою
+        self.probing = False
+
+    def success(self):
+        self.failures = 0
+        self.probing = False
+        if self.state != CLOSED:
+            self.reset_timeout = self.base_reset_timeout
+            self.set_state(CLOSED)
+
+    def failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.state == HALF_OPEN:
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            self.open()
+        elif self.state == CLOSED and self.failures >= self.failure_threshold:
+            self.open()
+
+    def open(self):
+        self.opened += 1
+        self.opened_at = time.monotonic()
+        self.set_state(OPEN)
+
+    def is_failure_status(self, status):
+        return status >= 500 or status in BREAKER_FAILURE_STATUSES
+
+
+class CircuitBreakers:
+    """Реєстр breaker'ів: ключ (exchange, family) визначається за хостом і шляхом URL."""
+
+    def __init__(self, hosts=EXCHANGE_HOSTS, families=ENDPOINT_FAMILIES):
+        self.hosts = hosts
+        self.families = families
+        self.breakers = {}
+
+    def resolve(self, url):
+        parts = urlsplit(url)
+        exchange = self.hosts.get(parts.hostname)
+        if exchange is None:
+            return None, None
+        return exchange, self.families.get(parts.path, DEFAULT_ENDPOINT_FAMILY)
+
+    def get(self, exchange, family):
+        key = (exchange, family)
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(f"{exchange} {family}")
+        return self.breakers[key]
+
+    def is_open(self, exchange, family):
+        breaker = self.breakers.get((exchange, family))
+        return breaker is not None and breaker.state != CLOSED
+
+    def degraded(self):
+        """[(exchange, family, state)] для всіх не закритих breaker'ів."""
+        return [(ex, family, b.state) for (ex, family), b in self.breakers.items() if b.state != CLOSED]
+
+    def stats(self):
+        return {
+            (ex, family): {'state': b.state, 'failures': b.failures, 'opened': b.opened, 'rejected': b.rejected}
+            for (ex, family), b in self.breakers.items()
+        }
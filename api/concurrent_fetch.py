@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+from utils.logger import log
+from utils.constants import EXCHANGE_FETCH_TIMEOUT
+
+
+async def fetch_all_exchanges(fetchers, label, timeout=EXCHANGE_FETCH_TIMEOUT):
+    """
+    Запускає запит до кожної біржі окремою задачею з власним таймаутом.
+    - fetchers: {exchange: async-функція без аргументів}
+
+    Повертає (results, timings):
+    results — {exchange: результат} тільки для бірж, які відповіли вчасно;
+    timings — {exchange: секунди}, скільки тривав запит (або до таймауту/помилки).
+    """
+    timings = {}
+
+    async def run(exchange, fetch):
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(fetch(), timeout)
+        finally:
+            timings[exchange] = time.perf_counter() - started
+
+    tasks = {ex: asyncio.create_task(run(ex, fetch)) for ex, fetch in fetchers.items()}
+    try:
+        await asyncio.wait(tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+    results = {}
+    for ex, task in tasks.items():
+        if task.cancelled():
+            continue
+        error = task.exception()
+        if error is None:
+            results[ex] = task.result()
+        elif isinstance(error, asyncio.TimeoutError):
+            log(f"[Error] {ex} {label}: no response within {timeout}s, continuing without it")
+        else:
+            log(f"[Error] {ex} {label}: {error}")
+
+    summary = ", ".join(f"{ex} {timings.get(ex, 0):.2f}s" for ex in fetchers)
+    log(f"[Info] {label} timings: {summary}")
+    return results, timings
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from functools import partial
+
+from utils.constants import DEPTH_CACHE_TTL, DEPTH_CACHE_MAX_ENTRIES
+
+
+class DepthCache:
+    """
+    Короткоживучий кеш orderbook за ключем (exchange, symbol).
+    Одночасні запити на один ключ чекають один і той самий запит в польоті.
+    """
+
+    def __init__(self, ttl=DEPTH_CACHE_TTL, max_entries=DEPTH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = {}  # (exchange, symbol) -> (monotonic time, value)
+        self.in_flight = {}  # (exchange, symbol) -> asyncio.Task
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, exchange, symbol, fetch):
+        """
+        Повертає значення з кешу, якщо воно молодше за TTL, інакше викликає fetch().
+        fetch — async-функція без аргументів.
+        """
+        key = (exchange, symbol)
+        entry = self.entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            self.hits += 1
+            return entry[1]
+
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(fetch())
+            self.in_flight[key] = task
+            task.add_done_callback(partial(self._store, key))
+        # shield: скасування одного з очікувачів не скасовує спільний запит
+        return await asyncio.shield(task)
+
+    def _store(self, key, task):
+        self.in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        value = task.result()
+        # None — невдалий запит (fetch_order_book_price так повідомляє про помилку):
+        # не кешуємо, щоб наступний маршрут мав власну спробу
+        if value is None:
+            return
+        # pop перед вставкою: порядок dict лишається порядком часу запису, найстаріші — першими
+        self.entries.pop(key, None)
+        if len(self.entries) >= self.max_entries:
+            self.purge()
+        self.entries[key] = (time.monotonic(), value)
+
+    def purge(self):
+        """Видаляє прострочені записи; якщо свіжих усе ще забагато — найстаріші понад max_entries."""
+        now = time.monotonic()
+        expired = [key for key, (stamp, _) in self.entries.items() if now - stamp >= self.ttl]
+        for key in expired:
+            del self.entries[key]
+        excess = len(self.entries) - self.max_entries + 1
+        if excess > 0:
+            for key in list(self.entries)[:excess]:
+                del self.entries[key]
+
+    def stats(self):
+        requests = self.hits + self.misses + self.coalesced
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_rate': (self.hits + self.coalesced) / requests if requests else 0.0,
+        }
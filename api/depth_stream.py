@@ -0,0 +1,393 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+import aiohttp
+
+from utils.logger import log
+from utils.local_book import LocalBook
+from utils.symbols import registry, normalize_symbol
+from utils.constants import (
+    PRIORITY_VERIFY,
+    WS_RECONNECT_DELAY,
+    WS_MAX_RECONNECT_DELAY,
+    LOCAL_BOOK_SNAPSHOT_LEVELS,
+    LOCAL_BOOK_MAX_AGE,
+    LOCAL_BOOK_BUFFER,
+    LOCAL_BOOK_RESYNC_DELAY,
+)
+from api.quote_stream import BinanceQuoteStream, KucoinQuoteStream, MexcQuoteStream, chunks
+
+
+# Diff-depth стріми: ті самі з'єднання й ping, що в quote_stream, інші підписки й формат.
+# parse() віддає (symbol, first_sequence, last_sequence, bids, asks);
+# parse_snapshot() — (sequence, bids, asks) з REST-знімка snapshot_url().
+
+class BinanceDepthStream(BinanceQuoteStream):
+    def subscribe_messages(self, symbols):
+        for i, part in enumerate(chunks(symbols, self.max_symbols_per_message), start=1):
+            yield {
+                'method': 'SUBSCRIBE',
+                'params': [f"{s.lower()}@depth@100ms" for s in part],
+                'id': i,
+            }
+
+    def unsubscribe_messages(self, symbols):
+        for i, part in enumerate(chunks(symbols, self.max_symbols_per_message), start=1):
+            yield {
+                'method': 'UNSUBSCRIBE',
+                'params': [f"{s.lower()}@depth@100ms" for s in part],
+                'id': i,
+            }
+
+    def parse(self, msg):
+        data = msg.get('data', msg)
+        if data.get('e') == 'depthUpdate':
+            yield data['s'], data['U'], data['u'], data['b'], data['a']
+
+    def snapshot_url(self, symbol):
+        return f"https://api.binance.com/api/v3/depth?symbol={symbol}&limit={LOCAL_BOOK_SNAPSHOT_LEVELS}"
+
+    def parse_snapshot(self, data):
+        return data['lastUpdateId'], data['bids'], data['asks']
+
+
+class KucoinDepthStream(KucoinQuoteStream):
+    max_symbols_per_connection = 300  # KuCoin — до 400 топіків на з'єднання
+    max_symbols_per_message = 100
+
+    def subscribe_messages(self, symbols):
+        for part in chunks(symbols, self.max_symbols_per_message):
+            yield {
+                'id': f"level2-{part[0]}",
+                'type': 'subscribe',
+                'topic': '/market/level2:' + ','.join(registry.native('KUCOIN', s) for s in part),
+                'response': True,
+            }
+
+    def unsubscribe_messages(self, symbols):
+        for part in chunks(symbols, self.max_symbols_per_message):
+            yield {
+                'id': f"level2-unsub-{part[0]}",
+                'type': 'unsubscribe',
+                'topic': '/market/level2:' + ','.join(registry.native('KUCOIN', s) for s in part),
+                'response': True,
+            }
+
+    def parse(self, msg):
+        if msg.get('type') != 'message' or msg.get('subject') != 'trade.l2update':
+            return
+        data = msg['data']
+        changes = data['changes']
+        yield (normalize_symbol('KUCOIN', data['symbol']), int(data['sequenceStart']), int(data['sequenceEnd']),
+               changes.get('bids', ()), changes.get('asks', ()))
+
+    def snapshot_url(self, symbol):
+        native = registry.native('KUCOIN', symbol)
+        return f"https://api.kucoin.com/api/v1/market/orderbook/level2_100?symbol={native}"
+
+    def parse_snapshot(self, data):
+        data = data['data']
+        return int(data['sequence']), data['bids'], data['asks']
+
+
+class MexcDepthStream(MexcQuoteStream):
+    def subscribe_messages(self, symbols):
+        yield {
+            'method': 'SUBSCRIPTION',
+            'params': [f"spot@public.increase.depth.v3.api@{s}" for s in symbols],
+        }
+
+    def unsubscribe_messages(self, symbols):
+        yield {
+            'method': 'UNSUBSCRIPTION',
+            'params': [f"spot@public.increase.depth.v3.api@{s}" for s in symbols],
+        }
+
+    def parse(self, msg):
+        data = msg.get('d')
+        if data and 'r' in data and 's' in msg:
+            version = int(data['r'])
+            bids = [(level['p'], level['v']) for level in data.get('bids', ())]
+            asks = [(level['p'], level['v']) for level in data.get('asks', ())]
+            yield msg['s'], version, version, bids, asks
+
+    def snapshot_url(self, symbol):
+        return f"https://api.mexc.com/api/v3/depth?symbol={symbol}&limit={LOCAL_BOOK_SNAPSHOT_LEVELS}"
+
+    def parse_snapshot(self, data):
+        return int(data['lastUpdateId']), data['bids'], data['asks']
+
+
+DEPTH_STREAMS = {
+    'BINANCE': BinanceDepthStream,
+    'KUCOIN': KucoinDepthStream,
+    'MEXC': MexcDepthStream,
+}
+
+
+class DepthShard:
+    """Одне WebSocket-з'єднання: його символи, задача і поточний ws (None між перепідключеннями)."""
+
+    def __init__(self, symbols):
+        self.symbols = set(symbols)
+        self.ws = None
+        self.task = None
+
+
+class OrderBookEngine:
+    """
+    Локальні стакани для «гарячих» символів: один REST-знімок на символ, далі diff-оновлення зі стріму.
+    Поки знімок в дорозі, оновлення буферизуються; після знімка застосовуються ті, що новіші за нього.
+    Розрив у нумерації (first > sequence + 1) або перепідключення — повторна синхронізація зі свіжим знімком.
+    depth() віддає DepthBook з пам'яті або None, якщо стакан не синхронізований чи біржа мовчить.
+    """
+
+    def __init__(self, http, streams=None, record_path=None, max_age=LOCAL_BOOK_MAX_AGE,
+                 reconnect_delay=WS_RECONNECT_DELAY):
+        self.http = http
+        self.reconnect_delay = reconnect_delay
+        streams = streams if streams is not None else [cls() for cls in DEPTH_STREAMS.values()]
+        self.streams = {stream.exchange: stream for stream in streams}
+        self.max_age = max_age
+        self.books = {}  # (exchange, symbol) -> LocalBook
+        self.pending = {}  # (exchange, symbol) -> deque оновлень, що чекають знімка
+        self.snapshots = {}  # (exchange, symbol) -> asyncio.Task
+        self.last_message = {exchange: 0.0 for exchange in self.streams}
+        self.record_path = record_path
+        self.record_file = None
+        self.shards = {exchange: [] for exchange in self.streams}
+        self.control = set()  # задачі, що шлють (від)підписки в уже відкриті з'єднання
+        self.updates = 0
+        self.gaps = 0
+        self.resyncs = 0
+        self.snapshot_failures = 0
+
+    def watch(self, symbols_by_exchange, connect=True):
+        """
+        Звіряє стежені символи з поточним гарячим набором: нові отримують стакан і підписку,
+        символи, що вийшли з набору, — відписку і видалення стакану.
+        Нові символи спершу дописуються у вже відкриті з'єднання (шарди) до їхнього ліміту,
+        і лише надлишок відкриває нові; шард без символів закривається.
+        connect=False — лише стакани, повідомлення подаються через handle_message (replay з файлу).
+        """
+        if self.record_path and self.record_file is None:
+            self.record_file = open(self.record_path, 'a', encoding='utf-8')
+        for exchange, stream in self.streams.items():
+            wanted = set(symbols_by_exchange.get(exchange, ()))
+            current = {symbol for ex, symbol in self.books if ex == exchange}
+            new = sorted(wanted - current)
+            gone = current - wanted
+            if not new and not gone:
+                continue
+            for symbol in gone:
+                self.drop(exchange, symbol)
+            for symbol in new:
+                self.books[(exchange, symbol)] = LocalBook()
+            if connect:
+                self.reshard(stream, new, gone)
+            log(f"[Info] {exchange} local order books: +{len(new)} -{len(gone)} symbols "
+                f"({len(current) - len(gone) + len(new)} total, {len(self.shards[exchange])} connections)")
+
+    def drop(self, exchange, symbol):
+        key = (exchange, symbol)
+        del self.books[key]
+        self.pending.pop(key, None)
+        task = self.snapshots.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def reshard(self, stream, new, gone):
+        shards = self.shards[stream.exchange]
+        for shard in shards:
+            removed = sorted(shard.symbols & gone)
+            if removed:
+                shard.symbols -= gone
+                self.send(shard, stream.unsubscribe_messages(removed))
+
+        # Звільнене місце в уже відкритих з'єднаннях заповнюється першим
+        size = stream.max_symbols_per_connection
+        for shard in shards:
+            if not new:
+                break
+            room = len(new) if size is None else size - len(shard.symbols)
+            if room <= 0:
+                continue
+            added, new = new[:room], new[room:]
+            shard.symbols.update(added)
+            self.send(shard, stream.subscribe_messages(added))
+        for shard in [shard for shard in shards if not shard.symbols]:
+            shard.task.cancel()
+            shards.remove(shard)
+        for part in chunks(new, size or len(new) or 1):
+            shard = DepthShard(part)
+            shard.task = asyncio.create_task(self.run_connection(stream, shard))
+            shards.append(shard)
+
+    def send(self, shard, messages):
+        """(Від)підписка у відкрите з'єднання; без з'єднання її підхопить наступне підключення шарду."""
+        if shard.ws is None or shard.ws.closed:
+            return
+        task = asyncio.create_task(self.send_messages(shard.ws, list(messages)))
+        self.control.add(task)
+        task.add_done_callback(self.control.discard)
+
+    @staticmethod
+    async def send_messages(ws, messages):
+        try:
+            for message in messages:
+                await ws.send_json(message)
+        except Exception as e:
+            # З'єднання закрилось посеред відправки — run_connection перепідключиться з актуальним набором
+            log(f"[Error] depth stream subscription update: {e}")
+
+    async def stop(self):
+        tasks = [shard.task for shards in self.shards.values() for shard in shards]
+        tasks += list(self.control) + list(self.snapshots.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.shards = {exchange: [] for exchange in self.streams}
+        self.control = set()
+        self.snapshots = {}
+        if self.record_file:
+            self.record_file.close()
+            self.record_file = None
+
+    def depth(self, exchange, symbol):
+        book = self.books.get((exchange, symbol))
+        if book is None or not book.synced:
+            return None
+        if time.time() - self.last_message.get(exchange, 0.0) > self.max_age:
+            return None
+        return book.depth_book()
+
+    def stats(self):
+        synced = sum(1 for book in self.books.values() if book.synced)
+        return {'books': len(self.books), 'synced': synced, 'updates': self.updates,
+                'gaps': self.gaps, 'resyncs': self.resyncs, 'snapshot_failures': self.snapshot_failures}
+
+    async def run_connection(self, stream, shard):
+        delay = self.reconnect_delay
+        while True:
+            connection = {'messages': 0}
+            try:
+                url = await stream.connect_url(self.http)
+                async with self.http.session.ws_connect(url, heartbeat=30) as ws:
+                    # Набір береться в момент публікації ws: пізніші зміни з watch() підуть через send()
+                    symbols = sorted(shard.symbols)
+                    shard.ws = ws
+                    for message in stream.subscribe_messages(symbols):
+                        await ws.send_json(message)
+                    await self.consume(stream, ws, connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log(f"[Error] {stream.exchange} depth stream: {e}")
+            finally:
+                shard.ws = None
+            # Як у QuoteEngine: backoff скидається лише після з'єднання, що віддало хоч один кадр
+            if connection['messages']:
+                delay = self.reconnect_delay
+            # Пропущені за час обриву оновлення не відновити — стакани шарду синхронізуються заново
+            for symbol in shard.symbols:
+                self.resync(stream.exchange, symbol)
+            log(f"[Info] {stream.exchange} depth stream reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WS_MAX_RECONNECT_DELAY)
+
+    async def consume(self, stream, ws, connection):
+        ping_at = time.monotonic() + stream.ping_interval if stream.ping_interval else None
+        while True:
+            timeout = max(ping_at - time.monotonic(), 0) if ping_at else None
+            try:
+                msg = await ws.receive(timeout=timeout)
+            except asyncio.TimeoutError:
+                await ws.send_json(stream.ping_message())
+                ping_at = time.monotonic() + stream.ping_interval
+                continue
+
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    return
+                continue
+            connection['messages'] += 1
+            if self.record_file:
+                self.record_file.write(msg.data + '\n')
+            self.handle_message(stream, json.loads(msg.data))
+
+    def handle_message(self, stream, msg):
+        exchange = stream.exchange
+        self.last_message[exchange] = time.time()
+        for symbol, first, last, bids, asks in stream.parse(msg):
+            self.on_update(exchange, symbol, first, last, bids, asks)
+
+    def on_update(self, exchange, symbol, first, last, bids, asks):
+        key = (exchange, symbol)
+        book = self.books.get(key)
+        if book is None:
+            return
+        self.updates += 1
+        if book.synced:
+            self.apply(key, book, first, last, bids, asks)
+            return
+        pending = self.pending.get(key)
+        if pending is None:
+            pending = self.pending[key] = deque(maxlen=LOCAL_BOOK_BUFFER)
+        pending.append((first, last, bids, asks))
+        self.request_snapshot(exchange, symbol)
+
+    def apply(self, key, book, first, last, bids, asks):
+        """False — знайдено розрив і запущено повторну синхронізацію."""
+        if last <= book.sequence:
+            return True  # уже враховано знімком
+        if first > book.sequence + 1:
+            self.gaps += 1
+            log(f"[Info] {key[0]} {key[1]} depth gap: expected {book.sequence + 1}, got {first}; resyncing")
+            self.resync(*key)
+            return False
+        book.apply(bids, asks)
+        book.sequence = last
+        return True
+
+    def resync(self, exchange, symbol):
+        key = (exchange, symbol)
+        book = self.books.get(key)
+        if book is None:
+            return
+        if book.synced:
+            self.resyncs += 1
+        book.synced = False
+        self.pending.pop(key, None)
+
+    def request_snapshot(self, exchange, symbol):
+        key = (exchange, symbol)
+        if key in self.snapshots or time.monotonic() < self.books[key].retry_at:
+            return
+        self.snapshots[key] = asyncio.create_task(self.load_snapshot(exchange, symbol))
+
+    async def load_snapshot(self, exchange, symbol):
+        key = (exchange, symbol)
+        book = self.books[key]
+        stream = self.streams[exchange]
+        try:
+            data = await self.http.get_json(stream.snapshot_url(symbol), priority=PRIORITY_VERIFY)
+            sequence, bids, asks = stream.parse_snapshot(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.snapshot_failures += 1
+            book.retry_at = time.monotonic() + LOCAL_BOOK_RESYNC_DELAY
+            log(f"[Error] {exchange} {symbol} depth snapshot: {e}")
+            return
+        finally:
+            self.snapshots.pop(key, None)
+
+        book.load_snapshot(sequence, bids, asks)
+        book.synced = True
+        # Буфер застосовується по порядку; старіші за знімок оновлення пропускаються в apply()
+        pending = self.pending.pop(key, ())
+        for first, last, pending_bids, pending_asks in pending:
+            if not self.apply(key, book, first, last, pending_bids, pending_asks):
+                return
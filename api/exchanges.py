@@ -0,0 +1,470 @@
+"""
+Адаптери бірж: усе, що залежить від конкретного REST API — URL, формат відповідей,
+ліміти й ваги endpoint'ів — зібрано в одному класі на біржу й зареєстровано за назвою.
+spot_api, futures_api, market_snapshot, orderbook_api, volume_api і quick_price працюють
+лише через інтерфейс ExchangeAdapter, тож нова біржа — це новий клас тут і рядок у EXCHANGES.
+"""
+import asyncio
+from functools import partial
+
+from utils.symbols import registry, normalize_symbol
+from utils.depth_book import DepthBook
+from utils.constants import PRIORITY_VERIFY, PRIORITY_METADATA, DEPTH_LEVELS
+
+# Рядок тікера: [bid, ask, last, volume] — один список на символ, далі пишеться в QuoteBoard
+BID, ASK, LAST, VOLUME = range(4)
+
+
+def symbol_of(exchange, names, native):
+    return names.get(native) or normalize_symbol(exchange, native)
+
+
+# Парсери — чисті функції рівня модуля: names і tracked передаються явно,
+# тому їх можна виконувати в пулі потоків чи процесів (див. utils.json_decode).
+# tracked — множина канонічних символів, які нас цікавлять; None — усі.
+# Символи поза tracked відкидаються ще до float(), щоб не будувати зайвих рядків.
+
+def parse_book_ticker(exchange, names, tracked, data):
+    rows = {}
+    for item in data:
+        sym = symbol_of(exchange, names, item['symbol'])
+        if tracked is not None and sym not in tracked:
+            continue
+        rows[sym] = [float(item['bidPrice'] or 0), float(item['askPrice'] or 0), 0.0, 0.0]
+    return rows
+
+
+def parse_price_ticker(exchange, names, tracked, data):
+    prices = {}
+    for item in data:
+        sym = symbol_of(exchange, names, item['symbol'])
+        if tracked is not None and sym not in tracked:
+            continue
+        prices[sym] = float(item['price'] or 0)
+    return prices
+
+
+def merge_book_and_price(rows, prices):
+    for sym, price in prices.items():
+        row = rows.setdefault(sym, [0.0, 0.0, 0.0, 0.0])
+        row[LAST] = price
+    return rows
+
+
+def parse_24hr(exchange, names, tracked, data):
+    rows = {}
+    for item in data:
+        sym = symbol_of(exchange, names, item['symbol'])
+        if tracked is not None and sym not in tracked:
+            continue
+        rows[sym] = [
+            float(item.get('bidPrice') or 0),
+            float(item.get('askPrice') or 0),
+            float(item.get('lastPrice') or 0),
+            float(item.get('volume') or 0),
+        ]
+    return rows
+
+
+def parse_24hr_quote_volume(exchange, names, tracked, data):
+    # Обсяг у котирувальній валюті за середньозваженою ціною доби; без неї — за lastPrice
+    volumes = {}
+    for item in data:
+        sym = symbol_of(exchange, names, item['symbol'])
+        if tracked is not None and sym not in tracked:
+            continue
+        price = float(item.get('weightedAvgPrice') or item.get('lastPrice') or 0)
+        volumes[sym] = price * float(item.get('volume') or 0)
+    return volumes
+
+
+def parse_kucoin_all_tickers(names, tracked, data):
+    rows = {}
+    for t in data['data']['ticker']:
+        sym = symbol_of('KUCOIN', names, t['symbol'])
+        if tracked is not None and sym not in tracked:
+            continue
+        rows[sym] = [
+            float(t.get('buy') or 0),
+            float(t.get('sell') or 0),
+            float(t.get('last') or 0),
+            float(t.get('vol') or 0),
+        ]
+    return rows
+
+
+def okx_data(payload):
+    """data з відповіді OKX API v5; помилки приходять з HTTP 200 і ненульовим code."""
+    if payload.get('code') != '0':
+        raise ValueError(f"OKX error {payload.get('code')}: {payload.get('msg')}")
+    return payload['data']
+
+
+def parse_okx_tickers(names, tracked, data):
+    # /market/tickers?instType=SPOT: усі пари одним запитом; vol24h — у базовій валюті
+    rows = {}
+    for t in okx_data(data):
+        sym = symbol_of('OKX', names, t['instId'])
+        if tracked is not None and sym not in tracked:
+            continue
+        rows[sym] = [
+            float(t.get('bidPx') or 0),
+            float(t.get('askPx') or 0),
+            float(t.get('last') or 0),
+            float(t.get('vol24h') or 0),
+        ]
+    return rows
+
+
+class ExchangeAdapter:
+    """
+    Інтерфейс біржі. Підклас задає name, декларації нижче і реалізує
+    spot_symbols, futures_contracts, tickers_24hr та depth_url.
+
+    Методи тікерів повертають (результат, секунд на розбір), як HttpClient.get_parsed;
+    рядки тікерів — {symbol: [bid, ask, last, volume]} з канонічними символами.
+    """
+
+    name = None
+    # Ліміти на IP по хостах REST API: {host: (вага, вікно в секундах)}
+    rate_limits = {}
+    # Вага endpoint'ів (шлях без параметрів): {host: {path: вага}}; решта — DEFAULT_ENDPOINT_WEIGHT
+    weights = {}
+    # Сімейство endpoint'а для circuit breaker: {path: 'metadata' | 'futures' | 'tickers' | 'depth'}
+    families = {}
+    warmup_urls = ()
+    # Пакетні можливості: які дані біржа віддає одним запитом на всі символи.
+    # Без окремого bookTicker чи ticker/price усе береться з масового 24h-тікера.
+    bulk_book_ticker = False
+    bulk_last_price = False
+    has_futures = True
+    depth_levels = DEPTH_LEVELS
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+    async def spot_symbols(self, http, symbols=registry):
+        """Канонічні імена spot-пар, що торгуються; кожна реєструється в symbols."""
+        raise NotImplementedError
+
+    async def futures_contracts(self, http, symbols=registry):
+        """Множина канонічних імен безстрокових ф'ючерсів (market='futures')."""
+        raise NotImplementedError
+
+    async def tickers_24hr(self, http, tracked=None):
+        """Масовий тікер з bid/ask/last/volume."""
+        raise NotImplementedError
+
+    async def book_tickers(self, http, tracked=None):
+        return await self.tickers_24hr(http, tracked)
+
+    async def quote_volumes(self, http, tracked=None):
+        """{symbol: обсяг за 24h у котирувальній валюті}: last × volume з 24h-тікера."""
+        rows, seconds = await self.tickers_24hr(http, tracked)
+        return {sym: row[LAST] * row[VOLUME] for sym, row in rows.items()}, seconds
+
+    async def last_prices(self, http, tracked=None):
+        rows, seconds = await self.tickers_24hr(http, tracked)
+        return {sym: row[LAST] for sym, row in rows.items()}, seconds
+
+    async def tickers(self, http, with_volume=False, tracked=None, with_last=True):
+        """
+        Рядки тікерів найдешевшим для біржі набором запитів.
+        with_volume — потрібні обсяги; with_last=False — досить bid/ask.
+        """
+        # 24hr несе все разом, але там, де є bookTicker + ticker/price, він важчий за обидва;
+        # тому беремо його лише коли в цьому циклі потрібні обсяги
+        if with_volume or not self.bulk_book_ticker:
+            return await self.tickers_24hr(http, tracked)
+        if not with_last:
+            return await self.book_tickers(http, tracked)
+        if not self.bulk_last_price:
+            return await self.tickers_24hr(http, tracked)
+        (rows, book_time), (prices, price_time) = await asyncio.gather(
+            self.book_tickers(http, tracked),
+            self.last_prices(http, tracked),
+        )
+        return merge_book_and_price(rows, prices), book_time + price_time
+
+    def depth_url(self, pair):
+        raise NotImplementedError
+
+    def parse_depth(self, data):
+        return DepthBook.from_levels(data['bids'], data['asks'])
+
+    async def depth(self, http, pair):
+        """
+        Один запит стакану: DepthBook з depth_levels рівнями з кожного боку.
+        Помилки не перехоплюються — ними керує RequestPolicy.
+        """
+        data = await http.get_json(self.depth_url(pair), priority=PRIORITY_VERIFY)
+        return self.parse_depth(data)
+
+
+# Реєстр адаптерів і зведені з їхніх декларацій таблиці для RateLimiter, CircuitBreakers,
+# метрик і прогріву з'єднань. Таблиці доповнюються на місці при кожній реєстрації.
+ADAPTERS = {}
+RATE_LIMITS = {}
+ENDPOINT_WEIGHTS = {}
+EXCHANGE_HOSTS = {}
+ENDPOINT_FAMILIES = {}
+WARMUP_URLS = []
+
+
+def register_adapter(cls):
+    """Декоратор класу: створює адаптер і додає його декларації до спільних таблиць."""
+    adapter = cls()
+    ADAPTERS[adapter.name] = adapter
+    RATE_LIMITS.update(adapter.rate_limits)
+    for host in adapter.rate_limits:
+        EXCHANGE_HOSTS[host] = adapter.name
+    for host, weights in adapter.weights.items():
+        EXCHANGE_HOSTS[host] = adapter.name
+        ENDPOINT_WEIGHTS.setdefault(host, {}).update(weights)
+    ENDPOINT_FAMILIES.update(adapter.families)
+    WARMUP_URLS.extend(url for url in adapter.warmup_urls if url not in WARMUP_URLS)
+    return cls
+
+
+def get_adapter(exchange):
+    """Адаптер за назвою біржі; None, якщо такої не зареєстровано."""
+    return ADAPTERS.get(exchange)
+
+
+def adapters_for(exchanges):
+    """{exchange: adapter} у порядку exchanges; біржі без адаптера пропускаються."""
+    return {exchange: ADAPTERS[exchange] for exchange in exchanges if exchange in ADAPTERS}
+
+
+class SpotV3Adapter(ExchangeAdapter):
+    """Біржі з Binance-сумісним spot API v3: /exchangeInfo, /ticker/bookTicker, /ticker/price, /ticker/24hr, /depth."""
+
+    api_url = None
+    bulk_book_ticker = True
+    bulk_last_price = True
+
+    def is_trading(self, info):
+        return info['status'] == 'TRADING'
+
+    async def spot_symbols(self, http, symbols=registry):
+        data = await http.get_json(f"{self.api_url}/exchangeInfo", priority=PRIORITY_METADATA)
+        return [symbols.register(self.name, s['symbol'], s['baseAsset'], s['quoteAsset'])
+                for s in data['symbols'] if self.is_trading(s)]
+
+    async def ticker(self, http, endpoint, parser, tracked):
+        names = registry.canonical_map(self.name)
+        return await http.get_parsed(f"{self.api_url}/ticker/{endpoint}", partial(parser, self.name, names, tracked))
+
+    async def book_tickers(self, http, tracked=None):
+        return await self.ticker(http, 'bookTicker', parse_book_ticker, tracked)
+
+    async def last_prices(self, http, tracked=None):
+        return await self.ticker(http, 'price', parse_price_ticker, tracked)
+
+    async def tickers_24hr(self, http, tracked=None):
+        return await self.ticker(http, '24hr', parse_24hr, tracked)
+
+    async def quote_volumes(self, http, tracked=None):
+        return await self.ticker(http, '24hr', parse_24hr_quote_volume, tracked)
+
+    def depth_url(self, pair):
+        return f"{self.api_url}/depth?symbol={registry.native(self.name, pair)}&limit={self.depth_levels}"
+
+
+@register_adapter
+class BinanceAdapter(SpotV3Adapter):
+    name = 'BINANCE'
+    api_url = 'https://api.binance.com/api/v3'
+    rate_limits = {
+        'api.binance.com': (6000, 60),
+        'fapi.binance.com': (2400, 60),
+    }
+    weights = {
+        'api.binance.com': {
+            '/api/v3/exchangeInfo': 20,
+            '/api/v3/depth': 5,  # однакова для limit 1..100
+            '/api/v3/ticker/bookTicker': 4,
+            '/api/v3/ticker/price': 4,
+            '/api/v3/ticker/24hr': 80,
+        },
+        'fapi.binance.com': {
+            '/fapi/v1/exchangeInfo': 1,
+        },
+    }
+    families = {
+        '/api/v3/exchangeInfo': 'metadata',
+        '/fapi/v1/exchangeInfo': 'futures',
+        '/api/v3/ticker/bookTicker': 'tickers',
+        '/api/v3/ticker/price': 'tickers',
+        '/api/v3/ticker/24hr': 'tickers',
+        '/api/v3/depth': 'depth',
+    }
+    warmup_urls = (
+        'https://api.binance.com/api/v3/ping',
+        'https://fapi.binance.com/fapi/v1/ping',
+    )
+
+    async def futures_contracts(self, http, symbols=registry):
+        data = await http.get_json('https://fapi.binance.com/fapi/v1/exchangeInfo', priority=PRIORITY_METADATA)
+        return {
+            symbols.register(self.name, s['symbol'], s['baseAsset'], s['quoteAsset'], market='futures')
+            for s in data['symbols']
+            if s['contractType'] == 'PERPETUAL' and s['status'] == 'TRADING'
+        }
+
+
+@register_adapter
+class KucoinAdapter(ExchangeAdapter):
+    name = 'KUCOIN'
+    rate_limits = {
+        'api.kucoin.com': (2000, 30),
+        'api-futures.kucoin.com': (2000, 30),
+    }
+    weights = {
+        'api.kucoin.com': {
+            '/api/v1/symbols': 4,
+            '/api/v1/market/allTickers': 15,
+            '/api/v1/market/orderbook/level2_20': 2,
+            '/api/v1/market/orderbook/level2_100': 4,
+        },
+        'api-futures.kucoin.com': {
+            '/api/v1/contracts/active': 3,
+        },
+    }
+    families = {
+        '/api/v1/symbols': 'metadata',
+        '/api/v1/contracts/active': 'futures',
+        '/api/v1/market/allTickers': 'tickers',
+        '/api/v1/market/orderbook/level2_20': 'depth',
+        '/api/v1/market/orderbook/level2_100': 'depth',
+    }
+    warmup_urls = (
+        'https://api.kucoin.com/api/v1/timestamp',
+        'https://api-futures.kucoin.com/api/v1/timestamp',
+    )
+
+    async def spot_symbols(self, http, symbols=registry):
+        data = await http.get_json('https://api.kucoin.com/api/v1/symbols', priority=PRIORITY_METADATA)
+        return [symbols.register(self.name, s['symbol'], s['baseCurrency'], s['quoteCurrency'])
+                for s in data['data'] if s['enableTrading']]
+
+    async def futures_contracts(self, http, symbols=registry):
+        data = await http.get_json('https://api-futures.kucoin.com/api/v1/contracts/active', priority=PRIORITY_METADATA)
+        return {
+            symbols.register(self.name, p['symbol'], p['baseCurrency'], p['quoteCurrency'], market='futures')
+            for p in data['data']
+        }
+
+    async def tickers_24hr(self, http, tracked=None):
+        # allTickers уже містить усе: buy, sell, last і vol
+        names = registry.canonical_map(self.name)
+        return await http.get_parsed(
+            'https://api.kucoin.com/api/v1/market/allTickers',
+            partial(parse_kucoin_all_tickers, names, tracked),
+        )
+
+    def depth_url(self, pair):
+        # level2_20 — фіксовані 20 рівнів (DEPTH_LEVELS)
+        return f"https://api.kucoin.com/api/v1/market/orderbook/level2_20?symbol={registry.native(self.name, pair)}"
+
+    def parse_depth(self, data):
+        return DepthBook.from_levels(data['data']['bids'], data['data']['asks'])
+
+
+@register_adapter
+class MexcAdapter(SpotV3Adapter):
+    name = 'MEXC'
+    api_url = 'https://api.mexc.com/api/v3'
+    rate_limits = {
+        'api.mexc.com': (500, 10),
+        'contract.mexc.com': (20, 2),
+    }
+    weights = {
+        'api.mexc.com': {
+            '/api/v3/exchangeInfo': 10,
+            '/api/v3/depth': 1,
+            '/api/v3/ticker/bookTicker': 1,
+            '/api/v3/ticker/price': 2,
+            '/api/v3/ticker/24hr': 40,
+        },
+    }
+    families = {
+        '/api/v3/exchangeInfo': 'metadata',
+        '/api/v1/contract/detail': 'futures',
+        '/api/v3/ticker/bookTicker': 'tickers',
+        '/api/v3/ticker/price': 'tickers',
+        '/api/v3/ticker/24hr': 'tickers',
+        '/api/v3/depth': 'depth',
+    }
+    warmup_urls = (
+        'https://api.mexc.com/api/v3/ping',
+        'https://contract.mexc.com/api/v1/contract/ping',
+    )
+
+    def is_trading(self, info):
+        # статус MEXC не фільтрується: у списку всі символи exchangeInfo
+        return True
+
+    async def futures_contracts(self, http, symbols=registry):
+        data = await http.get_json('https://contract.mexc.com/api/v1/contract/detail', priority=PRIORITY_METADATA)
+        return {
+            symbols.register(self.name, p['symbol'], p['baseCoin'], p['quoteCoin'], market='futures')
+            for p in data['data']
+        }
+
+
+@register_adapter
+class OkxAdapter(ExchangeAdapter):
+    name = 'OKX'
+    api_url = 'https://www.okx.com/api/v5'
+    # Публічні endpoint'и OKX мають ліміт на кожен окремо (books 40, tickers і instruments 20 запитів за 2 с);
+    # один bucket на хост з вагами відтворює це співвідношення
+    rate_limits = {
+        'www.okx.com': (40, 2),
+    }
+    weights = {
+        'www.okx.com': {
+            '/api/v5/public/instruments': 2,
+            '/api/v5/market/tickers': 2,
+            '/api/v5/market/books': 1,
+        },
+    }
+    families = {
+        '/api/v5/public/instruments': 'metadata',
+        '/api/v5/market/tickers': 'tickers',
+        '/api/v5/market/books': 'depth',
+    }
+    warmup_urls = (
+        'https://www.okx.com/api/v5/public/time',
+    )
+
+    async def instruments(self, http, inst_type):
+        data = await http.get_json(f"{self.api_url}/public/instruments?instType={inst_type}", priority=PRIORITY_METADATA)
+        return [inst for inst in okx_data(data) if inst['state'] == 'live']
+
+    async def spot_symbols(self, http, symbols=registry):
+        return [symbols.register(self.name, inst['instId'], inst['baseCcy'], inst['quoteCcy'])
+                for inst in await self.instruments(http, 'SPOT')]
+
+    async def futures_contracts(self, http, symbols=registry):
+        # лише лінійні безстрокові (BTC-USDT-SWAP), як USDT-M на Binance; інверсні (BTC-USD-SWAP) пропускаються
+        return {
+            symbols.register(self.name, inst['instId'], inst['ctValCcy'], inst['settleCcy'], market='futures')
+            for inst in await self.instruments(http, 'SWAP')
+            if inst['ctType'] == 'linear'
+        }
+
+    async def tickers_24hr(self, http, tracked=None):
+        # bid/ask, last і обсяг усіх spot-пар — один запит на цикл
+        names = registry.canonical_map(self.name)
+        return await http.get_parsed(
+            f"{self.api_url}/market/tickers?instType=SPOT",
+            partial(parse_okx_tickers, names, tracked),
+        )
+
+    def depth_url(self, pair):
+        return f"{self.api_url}/market/books?instId={registry.native(self.name, pair)}&sz={self.depth_levels}"
+
+    def parse_depth(self, data):
+        book = okx_data(data)[0]
+        return DepthBook.from_levels(book['bids'], book['asks'])
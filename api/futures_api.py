@@ -1,51 +1,26 @@
-import aiohttp
+from functools import partial
+
 from utils.logger import log
+from utils.symbols import registry
+from utils.constants import EXCHANGES
+from api.concurrent_fetch import fetch_all_exchanges
+from api.exchanges import adapters_for
 
 
 class FuturesAPI:
-    def __init__(self):
-        self.futures_pairs = {
-            'BINANCE': set(),
-            'MEXC': set(),
-            'KUCOIN': set(),
-        }
+    def __init__(self, http, exchanges=EXCHANGES, symbols=registry):
+        self.http = http
+        self.symbols = symbols
+        self.adapters = {ex: adapter for ex, adapter in adapters_for(exchanges).items() if adapter.has_futures}
+        self.futures_pairs = {ex: set() for ex in self.adapters}
+        self.timings = {}
 
     async def load_futures_pairs(self):
-        async with aiohttp.ClientSession() as session:
-
-            # BINANCE
-            try:
-                url = 'https://fapi.binance.com/fapi/v1/exchangeInfo'
-                async with session.get(url) as resp:
-                    data = await resp.json()
-                    self.futures_pairs['BINANCE'] = {
-                        s['symbol'] for s in data['symbols']
-                        if s['contractType'] == 'PERPETUAL' and s['status'] == 'TRADING'
-                    }
-                    log(f"[Info] Binance Futures: Loaded {len(self.futures_pairs['BINANCE'])} pairs")
-            except Exception as e:
-                log(f"[Error] Binance futures fetch exception: {e}")
-
-            # MEXC
-            try:
-                url = "https://contract.mexc.com/api/v1/contract/detail"
-                async with session.get(url) as resp:
-                    data = await resp.json()
-                    self.futures_pairs['MEXC'] = {
-                        p['symbol'].replace('_', '').upper() for p in data['data']
-                    }
-                    log(f"[Info] MEXC Futures: Loaded {len(self.futures_pairs['MEXC'])} pairs")
-            except Exception as e:
-                log(f"[Error] MEXC futures fetch exception: {e}")
+        fetchers = {ex: partial(self.fetch_futures_pairs, ex) for ex in self.adapters}
+        results, self.timings = await fetch_all_exchanges(fetchers, 'futures pairs')
+        self.futures_pairs = {**self.futures_pairs, **results}
 
-            # KUCOIN
-            try:
-                url = 'https://api-futures.kucoin.com/api/v1/contracts/active'
-                async with session.get(url) as resp:
-                    data = await resp.json()
-                    self.futures_pairs['KUCOIN'] = {
-                        p['symbol'].replace('-', '').upper() for p in data['data']
-                    }
-                    log(f"[Info] KuCoin Futures: Loaded {len(self.futures_pairs['KUCOIN'])} pairs")
-            except Exception as e:
-                log(f"[Error] KuCoin futures fetch exception: {e}")
+    async def fetch_futures_pairs(self, exchange):
+        pairs = await self.adapters[exchange].futures_contracts(self.http, self.symbols)
+        log(f"[Info] {exchange} Futures: Loaded {len(pairs)} pairs")
+        return pairs
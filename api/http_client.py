@@ -0,0 +1,153 @@
+import asyncio
+import aiohttp
+
+from utils.logger import log
+from utils.json_decode import decode_payload, shutdown_executors
+from api.rate_limiter import RateLimiter
+from api.circuit_breaker import CircuitBreakers
+from api.http_trace import create_trace_config, endpoint_labels
+from api.exchanges import WARMUP_URLS
+from utils.metrics import metrics
+from utils.constants import (
+    HTTP_TIMEOUT,
+    HTTP_CONNECTION_LIMIT,
+    HTTP_LIMIT_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+    PRIORITY_MARKET,
+    RATE_LIMIT_MAX_REQUEUE,
+    ENDPOINT_FAMILY_TIMEOUTS,
+    SIZE_BUCKETS,
+)
+
+
+class HttpClient:
+    """
+    Спільний пул HTTP-з'єднань для всіх API-модулів.
+    Одна сесія на весь час роботи бота: keep-alive, кеш DNS і ліміт з'єднань на хост.
+    """
+
+    def __init__(self, limit=HTTP_CONNECTION_LIMIT, limit_per_host=HTTP_LIMIT_PER_HOST,
+                 keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT, dns_cache_ttl=HTTP_DNS_CACHE_TTL,
+                 timeout=HTTP_TIMEOUT, rate_limiter=None, breakers=None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.breakers = breakers if breakers is not None else CircuitBreakers()
+        self.metrics = metrics
+        self.requests_sent = 0
+        self.session = None
+
+    async def start(self):
+        if self.session is not None and not self.session.closed:
+            return self
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[create_trace_config(self.metrics)],
+        )
+        return self
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        shutdown_executors()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def get_bytes(self, url, priority=PRIORITY_MARKET, **kwargs):
+        """
+        GET через планувальник ваги: запит чекає в черзі свого хоста за priority.
+        Після 429 біржа ставиться на паузу, а запит — назад у чергу.
+        Після 418 (бан IP) біржа теж на паузі, але запит одразу падає: помилка йде в circuit breaker,
+        і цикл продовжується без цієї біржі.
+        Поки circuit breaker (біржа, сімейство endpoint'ів) відкритий, запит одразу падає з CircuitOpenError.
+        """
+        exchange, family = self.breakers.resolve(url)
+        breaker = None
+        if exchange is not None:
+            breaker = self.breakers.get(exchange, family)
+            breaker.allow()
+            if family in ENDPOINT_FAMILY_TIMEOUTS and 'timeout' not in kwargs:
+                kwargs['timeout'] = aiohttp.ClientTimeout(total=ENDPOINT_FAMILY_TIMEOUTS[family])
+        labels = endpoint_labels(url)
+        loop = asyncio.get_running_loop()
+        try:
+            for attempt in range(RATE_LIMIT_MAX_REQUEUE + 1):
+                queued = loop.time()
+                bucket = await self.rate_limiter.acquire(url, priority)
+                started = loop.time()
+                self.requests_sent += 1
+                self.metrics.observe('http_queue_seconds', started - queued, **labels)
+                async with self.session.get(url, **kwargs) as resp:
+                    limited = self.rate_limiter.observe(bucket, resp.status, resp.headers)
+                    if not limited or attempt == RATE_LIMIT_MAX_REQUEUE:
+                        body = await resp.read()
+                        status = resp.status
+                        break
+            if status == 418:
+                raise RuntimeError(f"HTTP 418 {url}: IP banned by {labels['exchange']}")
+            self.metrics.observe('http_total_seconds', loop.time() - started, **labels)
+            self.metrics.observe('http_response_bytes', len(body), buckets=SIZE_BUCKETS, **labels)
+        except asyncio.CancelledError:
+            if breaker is not None:
+                breaker.release()
+            raise
+        except Exception:
+            if breaker is not None:
+                breaker.failure()
+            raise
+        if breaker is not None:
+            if breaker.is_failure_status(status):
+                breaker.failure()
+            else:
+                breaker.success()
+        return body
+
+    async def get_json(self, url, priority=PRIORITY_MARKET, **kwargs):
+        data, _ = await self.get_parsed(url, priority=priority, **kwargs)
+        return data
+
+    async def get_parsed(self, url, parser=None, priority=PRIORITY_MARKET, **kwargs):
+        """
+        Завантажує url і розбирає його через parser (див. utils.json_decode).
+        Повертає (result, секунд на розбір).
+        """
+        raw = await self.get_bytes(url, priority=priority, **kwargs)
+        result, decode_time = await decode_payload(raw, parser)
+        self.metrics.observe('http_decode_seconds', decode_time, **endpoint_labels(url))
+        return result, decode_time
+
+    async def warmup(self, urls=None):
+        """
+        Відкриває з'єднання (TCP + TLS) до кожного хоста біржі наперед,
+        щоб перший справжній запит не платив за handshake.
+        """
+        urls = WARMUP_URLS if urls is None else urls
+
+        async def ping(url):
+            try:
+                async with self.session.get(url) as resp:
+                    await resp.read()
+                return True
+            except Exception as e:
+                log(f"[Error] Warmup failed for {url}: {e}")
+                return False
+
+        results = await asyncio.gather(*(ping(url) for url in urls))
+        log(f"[Info] Warmed up {sum(results)}/{len(urls)} exchange connections")
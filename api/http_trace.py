@@ -0,0 +1,125 @@
+import asyncio
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import web
+
+from utils.logger import log
+from utils.metrics import metrics
+from api.exchanges import EXCHANGE_HOSTS
+from api.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+
+metrics.describe('http_dns_seconds', 'DNS resolve time')
+metrics.describe('http_connect_seconds', 'New connection time incl. DNS and TLS handshake')
+metrics.describe('http_ttfb_seconds', 'Time from request start to response headers')
+metrics.describe('http_total_seconds', 'Time from request start to full body read')
+metrics.describe('http_queue_seconds', 'Time spent waiting for the rate limiter')
+metrics.describe('http_decode_seconds', 'JSON decode and parse time')
+metrics.describe('http_response_bytes', 'Response body size')
+metrics.describe('http_responses_total', 'Responses by status code')
+metrics.describe('http_errors_total', 'Requests failed without a response')
+metrics.describe('http_connections_reused_total', 'Requests served over a keep-alive connection')
+metrics.describe('circuit_state', 'Circuit breaker state: 0 closed, 1 half-open, 2 open')
+metrics.describe('circuit_failures', 'Consecutive failures counted by the circuit breaker')
+metrics.describe('circuit_opened_total', 'Times the circuit breaker opened')
+metrics.describe('circuit_rejected_total', 'Requests rejected by an open circuit breaker without reaching the exchange')
+
+BREAKER_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def endpoint_labels(url):
+    """Мітки метрик для URL: біржа за хостом і шлях endpoint'а без параметрів."""
+    parts = urlsplit(str(url))
+    return {'exchange': EXCHANGE_HOSTS.get(parts.hostname, parts.hostname), 'endpoint': parts.path}
+
+
+def create_trace_config(registry=metrics):
+    """
+    TraceConfig для aiohttp-сесії: DNS, встановлення з'єднання, TTFB, статус і помилки.
+    Загальний час, розмір тіла й час розбору пише HttpClient — сигнали aiohttp їх не бачать.
+    """
+    trace = aiohttp.TraceConfig()
+
+    def now():
+        return asyncio.get_running_loop().time()
+
+    async def on_request_start(session, ctx, params):
+        ctx.start = now()
+        ctx.labels = endpoint_labels(params.url)
+
+    async def on_dns_resolvehost_start(session, ctx, params):
+        ctx.dns_start = now()
+
+    async def on_dns_resolvehost_end(session, ctx, params):
+        registry.observe('http_dns_seconds', now() - ctx.dns_start, **ctx.labels)
+
+    async def on_connection_create_start(session, ctx, params):
+        ctx.connect_start = now()
+
+    async def on_connection_create_end(session, ctx, params):
+        registry.observe('http_connect_seconds', now() - ctx.connect_start, **ctx.labels)
+
+    async def on_connection_reuseconn(session, ctx, params):
+        registry.inc('http_connections_reused_total', **ctx.labels)
+
+    async def on_request_end(session, ctx, params):
+        registry.observe('http_ttfb_seconds', now() - ctx.start, **ctx.labels)
+        registry.inc('http_responses_total', status=params.response.status, **ctx.labels)
+
+    async def on_request_exception(session, ctx, params):
+        registry.inc('http_errors_total', error=type(params.exception).__name__, **ctx.labels)
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace.on_connection_create_start.append(on_connection_create_start)
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+    return trace
+
+
+def format_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def log_http_summary(registry=metrics):
+    """Зведення по кожному (exchange, endpoint): кількість, p50/p95 total, p95 TTFB, середній розмір і розбір."""
+    for labels, total in sorted(registry.series('http_total_seconds'), key=lambda item: sorted(item[0].items())):
+        ttfb = registry.histogram('http_ttfb_seconds', **labels)
+        size = registry.histogram('http_response_bytes', **labels)
+        decode = registry.histogram('http_decode_seconds', **labels)
+        avg_kb = size.sum / size.count / 1024 if size and size.count else 0
+        log(f"[Info] HTTP {labels['exchange']} {labels['endpoint']}: {total.count} req, "
+            f"total p50/p95 {format_ms(total.quantile(0.5))}/{format_ms(total.quantile(0.95))} ms, "
+            f"ttfb p95 {format_ms(ttfb.quantile(0.95) if ttfb else None)} ms, "
+            f"{avg_kb:.1f} KB avg, decode p95 {format_ms(decode.quantile(0.95) if decode else None)} ms")
+
+
+def export_breakers(breakers, registry=metrics):
+    """Стан і лічильники з CircuitBreakers.stats() у метрики — на момент запиту /metrics."""
+    for (exchange, family), stats in breakers.stats().items():
+        registry.set_gauge('circuit_state', BREAKER_STATE_VALUES[stats['state']], exchange=exchange, family=family)
+        registry.set_gauge('circuit_failures', stats['failures'], exchange=exchange, family=family)
+        registry.set_counter('circuit_opened_total', stats['opened'], exchange=exchange, family=family)
+        registry.set_counter('circuit_rejected_total', stats['rejected'], exchange=exchange, family=family)
+
+
+async def start_metrics_server(port, host='127.0.0.1', registry=metrics, breakers=None):
+    """
+    GET /metrics у текстовому форматі Prometheus. Повертає web.AppRunner для зупинки.
+    breakers — CircuitBreakers HTTP-клієнта: їхній стан додається до кожної відповіді.
+    """
+    async def handle(request):
+        if breakers is not None:
+            export_breakers(breakers, registry)
+        return web.Response(text=registry.prometheus_text(), content_type='text/plain')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    log(f"[Info] Metrics at http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,66 @@
+from functools import partial
+
+from utils.logger import log
+from utils.quote_board import QuoteBoard
+from api.concurrent_fetch import fetch_all_exchanges
+from api.exchanges import adapters_for
+
+
+class MarketSnapshot:
+    """
+    Один знімок ринку на цикл: кожен масовий endpoint запитується не більше одного разу,
+    а quick prices, last prices і 24h обсяги виводяться з того самого розібраного payload.
+    Дані лежать у QuoteBoard, який переживає цикли й оновлюється на місці.
+    """
+
+    def __init__(self, http, board=None):
+        self.http = http
+        self.board = board
+        self.timings = {}
+        self.parse_timings = {}  # {exchange: секунд на розбір JSON}
+        self.with_volume = False
+
+    async def refresh(self, exchanges, with_volume=False, tracked=None, with_last=True):
+        """
+        tracked — множина канонічних символів; решта тікерів відкидається ще при розборі.
+        with_last=False — лише bid/ask (режим спостереження), без ticker/price.
+        """
+        if self.board is None:
+            self.board = QuoteBoard(exchanges)
+        fetchers = {
+            ex: partial(adapter.tickers, self.http, with_volume, tracked, with_last)
+            for ex, adapter in adapters_for(exchanges).items()
+        }
+        results, self.timings = await fetch_all_exchanges(fetchers, 'market snapshot')
+        self.parse_timings = {ex: results[ex][1] for ex in exchanges if ex in results}
+        self.with_volume = with_volume
+        for ex in exchanges:
+            rows = results[ex][0] if ex in results else {}
+            self.board.load_rows(ex, rows)
+            parse_ms = self.parse_timings.get(ex, 0) * 1000
+            log(f"[Info] {ex} snapshot: {len(rows)} tickers, parsed in {parse_ms:.1f} ms")
+        return self
+
+    def quick_prices(self):
+        """{exchange: {symbol: {'bid': float, 'ask': float}}} — як fetch_quick_prices (read-only вигляд)"""
+        return self.board.quick_prices()
+
+    def last_prices(self):
+        """{exchange: {symbol: float}} — як fetch_last_prices (read-only вигляд)"""
+        return self.board.last_prices()
+
+    def volumes(self, candidate_pairs, available_pairs):
+        """{pair: {exchange: volume_usdt}} — як get_all_exchange_volumes"""
+        board = self.board
+        result = {}
+        for pair, ex_dict in candidate_pairs.items():
+            result[pair] = {}
+            col = board.symbols.id_of(pair)
+            for ex in ex_dict.get('buy', []) + ex_dict.get('sell', []):
+                if col is None or col >= board.capacity or ex not in board.rows \
+                        or pair not in available_pairs.get(ex, set()):
+                    result[pair][ex] = 0
+                    continue
+                volume = float(board.lasts[board.rows[ex], col] * board.volumes[board.rows[ex], col])
+                result[pair][ex] = 0 if volume != volume else volume
+        return result
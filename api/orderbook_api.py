@@ -1,29 +1,34 @@
-import aiohttp
-from utils.logger import log
+from functools import partial
 
+from utils.logger import log
+from api.circuit_breaker import CircuitOpenError
+from api.exchanges import get_adapter
 
-async def fetch_order_book_price(exchange, pair):
-    try:
-        async with aiohttp.ClientSession() as session:
-            if exchange == 'BINANCE':
-                url = f'https://api.binance.com/api/v3/depth?symbol={pair}&limit=5'
-                async with session.get(url) as resp:
-                    data = await resp.json()
-                    return float(data['bids'][0][0]), float(data['asks'][0][0])
 
-            elif exchange == 'KUCOIN':
-                symbol = pair[:-4] + '-' + pair[-4:]
-                url = f'https://api.kucoin.com/api/v1/market/orderbook/level1?symbol={symbol}'
-                async with session.get(url) as resp:
-                    data = await resp.json()
-                    return float(data['data']['bestBid']), float(data['data']['bestAsk'])
+async def request_order_book_price(exchange, pair, http):
+    """
+    Один запит стакану через адаптер біржі: DepthBook з DEPTH_LEVELS рівнями з кожного боку.
+    Помилки не перехоплюються — ними керує RequestPolicy.
+    """
+    adapter = get_adapter(exchange)
+    if adapter is None:
+        return None
+    return await adapter.depth(http, pair)
 
-            elif exchange == 'MEXC':
-                url = f'https://api.mexc.com/api/v3/depth?symbol={pair}&limit=5'
-                async with session.get(url) as resp:
-                    data = await resp.json()
-                    return float(data['bids'][0][0]), float(data['asks'][0][0])
 
+async def fetch_order_book_price(exchange, pair, http, policy=None):
+    """
+    DepthBook з повторами й hedging (якщо передано policy).
+    None, якщо всі спроби не вдались.
+    """
+    try:
+        fetch = partial(request_order_book_price, exchange, pair, http)
+        if policy is None:
+            return await fetch()
+        return await policy.call(f"{exchange} depth", fetch, deadline_key=exchange)
+    except CircuitOpenError:
+        # біржа в деградованому режимі — про це вже сказав лог breaker'а
+        return None
     except Exception as e:
         log(f"[Error] Order book fetch error from {exchange} for {pair}: {e}")
-        return None, None
+        return None
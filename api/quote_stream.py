@@ -0,0 +1,247 @@
+import asyncio
+import json
+import time
+import uuid
+
+import aiohttp
+
+from utils.logger import log
+from utils.symbols import normalize_symbol
+from utils.quote_board import QuoteBoard
+from utils.constants import (
+    BINANCE_WS_URL,
+    KUCOIN_WS_TOKEN_URL,
+    MEXC_WS_URL,
+    WS_RECONNECT_DELAY,
+    WS_MAX_RECONNECT_DELAY,
+)
+
+
+def chunks(items, size):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class BinanceQuoteStream:
+    exchange = 'BINANCE'
+    max_symbols_per_connection = 1000  # ліміт Binance — 1024 стріми на з'єднання
+    max_symbols_per_message = 200
+    ping_interval = None  # Binance сам шле ping, aiohttp відповідає автоматично
+
+    def __init__(self, url=BINANCE_WS_URL):
+        self.url = url
+
+    async def connect_url(self, http):
+        return self.url
+
+    def subscribe_messages(self, symbols):
+        for i, part in enumerate(chunks(symbols, self.max_symbols_per_message), start=1):
+            yield {
+                'method': 'SUBSCRIBE',
+                'params': [f"{s.lower()}@bookTicker" for s in part],
+                'id': i,
+            }
+
+    def ping_message(self):
+        return None
+
+    def parse(self, msg):
+        data = msg.get('data', msg)
+        if 's' in data and 'b' in data:
+            yield data['s'], float(data['b']), float(data['a'])
+
+
+class KucoinQuoteStream:
+    exchange = 'KUCOIN'
+    max_symbols_per_connection = None  # один топік /market/ticker:all на всі пари
+    ping_interval = 18
+
+    def __init__(self, url=None, token_url=KUCOIN_WS_TOKEN_URL):
+        # url задається лише для локального replay-сервера, інакше береться з bullet-public
+        self.url = url
+        self.token_url = token_url
+
+    async def connect_url(self, http):
+        if self.url:
+            return self.url
+        async with http.session.post(self.token_url) as resp:
+            data = (await resp.json())['data']
+        server = data['instanceServers'][0]
+        self.ping_interval = server.get('pingInterval', 18000) / 1000
+        return f"{server['endpoint']}?token={data['token']}&connectId={uuid.uuid4().hex}"
+
+    def subscribe_messages(self, symbols):
+        yield {
+            'id': uuid.uuid4().hex,
+            'type': 'subscribe',
+            'topic': '/market/ticker:all',
+            'response': True,
+        }
+
+    def ping_message(self):
+        return {'id': uuid.uuid4().hex, 'type': 'ping'}
+
+    def parse(self, msg):
+        if msg.get('type') != 'message':
+            return
+        data = msg.get('data') or {}
+        bid = float(data.get('bestBid') or 0)
+        ask = float(data.get('bestAsk') or 0)
+        if bid > 0 and ask > 0:
+            yield normalize_symbol('KUCOIN', msg['subject']), bid, ask
+
+
+class MexcQuoteStream:
+    exchange = 'MEXC'
+    max_symbols_per_connection = 30  # MEXC дозволяє 30 підписок на з'єднання
+    ping_interval = 20
+
+    def __init__(self, url=MEXC_WS_URL):
+        self.url = url
+
+    async def connect_url(self, http):
+        return self.url
+
+    def subscribe_messages(self, symbols):
+        yield {
+            'method': 'SUBSCRIPTION',
+            'params': [f"spot@public.bookTicker.v3.api@{s}" for s in symbols],
+        }
+
+    def ping_message(self):
+        return {'method': 'PING'}
+
+    def parse(self, msg):
+        data = msg.get('d')
+        if data and 's' in msg:
+            yield msg['s'], float(data['b']), float(data['a'])
+
+
+QUOTE_STREAMS = {
+    'BINANCE': BinanceQuoteStream,
+    'KUCOIN': KucoinQuoteStream,
+    'MEXC': MexcQuoteStream,
+}
+
+
+class QuoteEngine:
+    """
+    Живі best bid/ask з WebSocket-стрімів бірж.
+    Котировки пишуться на місці в self.board (QuoteBoard); self.quotes — його read-only вигляд
+    у формі fetch_quick_prices: {exchange: {symbol: {'bid': float, 'ask': float}}}
+    При обриві з'єднання перепідключається з backoff і повторно підписується.
+    """
+
+    def __init__(self, http, streams=None, record_path=None, recorder=None, lifetimes=None,
+                 reconnect_delay=WS_RECONNECT_DELAY):
+        self.http = http
+        self.reconnect_delay = reconnect_delay
+        self.streams = streams if streams is not None else [cls() for cls in QUOTE_STREAMS.values()]
+        self.board = QuoteBoard([stream.exchange for stream in self.streams])
+        self.quotes = self.board.quick_prices()
+        self.last_update = {stream.exchange: 0.0 for stream in self.streams}
+        self.reconnects = {stream.exchange: 0 for stream in self.streams}
+        self.dirty = set()  # символи, котировки яких змінились з останнього drain_dirty()
+        self.record_path = record_path
+        self.record_file = None
+        self.recorder = recorder  # TickRecorder: кожна змінена котировка пишеться в сховище тиків
+        self.lifetimes = lifetimes  # SpreadLifetimeTracker: епізоди спреду рахуються з кожної котировки
+        self.tasks = []
+        self.first_quote = {}
+
+    def start(self, symbols_by_exchange):
+        if self.record_path:
+            self.record_file = open(self.record_path, 'a', encoding='utf-8')
+        for stream in self.streams:
+            symbols = sorted(symbols_by_exchange.get(stream.exchange, ()))
+            if stream.max_symbols_per_connection:
+                shards = list(chunks(symbols, stream.max_symbols_per_connection))
+            else:
+                shards = [symbols]
+            if not shards:
+                continue
+            self.first_quote[stream.exchange] = asyncio.Event()
+            for shard in shards:
+                self.tasks.append(asyncio.create_task(self.run_connection(stream, shard)))
+            log(f"[Info] {stream.exchange} quote stream: {len(symbols)} symbols over {len(shards)} connection(s)")
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.record_file:
+            self.record_file.close()
+            self.record_file = None
+
+    async def wait_ready(self, timeout):
+        """Чекає першої котировки з кожної біржі, але не довше timeout секунд."""
+        waiters = [event.wait() for event in self.first_quote.values()]
+        try:
+            await asyncio.wait_for(asyncio.gather(*waiters), timeout)
+        except asyncio.TimeoutError:
+            silent = [ex for ex, event in self.first_quote.items() if not event.is_set()]
+            log(f"[Error] No streamed quotes yet from: {', '.join(silent)}")
+
+    def drain_dirty(self):
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    async def run_connection(self, stream, symbols):
+        delay = self.reconnect_delay
+        while True:
+            connection = {'messages': 0}
+            try:
+                url = await stream.connect_url(self.http)
+                async with self.http.session.ws_connect(url, heartbeat=30) as ws:
+                    for message in stream.subscribe_messages(symbols):
+                        await ws.send_json(message)
+                    await self.consume(stream, ws, connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log(f"[Error] {stream.exchange} quote stream: {e}")
+            # Backoff скидається лише після з'єднання, що віддало хоч один кадр:
+            # сервер, який приймає й одразу закриває, не смикається щосекунди
+            if connection['messages']:
+                delay = self.reconnect_delay
+            self.reconnects[stream.exchange] += 1
+            log(f"[Info] {stream.exchange} quote stream reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WS_MAX_RECONNECT_DELAY)
+
+    async def consume(self, stream, ws, connection):
+        """connection['messages'] — лічильник текстових кадрів цього з'єднання."""
+        exchange = stream.exchange
+        ping_at = time.monotonic() + stream.ping_interval if stream.ping_interval else None
+        while True:
+            timeout = max(ping_at - time.monotonic(), 0) if ping_at else None
+            try:
+                msg = await ws.receive(timeout=timeout)
+            except asyncio.TimeoutError:
+                await ws.send_json(stream.ping_message())
+                ping_at = time.monotonic() + stream.ping_interval
+                continue
+
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    return
+                continue
+
+            connection['messages'] += 1
+            if self.record_file:
+                self.record_file.write(msg.data + '\n')
+            updated = False
+            now = time.time()
+            for symbol, bid, ask in stream.parse(json.loads(msg.data)):
+                if self.board.set_quote(exchange, symbol, bid, ask, now):
+                    self.dirty.add(symbol)
+                    if self.recorder is not None:
+                        self.recorder.record_quote(exchange, symbol, bid, ask, now)
+                    if self.lifetimes is not None:
+                        self.lifetimes.observe(self.board, exchange, symbol, now)
+                updated = True
+            if updated:
+                self.last_update[exchange] = now
+                self.first_quote[exchange].set()
@@ -0,0 +1,144 @@
+import asyncio
+import heapq
+import itertools
+import time
+from urllib.parse import urlsplit
+
+from utils.logger import log
+from api.exchanges import RATE_LIMITS, ENDPOINT_WEIGHTS
+from utils.constants import (
+    RATE_LIMIT_HEADROOM,
+    DEFAULT_ENDPOINT_WEIGHT,
+    PRIORITY_MARKET,
+    RATE_LIMIT_PAUSE,
+)
+
+
+class TokenBucket:
+    """
+    Бюджет ваги одного хоста біржі: capacity одиниць за window секунд, рівномірне поповнення.
+    Запити чекають у черзі за пріоритетом, а не відхиляються.
+    """
+
+    def __init__(self, host, capacity, window, headroom=RATE_LIMIT_HEADROOM):
+        self.host = host
+        self.limit = capacity
+        self.window = window
+        self.capacity = capacity * headroom
+        self.rate = self.capacity / window
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.waiters = []  # heap: (priority, seq, weight, future)
+        self.seq = itertools.count()
+        self.timer = None
+        self.granted = 0
+        self.throttled = 0
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, weight, priority=PRIORITY_MARKET):
+        weight = min(weight, self.capacity)
+        if not self.waiters and self.try_take(weight):
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.seq), weight, future))
+        self.throttled += 1
+        self.pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.tokens += weight  # вагу вже списано, а запит так і не пішов
+            raise
+
+    def try_take(self, weight):
+        now = time.monotonic()
+        if now < self.paused_until:
+            return False
+        self.refill(now)
+        if self.tokens < weight:
+            return False
+        self.tokens -= weight
+        self.granted += 1
+        return True
+
+    def pump(self):
+        """Пропускає запити з голови черги, поки вистачає ваги; інакше ставить таймер."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        while self.waiters:
+            _, _, weight, future = self.waiters[0]
+            if future.done():
+                heapq.heappop(self.waiters)
+                continue
+            if not self.try_take(weight):
+                break
+            heapq.heappop(self.waiters)
+            future.set_result(None)
+        if self.waiters:
+            now = time.monotonic()
+            weight = self.waiters[0][2]
+            delay = max(self.paused_until - now, (weight - self.tokens) / self.rate, 0.001)
+            self.timer = asyncio.get_running_loop().call_later(delay, self.pump)
+
+    def sync_used(self, used):
+        """Біржа повідомила, скільки ваги вже використано у вікні (X-MBX-USED-WEIGHT-1M)."""
+        self.refill(time.monotonic())
+        remaining = self.capacity - used * self.capacity / self.limit
+        if remaining < self.tokens:
+            self.tokens = remaining
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        if self.waiters:
+            self.pump()
+
+
+class RateLimiter:
+    """Планувальник запитів: один TokenBucket на хост біржі, вага — з ENDPOINT_WEIGHTS."""
+
+    def __init__(self, limits=RATE_LIMITS, weights=ENDPOINT_WEIGHTS):
+        self.buckets = {host: TokenBucket(host, capacity, window) for host, (capacity, window) in limits.items()}
+        self.weights = weights
+
+    def weight_of(self, host, path):
+        return self.weights.get(host, {}).get(path, DEFAULT_ENDPOINT_WEIGHT)
+
+    async def acquire(self, url, priority=PRIORITY_MARKET):
+        """Чекає своєї черги. Повертає bucket (або None для хостів без ліміту)."""
+        parts = urlsplit(url)
+        bucket = self.buckets.get(parts.hostname)
+        if bucket is not None:
+            await bucket.acquire(self.weight_of(parts.hostname, parts.path), priority)
+        return bucket
+
+    def observe(self, bucket, status, headers):
+        """
+        Підлаштовується під відповідь біржі: фактично використана вага з заголовків,
+        пауза на Retry-After після 429 (перевищено ліміт) або 418 (бан IP).
+        Повертає True, якщо запит треба повторити: лише для 429. Бан IP триває хвилини чи години,
+        тож запит після 418 не чекає його кінця, а одразу падає.
+        """
+        if bucket is None:
+            return False
+        used = headers.get('X-MBX-USED-WEIGHT-1M') or headers.get('X-MBX-USED-WEIGHT-1m')
+        if used and used.isdigit():
+            bucket.sync_used(int(used))
+        if status not in (429, 418):
+            return False
+        retry_after = headers.get('Retry-After')
+        pause = float(retry_after) if retry_after and retry_after.isdigit() else RATE_LIMIT_PAUSE
+        log(f"[Error] {bucket.host} rate limit hit (HTTP {status}), pausing requests for {pause:.0f}s")
+        bucket.pause(pause)
+        return status == 429
+
+    def stats(self):
+        return {
+            host: {'granted': b.granted, 'throttled': b.throttled, 'queued': len(b.waiters), 'tokens': b.tokens}
+            for host, b in self.buckets.items()
+        }
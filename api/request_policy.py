@@ -0,0 +1,126 @@
+import asyncio
+import random
+from collections import deque
+
+import aiohttp
+
+from utils.constants import (
+    ORDERBOOK_RETRIES,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    REQUEST_DEADLINES,
+    DEFAULT_REQUEST_DEADLINE,
+    HEDGE_QUANTILE,
+    HEDGE_MIN_SAMPLES,
+    LATENCY_WINDOW,
+)
+
+# Повторюємо лише мережеві збої й таймаути; помилка в даних (невідомий символ) не зникне від повтору
+RETRYABLE_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)
+
+
+class RequestPolicy:
+    """
+    Обгортка над ідемпотентним запитом:
+    - до retries повторів з експоненційним backoff і повним jitter;
+    - hedging: якщо відповідь довша за p95 латентності endpoint'а, летить другий такий самий запит,
+      і береться той, що відповів першим;
+    - спільний дедлайн на всі спроби, окремий для кожного endpoint'а.
+    """
+
+    def __init__(self, retries=ORDERBOOK_RETRIES, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY,
+                 deadlines=REQUEST_DEADLINES, hedge_quantile=HEDGE_QUANTILE, hedge_min_samples=HEDGE_MIN_SAMPLES,
+                 retry_on=RETRYABLE_ERRORS):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadlines = deadlines
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.retry_on = retry_on
+        self.latencies = {}  # endpoint -> deque останніх латентностей
+        self.metrics = {}  # endpoint -> {'requests', 'retries', 'failures', 'deadline', 'hedges', 'hedge_wins'}
+
+    def counters(self, endpoint):
+        if endpoint not in self.metrics:
+            self.metrics[endpoint] = dict.fromkeys(
+                ('requests', 'retries', 'failures', 'deadline', 'hedges', 'hedge_wins'), 0)
+        return self.metrics[endpoint]
+
+    def hedge_delay(self, endpoint):
+        samples = self.latencies.get(endpoint)
+        if not samples or len(samples) < self.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(int(len(ordered) * self.hedge_quantile), len(ordered) - 1)]
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def call(self, endpoint, fetch, deadline_key=None):
+        """
+        fetch — функція без аргументів, що повертає нову корутину запиту.
+        deadline_key — ключ у deadlines (за замовчуванням endpoint).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadlines.get(deadline_key or endpoint, DEFAULT_REQUEST_DEADLINE)
+        counters = self.counters(endpoint)
+        counters['requests'] += 1
+        for attempt in range(self.retries + 1):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                return await asyncio.wait_for(self.attempt(endpoint, fetch), remaining)
+            except asyncio.TimeoutError:
+                if loop.time() >= deadline:
+                    break
+                error = 'timeout'
+            except self.retry_on as e:
+                error = e
+            except Exception:
+                counters['failures'] += 1
+                raise
+            if attempt == self.retries:
+                counters['failures'] += 1
+                raise RuntimeError(f"{endpoint} failed after {attempt + 1} attempts: {error}")
+            counters['retries'] += 1
+            await asyncio.sleep(min(self.backoff(attempt), max(deadline - loop.time(), 0)))
+        counters['deadline'] += 1
+        counters['failures'] += 1
+        raise asyncio.TimeoutError(f"{endpoint} deadline exceeded")
+
+    async def attempt(self, endpoint, fetch):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        primary = asyncio.ensure_future(fetch())
+        tasks = {primary}
+        try:
+            delay = self.hedge_delay(endpoint)
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                hedge = asyncio.ensure_future(fetch())
+                tasks.add(hedge)
+                self.counters(endpoint)['hedges'] += 1
+            while True:
+                done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                # exception() читається в кожного завершеного запиту, а не лише до переможця:
+                # інакше помилка сусіднього запиту лишається неотриманою і asyncio її залогує
+                errors = {t: t.exception() for t in done}
+                winner = next((t for t, e in errors.items() if e is None), None)
+                if winner is not None:
+                    break
+                if not pending:
+                    raise next(iter(errors.values()))
+                tasks = pending  # один запит упав — чекаємо інший
+            if winner is not primary:
+                self.counters(endpoint)['hedge_wins'] += 1
+            self.latencies.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(loop.time() - started)
+            return winner.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self):
+        return {endpoint: dict(counters, p95=self.hedge_delay(endpoint)) for endpoint, counters in self.metrics.items()}
@@ -0,0 +1,39 @@
+"""
+HTTP-клієнт для бенчмарків: ті самі get_bytes/get_json/get_parsed, що в HttpClient,
+але відповіді беруться із записаних fixture-файлів або SyntheticMarket, без мережі.
+"""
+from urllib.parse import urlsplit, parse_qs
+
+from utils.json_decode import decode_payload, loads
+from api.exchanges import EXCHANGE_HOSTS
+
+
+class FixtureHttp:
+    def __init__(self, market=None, fixtures=None):
+        """
+        - market: SyntheticMarket — стакани генеруються з його цін
+        - fixtures: {(exchange, path): bytes} — записані відповіді (без параметрів запиту)
+        """
+        self.market = market
+        self.fixtures = fixtures or {}
+        self.requests_sent = 0
+
+    async def get_bytes(self, url, priority=None, **kwargs):
+        self.requests_sent += 1
+        parts = urlsplit(url)
+        exchange = EXCHANGE_HOSTS.get(parts.hostname, parts.hostname)
+        raw = self.fixtures.get((exchange, parts.path))
+        if raw is None and self.market is not None:
+            query = parse_qs(parts.query)
+            symbol = (query.get('symbol') or query.get('instId') or [''])[0]
+            # символ у запиті — біржовий; у SyntheticMarket стакани за канонічним ім'ям
+            raw = self.market.depth_payload(exchange, symbol.replace('-', '').replace('_', ''))
+        if raw is None:
+            raise KeyError(f"No fixture for {url}")
+        return raw
+
+    async def get_json(self, url, priority=None, **kwargs):
+        return loads(await self.get_bytes(url))
+
+    async def get_parsed(self, url, parser=None, priority=None, **kwargs):
+        return await decode_payload(await self.get_bytes(url), parser, mode=None)
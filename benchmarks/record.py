@@ -0,0 +1,53 @@
+"""
+Записує справжні відповіді бірж у fixture-файли для бенчмарків.
+Запуск: python -m benchmarks.record [--out benchmarks/fixtures] [--symbol BTCUSDT]
+"""
+import argparse
+import asyncio
+import os
+
+from api.http_client import HttpClient
+from utils.logger import log
+
+ENDPOINTS = {
+    'binance_bookTicker.json': 'https://api.binance.com/api/v3/ticker/bookTicker',
+    'binance_ticker_price.json': 'https://api.binance.com/api/v3/ticker/price',
+    'binance_24hr.json': 'https://api.binance.com/api/v3/ticker/24hr',
+    'binance_depth.json': 'https://api.binance.com/api/v3/depth?symbol={symbol}&limit=20',
+    'kucoin_allTickers.json': 'https://api.kucoin.com/api/v1/market/allTickers',
+    'kucoin_level2_20.json': 'https://api.kucoin.com/api/v1/market/orderbook/level2_20?symbol={kucoin_symbol}',
+    'mexc_bookTicker.json': 'https://api.mexc.com/api/v3/ticker/bookTicker',
+    'mexc_ticker_price.json': 'https://api.mexc.com/api/v3/ticker/price',
+    'mexc_24hr.json': 'https://api.mexc.com/api/v3/ticker/24hr',
+    'mexc_depth.json': 'https://api.mexc.com/api/v3/depth?symbol={symbol}&limit=20',
+    'okx_tickers.json': 'https://www.okx.com/api/v5/market/tickers?instType=SPOT',
+    'okx_books.json': 'https://www.okx.com/api/v5/market/books?instId={okx_symbol}&sz=20',
+    'okx_instruments_spot.json': 'https://www.okx.com/api/v5/public/instruments?instType=SPOT',
+    'okx_instruments_swap.json': 'https://www.okx.com/api/v5/public/instruments?instType=SWAP',
+}
+
+
+async def record(out, symbol, kucoin_symbol, okx_symbol):
+    os.makedirs(out, exist_ok=True)
+    async with HttpClient() as http:
+        async def save(filename, url):
+            try:
+                raw = await http.get_bytes(url.format(symbol=symbol, kucoin_symbol=kucoin_symbol, okx_symbol=okx_symbol))
+            except Exception as e:
+                log(f"[Error] Recording {filename}: {e}")
+                return
+            with open(os.path.join(out, filename), 'wb') as f:
+                f.write(raw)
+            log(f"[Info] {filename}: {len(raw)} bytes")
+
+        await asyncio.gather(*(save(filename, url) for filename, url in ENDPOINTS.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(__file__), 'fixtures'))
+    parser.add_argument('--symbol', default='BTCUSDT')
+    parser.add_argument('--kucoin-symbol', default='BTC-USDT')
+    parser.add_argument('--okx-symbol', default='BTC-USDT')
+    args = parser.parse_args()
+    asyncio.run(record(args.out, args.symbol, args.kucoin_symbol, args.okx_symbol))
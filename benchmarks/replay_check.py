@@ -0,0 +1,231 @@
+"""
+Перевірка WebSocket-стрімів проти локального ReplayServer: записані кадри програються
+справжньому з'єднанню, без біржі. Після останнього кадру сервер закриває з'єднання,
+тож перевіряються й перепідключення з повторною підпискою, а для локальних стаканів —
+знімок, буфер до знімка, розрив у нумерації і повторна синхронізація.
+
+Запуск: python -m benchmarks.replay_check   (код виходу 1, якщо щось не зійшлося)
+Також викликається з python -m benchmarks.run разом із fixture-файлами.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+from api.http_client import HttpClient
+from api.quote_stream import QuoteEngine, BinanceQuoteStream
+from api.depth_stream import OrderBookEngine, BinanceDepthStream
+from utils.json_decode import loads
+from utils.local_book import LocalBook
+from utils.logger import flush_logs
+from utils.replay_server import ReplayServer, load_frames
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, 'fixtures')
+RECONNECT_DELAY = 0.05  # замість WS_RECONNECT_DELAY, щоб перевірка не чекала секундами
+TIMEOUT = 5
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def expect(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+async def wait_for(condition, what, timeout=TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise CheckFailed(f"timed out waiting for {what}")
+        await asyncio.sleep(0.01)
+
+
+def last_quotes(frames):
+    """{symbol: (bid, ask)} з останніх bookTicker-кадрів Binance."""
+    quotes = {}
+    for frame in frames:
+        data = json.loads(frame)
+        if 's' in data and 'b' in data:
+            quotes[data['s']] = (float(data['b']), float(data['a']))
+    return quotes
+
+
+async def check_quote_stream(http, directory=FIXTURES_DIR):
+    frames = load_frames(os.path.join(directory, 'binance_bookTicker_stream.jsonl'))
+    expected = last_quotes(frames)
+    server = await ReplayServer(frames, port=0, close_after=True).start()
+    engine = QuoteEngine(http, streams=[BinanceQuoteStream(url=server.url)], reconnect_delay=RECONNECT_DELAY)
+    try:
+        engine.start({'BINANCE': sorted(expected)})
+        await engine.wait_ready(TIMEOUT)
+        # Кадри першого з'єднання, закриття, перепідключення і ті самі кадри ще раз
+        await wait_for(lambda: server.connections >= 2 and len(server.received) >= 2, "reconnect")
+        await wait_for(lambda: engine.reconnects['BINANCE'] >= 1, "reconnect counter")
+
+        quotes = engine.quotes['BINANCE']
+        for symbol, (bid, ask) in expected.items():
+            quote = quotes.get(symbol)
+            expect(quote is not None, f"no streamed quote for {symbol}")
+            expect((quote['bid'], quote['ask']) == (bid, ask),
+                   f"{symbol} quote {quote['bid']}/{quote['ask']}, expected {bid}/{ask}")
+        dirty = engine.drain_dirty()
+        expect(dirty == set(expected), f"dirty symbols {sorted(dirty)}, expected {sorted(expected)}")
+        expect(not engine.drain_dirty(), "dirty set not cleared by drain_dirty()")
+
+        subscriptions = [msg for msg in server.received if msg.get('method') == 'SUBSCRIBE']
+        expect(len(subscriptions) >= 2, f"expected resubscribe after reconnect, got {len(subscriptions)} subscriptions")
+        wanted = sorted(f"{symbol.lower()}@bookTicker" for symbol in expected)
+        for message in subscriptions:
+            expect(sorted(message['params']) == wanted, f"subscription params {message['params']}")
+    finally:
+        await engine.stop()
+        await server.stop()
+    return {'frames': len(frames), 'connections': server.connections}
+
+
+class SnapshotHttp:
+    """
+    Справжня aiohttp-сесія для WebSocket, а REST-знімки стакану — із заготовлених відповідей:
+    по черзі, останній повторюється (свіжий знімок для кожної повторної синхронізації).
+    """
+
+    def __init__(self, session, snapshots):
+        self.session = session
+        self.snapshots = snapshots
+        self.requests_sent = 0
+
+    async def get_json(self, url, priority=None, **kwargs):
+        self.requests_sent += 1
+        return self.snapshots[min(self.requests_sent, len(self.snapshots)) - 1]
+
+
+def replayed_book(snapshot, updates):
+    """LocalBook після знімка і всіх оновлень без пропусків — еталон для перевірки."""
+    book = LocalBook()
+    book.load_snapshot(snapshot['lastUpdateId'], snapshot['bids'], snapshot['asks'])
+    for update in updates:
+        if update['u'] > book.sequence:
+            book.apply(update['b'], update['a'])
+            book.sequence = update['u']
+    return book
+
+
+def book_levels(book):
+    return (list(book.bids.keys), list(book.bids.qtys), list(book.asks.keys), list(book.asks.qtys))
+
+
+def snapshot_of(book):
+    return {
+        'lastUpdateId': book.sequence,
+        'bids': [[-key, qty] for key, qty in zip(book.bids.keys, book.bids.qtys)],
+        'asks': [[key, qty] for key, qty in zip(book.asks.keys, book.asks.qtys)],
+    }
+
+
+async def check_depth_stream(http, directory=FIXTURES_DIR):
+    frames = load_frames(os.path.join(directory, 'binance_diff_depth.jsonl'))
+    with open(os.path.join(directory, 'binance_depth.json'), 'rb') as f:
+        snapshot = loads(f.read())
+    updates = [json.loads(frame)['data'] for frame in frames]
+    symbol = updates[0]['s']
+    expected = replayed_book(snapshot, updates)
+
+    # Один кадр посередині викинуто — двигун має помітити розрив і взяти свіжий знімок.
+    # Пауза між кадрами дає знімку завантажитись, тож лічильники детерміновані.
+    gap = len(frames) // 2
+    server = await ReplayServer(frames[:gap] + frames[gap + 1:], port=0, interval=0.005, close_after=True).start()
+    snapshots = SnapshotHttp(http.session, [snapshot, snapshot_of(expected)])
+    engine = OrderBookEngine(snapshots, streams=[BinanceDepthStream(url=server.url)], reconnect_delay=RECONNECT_DELAY)
+    book = None
+    try:
+        engine.watch({'BINANCE': {symbol}})
+        book = engine.books[('BINANCE', symbol)]
+        # Знімок на старті, свіжий після розриву і ще один після перепідключення
+        await wait_for(lambda: server.connections >= 2 and snapshots.requests_sent >= 3 and book.synced,
+                       "resync after reconnect")
+        stats = engine.stats()
+        expect(stats['gaps'] == 1, f"expected exactly one gap, got {stats}")
+        # Один resync через розрив, другий — через закрите сервером з'єднання
+        expect(stats['resyncs'] >= 2, f"expected resync on gap and on disconnect, got {stats}")
+        expect(not stats['snapshot_failures'], f"snapshot failures: {stats}")
+        expect(book.sequence == expected.sequence, f"book at sequence {book.sequence}, expected {expected.sequence}")
+        expect(book_levels(book) == book_levels(expected), "book levels differ from the gap-free replay")
+        subscriptions = [msg for msg in server.received if msg.get('method') == 'SUBSCRIBE']
+        expect(len(subscriptions) >= 2, f"expected resubscribe after reconnect, got {len(subscriptions)} subscriptions")
+    finally:
+        await engine.stop()
+        await server.stop()
+    return {'frames': len(frames) - 1, 'connections': server.connections, **engine.stats()}
+
+
+async def check_depth_reconcile(http, directory=FIXTURES_DIR):
+    # Сервер без кадрів і без закриття: лише записує (від)підписки, що шле двигун
+    server = await ReplayServer([], port=0).start()
+    stream = BinanceDepthStream(url=server.url)
+    engine = OrderBookEngine(SnapshotHttp(http.session, [{}]), streams=[stream], reconnect_delay=RECONNECT_DELAY)
+
+    def sent(method):
+        return sorted(param for msg in server.received if msg.get('method') == method for param in msg['params'])
+
+    try:
+        engine.watch({'BINANCE': {'BTCUSDT'}})
+        await wait_for(lambda: sent('SUBSCRIBE'), "initial subscription")
+        # Новий гарячий символ дописується в те саме з'єднання, холодний — відписується
+        engine.watch({'BINANCE': {'ETHUSDT'}})
+        await wait_for(lambda: sent('UNSUBSCRIBE'), "unsubscribe of a cold symbol")
+        expect(server.connections == 1, f"expected one connection, got {server.connections}")
+        expect(len(engine.shards['BINANCE']) == 1, f"expected one shard, got {len(engine.shards['BINANCE'])}")
+        expect(sent('SUBSCRIBE') == ['btcusdt@depth@100ms', 'ethusdt@depth@100ms'], f"subscribed {sent('SUBSCRIBE')}")
+        expect(sent('UNSUBSCRIBE') == ['btcusdt@depth@100ms'], f"unsubscribed {sent('UNSUBSCRIBE')}")
+        expect(set(engine.books) == {('BINANCE', 'ETHUSDT')}, f"books {sorted(engine.books)}")
+
+        # Порожній гарячий набір — стаканів і з'єднань не лишається
+        task = engine.shards['BINANCE'][0].task
+        engine.watch({})
+        await asyncio.gather(task, return_exceptions=True)
+        expect(not engine.books and not engine.shards['BINANCE'], "books or shards left after the hot set emptied")
+        expect(task.cancelled(), "shard task still running")
+    finally:
+        await engine.stop()
+        await server.stop()
+    return {'subscribed': len(sent('SUBSCRIBE')), 'unsubscribed': len(sent('UNSUBSCRIBE'))}
+
+
+CHECKS = {
+    'quote stream replay': check_quote_stream,
+    'depth stream replay': check_depth_stream,
+    'depth stream reconcile': check_depth_reconcile,
+}
+
+
+async def run_checks(directory=FIXTURES_DIR):
+    """{назва: результат}; CheckFailed — при першій розбіжності."""
+    results = {}
+    async with HttpClient() as http:
+        for name, check in CHECKS.items():
+            try:
+                results[name] = await check(http, directory)
+            except CheckFailed as e:
+                raise CheckFailed(f"{name}: {e}") from None
+    return results
+
+
+async def main():
+    try:
+        results = await run_checks()
+    except CheckFailed as e:
+        flush_logs()
+        print(f"FAILED {e}")
+        return 1
+    flush_logs()
+    for name, result in results.items():
+        print(f"OK {name}: {result}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
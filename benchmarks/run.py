@@ -0,0 +1,389 @@
+"""
+Офлайн-бенчмарк гарячих шляхів: розбір тікерів, QuoteBoard, пошук кандидатів,
+інкрементальне оновлення, друк таблиць, перевірка стаканів і локальні стакани з diff-стрімів —
+без звернень до бірж. Записані diff-стріми (fixtures/*.jsonl) можна також програти
+через utils/replay_server.py.
+
+Запуск:
+    python -m benchmarks.run                          # 5000 символів × 3 біржі
+    python -m benchmarks.run --symbols 50000 --exchanges 10
+    python -m benchmarks.run --save-baseline          # записати поточні результати як еталон
+Код виходу 1, якщо медіана якоїсь стадії гірша за еталон більше ніж на --tolerance.
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from functools import partial
+from urllib.parse import urlsplit
+
+from prettytable import PrettyTable
+
+from api.exchanges import (
+    parse_book_ticker, parse_price_ticker, merge_book_and_price, parse_24hr, parse_kucoin_all_tickers,
+    parse_okx_tickers, get_adapter,
+)
+from api.orderbook_api import request_order_book_price
+from api.depth_stream import OrderBookEngine, DEPTH_STREAMS
+from core.analyzer import ArbitrageVerifier
+from core.printer import print_candidates_table
+from core.quick_price import find_candidates_by_last_price, find_candidates_by_quick_prices_all
+from core.watcher import SpreadWatcher
+from utils.json_decode import decode_and_parse, loads, JSON_BACKEND
+from utils.logger import flush_logs
+from utils.quote_board import QuoteBoard
+from utils.symbols import registry
+from utils.constants import MIN_SPREAD_PERCENT, MAX_SPREAD_PERCENT
+from benchmarks.synthetic import SyntheticMarket, REAL_EXCHANGES
+from benchmarks.fixture_http import FixtureHttp
+from benchmarks.replay_check import run_checks, CheckFailed
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, 'fixtures')
+BASELINE_FILE = os.path.join(HERE, 'baseline.json')
+
+# fixture-файл -> (біржа, парсер тікерів) або (біржа, шлях стакану)
+TICKER_FIXTURES = {
+    'binance_bookTicker.json': ('BINANCE', parse_book_ticker),
+    'binance_ticker_price.json': ('BINANCE', parse_price_ticker),
+    'binance_24hr.json': ('BINANCE', parse_24hr),
+    'mexc_bookTicker.json': ('MEXC', parse_book_ticker),
+    'mexc_ticker_price.json': ('MEXC', parse_price_ticker),
+    'mexc_24hr.json': ('MEXC', parse_24hr),
+    'kucoin_allTickers.json': ('KUCOIN', None),
+    'okx_tickers.json': ('OKX', None),
+}
+# формати з одним масовим тікером на біржу -> парсер (names, tracked, data) без аргументу exchange
+VENUE_FORMATS = {
+    'kucoin': parse_kucoin_all_tickers,
+    'okx': parse_okx_tickers,
+}
+# записаний diff-depth стрім -> (біржа, символ, fixture зі знімком стакану)
+DIFF_FIXTURES = {
+    'binance_diff_depth.jsonl': ('BINANCE', 'BTCUSDT', 'binance_depth.json'),
+}
+DEPTH_FIXTURES = {
+    'binance_depth.json': ('BINANCE', '/api/v3/depth'),
+    'kucoin_level2_20.json': ('KUCOIN', '/api/v1/market/orderbook/level2_20'),
+    'mexc_depth.json': ('MEXC', '/api/v3/depth'),
+    'okx_books.json': ('OKX', '/api/v5/market/books'),
+}
+# списки пар -> (біржа, шлях, ринок): перевіряють завантаження пар адаптером
+METADATA_FIXTURES = {
+    'okx_instruments_spot.json': ('OKX', '/api/v5/public/instruments', 'spot'),
+    'okx_instruments_swap.json': ('OKX', '/api/v5/public/instruments', 'futures'),
+}
+
+
+@contextlib.contextmanager
+def quiet():
+    # log() і таблиці пишуть у stdout: їх вартість міряється, але не виводиться
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+        # log() пише фоновим потоком: дочекатися, поки черга дійде до devnull
+        flush_logs()
+
+
+class Bench:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []  # (stage, items, [секунди])
+
+    def measure(self, stage, items, fn):
+        timings = []
+        result = None
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            with quiet():
+                result = fn()
+            timings.append(time.perf_counter() - started)
+        self.results.append((stage, items, timings))
+        return result
+
+    async def measure_async(self, stage, items, fn):
+        timings = []
+        result = None
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            with quiet():
+                result = await fn()
+            timings.append(time.perf_counter() - started)
+        self.results.append((stage, items, timings))
+        return result
+
+
+def ticker_parser(exchange, fmt, kind, tracked=None):
+    names = registry.canonical_map(exchange)
+    if fmt in VENUE_FORMATS:
+        return partial(VENUE_FORMATS[fmt], names, tracked)
+    parser = {'bookTicker': parse_book_ticker, 'price': parse_price_ticker, '24hr': parse_24hr}[kind]
+    return partial(parser, exchange, names, tracked)
+
+
+def parse_market(market, with_volume):
+    rows = {}
+    for ex in market.exchanges:
+        fmt = market.formats[ex]
+        payloads = market.payloads[ex]
+        if fmt in VENUE_FORMATS:
+            rows[ex] = decode_and_parse(payloads['tickers'], ticker_parser(ex, fmt, 'tickers'))
+        elif with_volume:
+            rows[ex] = decode_and_parse(payloads['24hr'], ticker_parser(ex, fmt, '24hr'))
+        else:
+            book = decode_and_parse(payloads['bookTicker'], ticker_parser(ex, fmt, 'bookTicker'))
+            prices = decode_and_parse(payloads['price'], ticker_parser(ex, fmt, 'price'))
+            rows[ex] = merge_book_and_price(book, prices)
+    return rows
+
+
+def load_board(board, rows):
+    for ex, ex_rows in rows.items():
+        board.load_rows(ex, ex_rows)
+    return board
+
+
+async def run_fixtures(bench, directory):
+    """Записані відповіді бірж: перевіряє, що парсери розуміють формат, і міряє швидкість розбору."""
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        filename = os.path.basename(path)
+        with open(path, 'rb') as f:
+            raw = f.read()
+        if filename in TICKER_FIXTURES:
+            exchange, parser = TICKER_FIXTURES[filename]
+            names = registry.canonical_map(exchange)
+            parser = partial(VENUE_FORMATS[exchange.lower()], names, None) if parser is None \
+                else partial(parser, exchange, names, None)
+            parsed = decode_and_parse(raw, parser)
+            if not parsed:
+                raise SystemExit(f"Fixture {filename} parsed to nothing")
+            bench.measure(f"fixture {filename}", len(parsed), partial(decode_and_parse, raw, parser))
+        elif filename in DEPTH_FIXTURES:
+            exchange, url_path = DEPTH_FIXTURES[filename]
+            http = FixtureHttp(fixtures={(exchange, url_path): raw})
+            book = await request_order_book_price(exchange, 'BTCUSDT', http)
+            if not book.bid or not book.ask:
+                raise SystemExit(f"Fixture {filename} has no best bid/ask")
+            await bench.measure_async(f"fixture {filename}", 1,
+                                      partial(request_order_book_price, exchange, 'BTCUSDT', http))
+        elif filename in METADATA_FIXTURES:
+            exchange, url_path, market = METADATA_FIXTURES[filename]
+            http = FixtureHttp(fixtures={(exchange, url_path): raw})
+            adapter = get_adapter(exchange)
+            load = adapter.futures_contracts if market == 'futures' else adapter.spot_symbols
+            pairs = await load(http)
+            if not pairs:
+                raise SystemExit(f"Fixture {filename} loaded no pairs")
+            await bench.measure_async(f"fixture {filename}", len(pairs), partial(load, http))
+
+
+async def replay_diffs(exchange, symbol, frames, snapshot):
+    """Подає записані кадри в OrderBookEngine без WebSocket; знімок — з FixtureHttp."""
+    stream = DEPTH_STREAMS[exchange]()
+    http = FixtureHttp(fixtures={(exchange, urlsplit(stream.snapshot_url(symbol)).path): snapshot})
+    engine = OrderBookEngine(http, streams=[stream])
+    engine.watch({exchange: {symbol}}, connect=False)
+    for frame in frames:
+        engine.handle_message(stream, frame)
+        if engine.snapshots:
+            await asyncio.gather(*engine.snapshots.values())
+    return engine
+
+
+async def run_diff_fixtures(bench, directory):
+    for filename, (exchange, symbol, snapshot_file) in DIFF_FIXTURES.items():
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            frames = [loads(line) for line in f if line.strip()]
+        with open(os.path.join(directory, snapshot_file), 'rb') as f:
+            snapshot = f.read()
+        engine = await replay_diffs(exchange, symbol, frames, snapshot)
+        stats = engine.stats()
+        if stats['synced'] != 1 or stats['gaps']:
+            raise SystemExit(f"Fixture {filename}: book not in sync after replay ({stats})")
+        await bench.measure_async(f"fixture {filename}", len(frames),
+                                  partial(replay_diffs, exchange, symbol, frames, snapshot))
+
+
+async def run_replay_checks(directory):
+    try:
+        await run_checks(directory)
+    except CheckFailed as e:
+        raise SystemExit(f"Replay check failed: {e}")
+
+
+def synthetic_diffs(count, seed, levels=200):
+    """Знімок на levels рівнів і count diff-повідомлень Binance біля верхівки стакану."""
+    rng = random.Random(seed)
+    bids = [[f"{100 - i * 0.01:.2f}", "1"] for i in range(levels)]
+    asks = [[f"{100.01 + i * 0.01:.2f}", "1"] for i in range(levels)]
+    frames = []
+    for i in range(count):
+        def side(base, sign):
+            return [[f"{base + sign * rng.randint(0, 50) * 0.01:.2f}", f"{rng.choice((0, rng.uniform(0.1, 5))):.4f}"]
+                    for _ in range(rng.randint(1, 6))]
+        frames.append({'e': 'depthUpdate', 's': 'SYNUSDT', 'U': i + 1, 'u': i + 1,
+                       'b': side(100, -1), 'a': side(100.01, 1)})
+    return frames, {'lastUpdateId': 0, 'bids': bids, 'asks': asks}
+
+
+async def run_synthetic(bench, symbols, exchanges, max_verify, max_print, seed):
+    started = time.perf_counter()
+    market = SyntheticMarket(symbols=symbols, exchanges=exchanges, seed=seed)
+    print(f"Synthetic market: {symbols} symbols × {exchanges} exchanges, "
+          f"{market.ticker_count()} tickers, generated in {time.perf_counter() - started:.1f}s")
+    tickers = market.ticker_count()
+
+    rows = bench.measure('parse bookTicker+price', tickers, partial(parse_market, market, False))
+    bench.measure('parse 24hr', tickers, partial(parse_market, market, True))
+
+    board = QuoteBoard(market.exchanges)
+    bench.measure('board load', tickers, partial(load_board, board, rows))
+
+    last_prices = board.last_prices()
+    bench.measure('last-price candidates', tickers, partial(
+        find_candidates_by_last_price, last_prices, market.spot_pairs, {}, market.exchanges,
+        MIN_SPREAD_PERCENT, MAX_SPREAD_PERCENT))
+
+    quick_prices = board.quick_prices()
+    candidates = bench.measure('quick candidates', tickers, partial(
+        find_candidates_by_quick_prices_all, quick_prices, MIN_SPREAD_PERCENT, MAX_SPREAD_PERCENT))
+
+    # 1% котировок змінюються між тіками, як у режимі спостереження
+    rng = random.Random(seed)
+    watcher = SpreadWatcher(MIN_SPREAD_PERCENT, MAX_SPREAD_PERCENT)
+    with quiet():
+        watcher.update(quick_prices)
+    moves = [
+        (ex, name, quote[0] * (1 + rng.uniform(-0.01, 0.01)), quote[1] * (1 + rng.uniform(-0.01, 0.01)))
+        for ex in market.exchanges
+        for name, quote in rng.sample(sorted(market.prices[ex].items()), max(len(market.prices[ex]) // 100, 1))
+    ]
+    # Тіки чергують зсунуті й початкові котировки, щоб кожен повтор мав справжні зміни
+    restores = [(ex, name, *market.prices[ex][name][:2]) for ex, name, _, _ in moves]
+    ticks = itertools.cycle((moves, restores))
+
+    def watch_tick():
+        for ex, name, bid, ask in next(ticks):
+            board.set_quote(ex, name, bid, ask)
+        return watcher.update(quick_prices)
+
+    bench.measure('watch update (1% moved)', len(moves), watch_tick)
+
+    # PrettyTable на десятки тисяч рядків — хвилини; міряємо на обмеженій вибірці
+    to_print = dict(list(candidates.items())[:max_print])
+    bench.measure('print quick candidates', len(to_print), partial(
+        print_candidates_table, to_print, quick_prices, MIN_SPREAD_PERCENT, MAX_SPREAD_PERCENT))
+
+    # Стакани є лише для справжніх бірж — URL у їхніх адаптерах
+    to_verify = {}
+    for pair, entry in candidates.items():
+        buys = [ex for ex in entry['buy'] if ex in REAL_EXCHANGES]
+        sells = [ex for ex in entry['sell'] if ex in REAL_EXCHANGES]
+        if buys and sells:
+            to_verify[pair] = {'buy': buys, 'sell': sells}
+        if len(to_verify) >= max_verify:
+            break
+    routes = sum(len(e['buy']) * len(e['sell']) for e in to_verify.values())
+    http = FixtureHttp(market=market)
+
+    async def verify():
+        # свіжий verifier на кожен повтор, щоб DepthCache не ховав вартість запитів
+        return await ArbitrageVerifier(http).run(to_verify, MIN_SPREAD_PERCENT, MAX_SPREAD_PERCENT)
+
+    await bench.measure_async('order book analysis', routes, verify)
+
+    # Локальний стакан: застосування diff-оновлень і читання DepthBook з пам'яті
+    frames, snapshot = synthetic_diffs(20000, seed)
+    stream = DEPTH_STREAMS['BINANCE']()
+    engine = await replay_diffs('BINANCE', 'SYNUSDT', frames[:1], json.dumps(snapshot).encode())
+    book = engine.books[('BINANCE', 'SYNUSDT')]
+
+    def apply_diffs():
+        # кожен повтор — з того самого знімка, інакше кадри вже «старі»
+        book.load_snapshot(0, snapshot['bids'], snapshot['asks'])
+        for frame in frames:
+            engine.handle_message(stream, frame)
+
+    bench.measure('local book diffs', len(frames), apply_diffs)
+    bench.measure('local book reads', 10000, lambda: [engine.depth('BINANCE', 'SYNUSDT') for _ in range(10000)])
+
+
+def baseline_key(stage, args):
+    return stage if stage.startswith('fixture ') else f"{stage} @ {args.symbols}x{args.exchanges}"
+
+
+def report(bench, args):
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    table = PrettyTable()
+    table.field_names = ["Stage", "Items", "Median ms", "p95 ms", "Items/s", "vs baseline"]
+    table.align = 'r'
+    table.align["Stage"] = 'l'
+    regressions = []
+    current = {}
+    for stage, items, timings in bench.results:
+        median = statistics.median(timings)
+        p95 = sorted(timings)[min(int(len(timings) * 0.95), len(timings) - 1)]
+        key = baseline_key(stage, args)
+        current[key] = median * 1000
+        previous = baseline.get(key)
+        if previous:
+            change = median * 1000 / previous - 1
+            verdict = f"{change:+.0%}"
+            if change > args.tolerance:
+                regressions.append((stage, previous, median * 1000))
+                verdict += " REGRESSION"
+        else:
+            verdict = "new"
+        table.add_row([stage, items, f"{median * 1000:.2f}", f"{p95 * 1000:.2f}",
+                       f"{items / median:,.0f}" if median else "-", verdict])
+    print(f"JSON backend: {JSON_BACKEND}, repeat: {args.repeat}")
+    print(table)
+
+    if args.save_baseline:
+        baseline.update(current)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    for stage, previous, now in regressions:
+        print(f"Regression: {stage} {previous:.2f} ms -> {now:.2f} ms (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+async def main(args):
+    bench = Bench(args.repeat)
+    if not args.skip_fixtures:
+        await run_fixtures(bench, args.fixtures)
+        await run_diff_fixtures(bench, args.fixtures)
+        await run_replay_checks(args.fixtures)
+    await run_synthetic(bench, args.symbols, args.exchanges, args.max_verify, args.max_print, args.seed)
+    return report(bench, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the scan hot paths")
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--exchanges', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-verify', type=int, default=500, help="candidate pairs to verify by order book")
+    parser.add_argument('--max-print', type=int, default=2000, help="candidate pairs to print as a table")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--skip-fixtures', action='store_true')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown vs baseline median")
+    sys.exit(asyncio.run(main(parser.parse_args())))
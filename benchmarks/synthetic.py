@@ -0,0 +1,122 @@
+"""
+Синтетичний ринок для бенчмарків: N символів × E бірж у форматах справжніх API.
+Біржі понад чотири справжні (EX4, EX5, ...) по черзі повторюють формати Binance, KuCoin, MEXC і OKX.
+"""
+import random
+
+from utils.json_decode import loads
+from utils.symbols import registry
+
+try:
+    import orjson
+
+    def dumps(data):
+        return orjson.dumps(data)
+except ImportError:
+    import json
+
+    def dumps(data):
+        return json.dumps(data, separators=(',', ':')).encode()
+
+REAL_EXCHANGES = ('BINANCE', 'KUCOIN', 'MEXC', 'OKX')
+FORMATS = ('binance', 'kucoin', 'mexc', 'okx')
+
+
+def exchange_names(count):
+    return list(REAL_EXCHANGES[:count]) + [f"EX{i}" for i in range(len(REAL_EXCHANGES), count)]
+
+
+def native_symbol(fmt, base, quote):
+    return f"{base}-{quote}" if fmt in ('kucoin', 'okx') else base + quote
+
+
+def price_text(value):
+    return f"{value:.8g}"
+
+
+class SyntheticMarket:
+    """
+    payloads[exchange] — сирі bytes відповідей, як їх повертає біржа:
+    'bookTicker', 'price', '24hr' для форматів binance/mexc і 'tickers' (один масовий тікер) для kucoin/okx.
+    Усі символи реєструються в SymbolRegistry, як після завантаження exchangeInfo.
+    """
+
+    def __init__(self, symbols=5000, exchanges=3, coverage=0.8, noise=0.02, seed=42):
+        rng = random.Random(seed)
+        self.exchanges = exchange_names(exchanges)
+        self.formats = {ex: FORMATS[i % len(FORMATS)] for i, ex in enumerate(self.exchanges)}
+        self.assets = []
+        for i in range(symbols):
+            # кожен десятий — до BTC, щоб фільтр стейблкоїнів мав що відкидати
+            quote = 'BTC' if i % 10 == 9 else 'USDT'
+            mid = 10 ** rng.uniform(-4, 4) if quote == 'USDT' else 10 ** rng.uniform(-8, -2)
+            self.assets.append((f"C{i}", quote, mid))
+
+        self.spot_pairs = {ex: set() for ex in self.exchanges}
+        self.prices = {}  # {exchange: {canonical: (bid, ask, last, volume)}}
+        self.payloads = {}
+        for ex in self.exchanges:
+            fmt = self.formats[ex]
+            quotes = {}
+            for base, quote, mid in self.assets:
+                if rng.random() > coverage:
+                    continue
+                price = mid * (1 + rng.uniform(-noise, noise))
+                half_spread = price * rng.uniform(0.0001, 0.001)
+                native = native_symbol(fmt, base, quote)
+                name = registry.register(ex, native, base, quote)
+                self.spot_pairs[ex].add(name)
+                quotes[native] = (price - half_spread, price + half_spread, price, rng.uniform(1e3, 1e7))
+                self.prices.setdefault(ex, {})[name] = quotes[native]
+            self.payloads[ex] = self.build_payloads(fmt, quotes)
+
+    @staticmethod
+    def build_payloads(fmt, quotes):
+        if fmt == 'kucoin':
+            ticker = [
+                {'symbol': s, 'symbolName': s, 'buy': price_text(b), 'sell': price_text(a),
+                 'last': price_text(p), 'vol': price_text(v), 'changeRate': '0'}
+                for s, (b, a, p, v) in quotes.items()
+            ]
+            return {'tickers': dumps({'code': '200000', 'data': {'time': 0, 'ticker': ticker}})}
+        if fmt == 'okx':
+            data = [
+                {'instType': 'SPOT', 'instId': s, 'bidPx': price_text(b), 'askPx': price_text(a),
+                 'last': price_text(p), 'vol24h': price_text(v), 'ts': '0'}
+                for s, (b, a, p, v) in quotes.items()
+            ]
+            return {'tickers': dumps({'code': '0', 'msg': '', 'data': data})}
+        return {
+            'bookTicker': dumps([
+                {'symbol': s, 'bidPrice': price_text(b), 'bidQty': '1', 'askPrice': price_text(a), 'askQty': '1'}
+                for s, (b, a, p, v) in quotes.items()
+            ]),
+            'price': dumps([{'symbol': s, 'price': price_text(p)} for s, (b, a, p, v) in quotes.items()]),
+            '24hr': dumps([
+                {'symbol': s, 'lastPrice': price_text(p), 'bidPrice': price_text(b), 'askPrice': price_text(a),
+                 'volume': price_text(v), 'count': 1}
+                for s, (b, a, p, v) in quotes.items()
+            ]),
+        }
+
+    def ticker_count(self):
+        return sum(len(prices) for prices in self.prices.values())
+
+    def depth_payload(self, exchange, symbol, levels=5):
+        """Стакан у форматі біржі навколо синтетичного bid/ask, або None, якщо символу немає."""
+        quote = self.prices.get(exchange, {}).get(symbol)
+        if quote is None:
+            return None
+        bid, ask = quote[0], quote[1]
+        step = (ask - bid) / 2 or bid * 1e-4
+        bids = [[price_text(bid - i * step), '1'] for i in range(levels)]
+        asks = [[price_text(ask + i * step), '1'] for i in range(levels)]
+        if self.formats[exchange] == 'kucoin':
+            return dumps({'code': '200000', 'data': {'bestBid': bids[0][0], 'bestAsk': asks[0][0],
+                                                      'bids': bids, 'asks': asks}})
+        if self.formats[exchange] == 'okx':
+            return dumps({'code': '0', 'msg': '', 'data': [{'bids': bids, 'asks': asks, 'ts': '0'}]})
+        return dumps({'lastUpdateId': 1, 'bids': bids, 'asks': asks})
+
+    def decoded(self, exchange, kind):
+        return loads(self.payloads[exchange][kind])
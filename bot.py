@@ -1,29 +1,54 @@
 import asyncio
-import aiohttp
+import time
 
-from utils.logger import log
-from utils.constants import MIN_SPREAD_PERCENT, MAX_SPREAD_PERCENT, EXCHANGES
+from utils.logger import log, log_spread, log_enabled, DEBUG
+from utils.constants import MIN_SPREAD_PERCENT, MAX_SPREAD_PERCENT, EXCHANGES, HTTP_WARMUP, QUOTE_STREAMING, QUOTE_STREAM_WARMUP, WATCH_INTERVAL, EXCHANGE_METADATA_CACHE_TTL, METRICS_PORT, METRICS_SUMMARY_INTERVAL, TICK_RECORDING, SPREAD_LIFETIME_TRACKING, SPREADS_LOG, LOCAL_ORDER_BOOKS
 from utils.helpers import is_stablecoin_pair
+from utils.metadata_cache import load_metadata_cache, save_metadata_cache
+from utils.symbols import registry as symbol_registry
+from utils.spans import Tracer, profile_cycle
+from utils.tick_store import TickRecorder
 
+from api.http_client import HttpClient
 from api.spot_api import SpotAPI
 from api.futures_api import FuturesAPI
-from core.quick_price import fetch_last_prices, fetch_quick_prices, find_candidates_by_last_price, find_candidates_by_quick_prices_all
-from core.analyzer import analyze_arbitrage_opportunities
+from api.quote_stream import QuoteEngine
+from api.depth_stream import OrderBookEngine
+from api.market_snapshot import MarketSnapshot
+from api.http_trace import log_http_summary, start_metrics_server
+from core.quick_price import find_candidates_by_last_price, find_candidates_by_quick_prices_all
+from core.analyzer import ArbitrageVerifier
+from core.watcher import SpreadWatcher
+from core.spread_lifetime import SpreadLifetimeTracker, SpreadLifetimeLog
 from core.printer import print_candidates_by_last_price, print_candidates_table, print_arbitrage_opportunities
 
 
 class ArbitrageBot:
-    def __init__(self):
+    def __init__(self, profile=False):
         self.exchanges = EXCHANGES
         self.min_spread_percent = MIN_SPREAD_PERCENT
         self.max_spread_percent = MAX_SPREAD_PERCENT
-        self.session = None
+        self.http = HttpClient()
 
-        self.spot_api = SpotAPI()
-        self.futures_api = FuturesAPI()
+        self.spot_api = SpotAPI(self.http, self.exchanges)
+        self.futures_api = FuturesAPI(self.http, self.exchanges)
+        # Локальні стакани з diff-depth стрімів — лише для кандидатів режиму спостереження
+        self.order_books = OrderBookEngine(self.http) if LOCAL_ORDER_BOOKS else None
+        self.verifier = ArbitrageVerifier(self.http, order_books=self.order_books)
+        self.recorder = TickRecorder() if TICK_RECORDING else None  # котировки і спреди у сховище тиків
+        self.lifetime_log = SpreadLifetimeLog()
+        self.lifetimes = SpreadLifetimeTracker(MIN_SPREAD_PERCENT, MAX_SPREAD_PERCENT, sink=self.lifetime_log) \
+            if SPREAD_LIFETIME_TRACKING else None
+        self.quote_engine = QuoteEngine(self.http, recorder=self.recorder, lifetimes=self.lifetimes) \
+            if QUOTE_STREAMING else None
+        self.watch_snapshot = None  # MarketSnapshot з постійним QuoteBoard для REST-режиму спостереження
 
         self.spot_pairs = {ex: set() for ex in self.exchanges}
         self.futures_pairs = {ex: set() for ex in self.exchanges}
+        self.metadata_refresh = None
+        self.metadata_loaded_at = time.monotonic()
+        self.tracer = Tracer(request_counter=lambda: self.http.requests_sent)
+        self.profile = profile  # True — перший цикл під cProfile, результат у PROFILE_DIR
 
         # Закоментовано, бо тут поки пусто
         # for ex, pairs in self.spot_pairs.items():
@@ -34,41 +59,122 @@ class ArbitrageBot:
         #     log(f"[Debug] {ex} futures pairs count: {len(pairs)}")
         #     log(f"[Debug] {ex} futures pairs sample: {list(pairs)[:5]}")
 
+    async def load_pairs(self):
+        cached = load_metadata_cache()
+        # кеш без якоїсь із бірж EXCHANGES (біржу щойно додано) — вантажимо все заново
+        if cached is None or set(self.exchanges) - set(cached['spot']):
+            await self.refresh_pairs()
+            return
+
+        # Старт із кешу на диску, свіжі списки довантажуються у фоні
+        symbol_registry.load(cached['symbols'])
+        self.spot_api.spot_pairs = cached['spot']
+        self.futures_api.futures_pairs = cached['futures']
+        self.spot_pairs = self.spot_api.spot_pairs
+        self.futures_pairs = self.futures_api.futures_pairs
+        log(f"[Info] Spot and futures pairs loaded from cache ({cached['age'] / 60:.0f} min old)")
+        self.log_pairs()
+        self.metadata_refresh = asyncio.create_task(self.refresh_pairs())
+
+    async def refresh_pairs(self):
+        # Load pairs
+        await self.spot_api.load_all_pairs()
+        log(f"[Info] Spot pairs loaded")
+        await self.futures_api.load_futures_pairs()
+        log(f"[Info] Futures pairs loaded")
+
+        # Різниця застосовується разом: обидва списки підміняються між двома await
+        self.log_pairs_diff(self.spot_api.spot_pairs, self.futures_api.futures_pairs)
+        self.spot_pairs = self.spot_api.spot_pairs
+        self.futures_pairs = self.futures_api.futures_pairs
+        self.metadata_loaded_at = time.monotonic()
+        save_metadata_cache(self.spot_pairs, self.futures_pairs, symbol_registry.export())
+        self.log_pairs()
+
+    def log_pairs(self):
+        if not log_enabled(DEBUG):
+            return
+        # Логування після завантаження spot_pairs
+        for ex, pairs in self.spot_pairs.items():
+            log(f"[Debug] {ex} spot pairs count: {len(pairs)}")
+            log(f"[Debug] {ex} spot pairs sample: {list(pairs)[:5]}")
+
+        # Логування після завантаження futures_pairs
+        for ex, pairs in self.futures_pairs.items():
+            log(f"[Debug] {ex} futures pairs count: {len(pairs)}")
+            log(f"[Debug] {ex} futures pairs sample: {list(pairs)[:5]}")
+
+    def log_pairs_diff(self, spot_pairs, futures_pairs):
+        for kind, old, new in (('spot', self.spot_pairs, spot_pairs), ('futures', self.futures_pairs, futures_pairs)):
+            for ex, pairs in new.items():
+                added = pairs - old.get(ex, set())
+                removed = old.get(ex, set()) - pairs
+                if added or removed:
+                    log(f"[Info] {ex} {kind} pairs: +{len(added)} / -{len(removed)}")
+
+    def tracked_symbols(self):
+        # Символи, що торгуються на споті хоча б однієї біржі; None — ще нічого не завантажено
+        tracked = set().union(*self.spot_pairs.values())
+        return tracked or None
+
+    def maybe_refresh_pairs(self):
+        # У режимі спостереження метадані оновлюються у фоні раз на EXCHANGE_METADATA_CACHE_TTL
+        if self.metadata_refresh is not None and not self.metadata_refresh.done():
+            return
+        if time.monotonic() - self.metadata_loaded_at > EXCHANGE_METADATA_CACHE_TTL:
+            self.metadata_loaded_at = time.monotonic()
+            self.metadata_refresh = asyncio.create_task(self.refresh_pairs())
+
     async def start(self):
-        timeout = aiohttp.ClientTimeout(total=60)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            self.session = session
+        async with self.http:
             log("[Start] Starting arbitrage bot")
+            metrics_server = await start_metrics_server(METRICS_PORT, breakers=self.http.breakers) \
+                if METRICS_PORT else None
+            if self.recorder:
+                self.recorder.start()
+            if HTTP_WARMUP:
+                await self.http.warmup()
 
-            # Load pairs
-            await self.spot_api.load_all_pairs()
-            self.spot_pairs = self.spot_api.spot_pairs
-            log(f"[Info] Spot pairs loaded")
+            if self.profile:
+                with profile_cycle(label='scan'):
+                    await self.run_cycle()
+            else:
+                await self.run_cycle()
+            self.tracer.report()
+            log_http_summary()
 
-            # Логування після завантаження spot_pairs
-            for ex, pairs in self.spot_pairs.items():
-                log(f"[Debug] {ex} spot pairs count: {len(pairs)}")
-                log(f"[Debug] {ex} spot pairs sample: {list(pairs)[:5]}")
+            if self.quote_engine:
+                await self.quote_engine.stop()
+            # Фонове оновлення метаданих має встигнути записати кеш для наступного запуску
+            if self.metadata_refresh is not None:
+                await self.metadata_refresh
+            if metrics_server is not None:
+                await metrics_server.cleanup()
+            self.close_recorder()
+            self.close_lifetimes()
 
-            await self.futures_api.load_futures_pairs()
-            self.futures_pairs = self.futures_api.futures_pairs
-            log(f"[Info] Futures pairs loaded")
+    async def run_cycle(self):
+        with self.tracer.span('pairs') as span:
+            await self.load_pairs()
+            span.count(spot=sum(map(len, self.spot_pairs.values())),
+                       futures=sum(map(len, self.futures_pairs.values())))
 
-            # Логування після завантаження futures_pairs
-            for ex, pairs in self.futures_pairs.items():
-                log(f"[Debug] {ex} futures pairs count: {len(pairs)}")
-                log(f"[Debug] {ex} futures pairs sample: {list(pairs)[:5]}")
+        # Один знімок ринку на цикл: last і quick prices з тих самих payload
+        with self.tracer.span('market snapshot') as span:
+            snapshot = await MarketSnapshot(self.http).refresh(self.exchanges, tracked=self.tracked_symbols())
+            if self.recorder:
+                self.recorder.record_board(snapshot.board)
 
-            # Fetch last prices & find candidates by last price
-            log(">>> About to call fetch_last_prices")
-            last_prices = await fetch_last_prices(self.exchanges)
-            log(">>> fetch_last_prices returned")
+        # Fetch last prices & find candidates by last price
+        last_prices = snapshot.last_prices()
 
+        if log_enabled(DEBUG):
             for ex, prices in last_prices.items():
                 log(f"[Debug] {ex} last_prices count: {len(prices)}")
                 sample = list(prices.items())[:5]
                 log(f"[Debug] {ex} sample last prices: {sample}")
 
+        with self.tracer.span('last-price candidates') as span:
             candidates_last = find_candidates_by_last_price(
                 last_prices,
                 self.spot_pairs,
@@ -77,31 +183,200 @@ class ArbitrageBot:
                 self.min_spread_percent,
                 self.max_spread_percent
             )
-            log(f"[Info] Candidates from last prices: {len(candidates_last)}")
+            span.count(candidates=len(candidates_last))
+        log(f"[Info] Candidates from last prices: {len(candidates_last)}")
+        with self.tracer.span('print last-price candidates'):
             print_candidates_by_last_price(candidates_last, last_prices, self.min_spread_percent,
                                            self.max_spread_percent)
 
-            # Fetch quick prices & filter candidates by bid/ask spread
-            quick_prices = await fetch_quick_prices(self.exchanges)
-            log(f"[Info] Quick prices fetched")
+        # Fetch quick prices & filter candidates by bid/ask spread
+        with self.tracer.span('quick prices') as span:
+            if self.quote_engine:
+                quick_prices = await self.stream_quick_prices()
+            else:
+                quick_prices = snapshot.quick_prices()
+            span.count(quotes=sum(map(len, quick_prices.values())))
+        log(f"[Info] Quick prices fetched")
 
+        with self.tracer.span('quick candidates') as span:
             candidates_quick = find_candidates_by_quick_prices_all(
                 quick_prices,
                 self.min_spread_percent,
                 self.max_spread_percent
             )
-            log(f"[Info] Candidates from quick prices (filtered): {len(candidates_quick)}")
+            span.count(candidates=len(candidates_quick))
+        log(f"[Info] Candidates from quick prices (filtered): {len(candidates_quick)}")
+        with self.tracer.span('print quick candidates'):
             print_candidates_table(candidates_quick, quick_prices, self.min_spread_percent, self.max_spread_percent)
 
-            # Analyze arbitrage opportunities deeper if хочеш
-            results, _ = await analyze_arbitrage_opportunities(
+        # Analyze arbitrage opportunities deeper if хочеш
+        # Результати друкуються одразу по мірі перевірки, таблиця — в кінці
+        results = []
+        with self.tracer.span('order book analysis', candidates=len(candidates_quick)) as span:
+            async for pair, buy_ex, sell_ex, res in self.verifier.stream(
                 candidates_quick,
                 self.min_spread_percent,
                 self.max_spread_percent
-            )
-            # Потрібно імпортувати print_arbitrage_opportunities
+            ):
+                if res:
+                    results.append(res)
+                    log(f"[Found] {pair}: buy {buy_ex} at {res['buy_price']:.8f}, "
+                        f"sell {sell_ex} at {res['sell_price']:.8f}, spread {res['spread']:.4f}%, "
+                        f"executable up to {res['max_notional']:.2f}")
+                    self.record_spread(pair, buy_ex, sell_ex, res)
+            span.count(opportunities=len(results))
+        cache_stats = self.verifier.depth_cache.stats()
+        log(f"[Info] Depth cache: {cache_stats['hits']} hits, {cache_stats['coalesced']} coalesced, "
+            f"{cache_stats['misses']} misses (hit rate {cache_stats['hit_rate']:.0%})")
+        if self.verifier.rejected_by_depth:
+            log(f"[Info] Rejected by depth: {self.verifier.rejected_by_depth} routes below "
+                f"{self.min_spread_percent}% at {self.verifier.target_notional} notional")
+        for endpoint, stats in self.verifier.policy.stats().items():
+            log(f"[Info] {endpoint}: {stats['requests']} requests, {stats['retries']} retries, "
+                f"{stats['hedges']} hedges ({stats['hedge_wins']} won), {stats['failures']} failed")
+        for host, stats in self.http.rate_limiter.stats().items():
+            if stats['throttled']:
+                log(f"[Info] {host}: {stats['throttled']}/{stats['granted']} requests waited for rate limit")
+        self.log_degraded()
+        # Потрібно імпортувати print_arbitrage_opportunities
+        with self.tracer.span('print opportunities'):
             print_arbitrage_opportunities(results)
 
+    def record_spread(self, pair, buy_ex, sell_ex, res):
+        if SPREADS_LOG:
+            base = symbol_registry.split(pair)[0] or pair
+            log_spread(base, buy_ex, res['buy_price'], sell_ex, res['sell_price'], res['spread'])
+        if self.recorder:
+            self.recorder.record_spread(pair, buy_ex, sell_ex, res['buy_price'], res['sell_price'])
+
+    def close_recorder(self):
+        if self.recorder:
+            self.recorder.close()
+            log(f"[Info] Tick store: {self.recorder.recorded} rows written to {self.recorder.directory}")
+
+    def close_lifetimes(self):
+        if self.lifetimes:
+            self.lifetimes.close_all(time.time())
+            stats = self.lifetimes.stats()
+            log(f"[Info] Spread lifetimes: {stats['opened']} episodes from {stats['updates']} quote updates")
+            self.lifetime_log.close()
+
+    def hot_symbols(self, watcher):
+        # Для кожної біржі — пари, де вона є стороною купівлі або продажу кандидата
+        hot = {}
+        for pair, candidate in watcher.candidates.items():
+            for ex in candidate['buy'] + candidate['sell']:
+                hot.setdefault(ex, set()).add(pair)
+        return hot
+
+    def log_order_books(self):
+        if self.order_books:
+            stats = self.order_books.stats()
+            log(f"[Info] Local order books: {stats['synced']}/{stats['books']} synced, {stats['updates']} updates, "
+                f"{stats['gaps']} gaps, {stats['resyncs']} resyncs, {self.verifier.local_hits} reads from memory")
+
+    def log_degraded(self):
+        # Біржі з відкритим circuit breaker: цикл іде без них, поки проба не закриє breaker
+        for ex, family, state in self.http.breakers.degraded():
+            stats = self.http.breakers.get(ex, family)
+            log(f"[Info] Degraded mode: {ex} {family} circuit {state} ({stats.rejected} requests skipped)")
+
+    async def stream_quick_prices(self):
+        # Котировки з WebSocket-стрімів у тій самій формі, що й fetch_quick_prices
+        if not self.quote_engine.tasks:
+            self.quote_engine.start(self.spot_pairs)
+            await self.quote_engine.wait_ready(QUOTE_STREAM_WARMUP)
+        return self.quote_engine.quotes
+
+    async def watch(self, interval=WATCH_INTERVAL):
+        """
+        Режим спостереження: метадані пар вантажаться один раз, далі кожен тік
+        перераховує спред тільки для символів зі зміненими котировками.
+        """
+        async with self.http:
+            log("[Start] Starting arbitrage bot in watch mode")
+            metrics_server = await start_metrics_server(METRICS_PORT, breakers=self.http.breakers) \
+                if METRICS_PORT else None
+            if self.recorder:
+                self.recorder.start()
+            if HTTP_WARMUP:
+                await self.http.warmup()
+            await self.load_pairs()
+
+            watcher = SpreadWatcher(self.min_spread_percent, self.max_spread_percent)
+            summary_at = time.monotonic() + METRICS_SUMMARY_INTERVAL
+            try:
+                while True:
+                    started = time.monotonic()
+                    self.maybe_refresh_pairs()
+                    if self.profile:
+                        # профілюється лише перший тік — далі режим працює без накладних витрат
+                        self.profile = False
+                        with profile_cycle(label='watch-tick'):
+                            await self.watch_tick(watcher)
+                    else:
+                        await self.watch_tick(watcher)
+                    if started >= summary_at:
+                        self.tracer.report()
+                        log_http_summary()
+                        self.log_order_books()
+                        summary_at = started + METRICS_SUMMARY_INTERVAL
+                    await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+            finally:
+                if metrics_server is not None:
+                    await metrics_server.cleanup()
+                if self.metadata_refresh is not None:
+                    self.metadata_refresh.cancel()
+                if self.quote_engine:
+                    await self.quote_engine.stop()
+                if self.order_books:
+                    await self.order_books.stop()
+                self.close_recorder()
+                self.close_lifetimes()
+
+    async def watch_tick(self, watcher):
+        with self.tracer.span('quick prices'):
+            if self.quote_engine:
+                quick_prices = await self.stream_quick_prices()
+                dirty = self.quote_engine.drain_dirty()
+            else:
+                # Один QuoteBoard на весь режим спостереження: знімок оновлюється на місці
+                if self.watch_snapshot is None:
+                    self.watch_snapshot = MarketSnapshot(self.http)
+                await self.watch_snapshot.refresh(self.exchanges, tracked=self.tracked_symbols(), with_last=False)
+                quick_prices = self.watch_snapshot.quick_prices()
+                dirty = None
+                if self.recorder:
+                    self.recorder.record_board(self.watch_snapshot.board)
+                if self.lifetimes:
+                    self.lifetimes.observe_board(self.watch_snapshot.board, time.time())
+
+        self.log_degraded()
+        with self.tracer.span('candidate update') as span:
+            changed = watcher.update(quick_prices, dirty)
+            span.count(changed=len(changed), tracked=len(watcher.candidates))
+        if self.order_books:
+            self.order_books.watch(self.hot_symbols(watcher))
+        if not changed:
+            return
+        log(f"[Info] Re-checking {len(changed)} changed candidates ({len(watcher.candidates)} tracked)")
+
+        to_verify = {pair: watcher.candidates[pair] for pair in changed}
+        with self.tracer.span('order book analysis', candidates=len(to_verify)):
+            async for pair, buy_ex, sell_ex, res in self.verifier.stream(
+                to_verify,
+                self.min_spread_percent,
+                self.max_spread_percent
+            ):
+                watcher.record(pair, buy_ex, sell_ex, res)
+                if res:
+                    log(f"[Found] {pair}: buy {buy_ex} at {res['buy_price']:.8f}, "
+                        f"sell {sell_ex} at {res['sell_price']:.8f}, spread {res['spread']:.4f}%, "
+                        f"executable up to {res['max_notional']:.2f}")
+                    self.record_spread(pair, buy_ex, sell_ex, res)
+        with self.tracer.span('print opportunities'):
+            print_arbitrage_opportunities(watcher.all_opportunities())
+
 
 if __name__ == "__main__":
     asyncio.run(ArbitrageBot().start())
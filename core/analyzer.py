@@ -1,38 +1,141 @@
+import asyncio
+from functools import partial
+
 from api.orderbook_api import fetch_order_book_price
+from api.depth_cache import DepthCache
+from api.request_policy import RequestPolicy
+from utils.constants import (
+    VERIFY_MAX_CONCURRENCY,
+    VERIFY_EXCHANGE_CONCURRENCY,
+    VERIFY_DEFAULT_EXCHANGE_CONCURRENCY,
+    DEPTH_TARGET_NOTIONAL,
+)
+from utils.depth_book import executable_spread
+from utils.helpers import is_stablecoin_pair
+
+
+class ArbitrageVerifier:
+    """
+    Паралельна перевірка кандидатів по orderbook.
+    Обидві сторони угоди запитуються одночасно; кількість запитів в польоті
+    обмежена глобально і окремо для кожної біржі.
+    Однакові запити (exchange, pair) з різних комбінацій бірж обслуговує DepthCache.
+    Повтори, hedging і дедлайни запитів стакану — у RequestPolicy.
+    Якщо передано order_books, синхронізовані локальні стакани беруться з пам'яті без HTTP.
+    Спред перевіряється і на верхівці стакану, і за VWAP на target_notional (utils/depth_book.py).
+    """
+
+    def __init__(self, http, max_concurrency=VERIFY_MAX_CONCURRENCY,
+                 exchange_concurrency=VERIFY_EXCHANGE_CONCURRENCY, depth_cache=None, policy=None,
+                 target_notional=DEPTH_TARGET_NOTIONAL, order_books=None):
+        self.http = http
+        self.order_books = order_books  # OrderBookEngine: синхронізовані стакани читаються з пам'яті
+        self.local_hits = 0
+        self.target_notional = target_notional
+        self.rejected_by_depth = 0  # пари зі спредом на верхівці, але не на target_notional
+        self.depth_cache = depth_cache if depth_cache is not None else DepthCache()
+        self.policy = policy if policy is not None else RequestPolicy()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.exchange_concurrency = exchange_concurrency
+        self.exchange_semaphores = {}
+
+    def exchange_semaphore(self, exchange):
+        if exchange not in self.exchange_semaphores:
+            limit = self.exchange_concurrency.get(exchange, VERIFY_DEFAULT_EXCHANGE_CONCURRENCY)
+            self.exchange_semaphores[exchange] = asyncio.Semaphore(limit)
+        return self.exchange_semaphores[exchange]
+
+    async def fetch_book(self, exchange, pair):
+        if self.order_books is not None:
+            book = self.order_books.depth(exchange, pair)
+            if book is not None:
+                self.local_hits += 1
+                return book
+        return await self.depth_cache.get(exchange, pair, partial(self.request_book, exchange, pair))
+
+    async def request_book(self, exchange, pair):
+        # Спочатку ліміт біржі, потім глобальний: повільна біржа не тримає глобальні слоти
+        async with self.exchange_semaphore(exchange):
+            async with self.semaphore:
+                return await fetch_order_book_price(exchange, pair, self.http, self.policy)
+
+    async def analyze_pair(self, pair, buy_ex, sell_ex, min_spread_percent, max_spread_percent):
+        sell_book, buy_book = await asyncio.gather(
+            self.fetch_book(sell_ex, pair),
+            self.fetch_book(buy_ex, pair),
+        )
+
+        if sell_book is None or buy_book is None:
+            return None
+        sell_bid, buy_ask = sell_book.bid, buy_book.ask
+        if sell_bid is None or buy_ask is None:
+            return None
+
+        spread = (sell_bid - buy_ask) / buy_ask * 100
+        if spread < min_spread_percent or spread > max_spread_percent:
+            return None
+
+        # Обсяг у котирувальній валюті має сенс лише для стейблкоїнів; для BTC/ETH-пар — тільки max_notional
+        target = self.target_notional if is_stablecoin_pair(pair) else None
+        depth = executable_spread(buy_book, sell_book, min_spread_percent, target)
+        if target and (depth['spread'] is None or depth['spread'] < min_spread_percent):
+            # на верхівці стакану спред є, але на target_notional — ні (або глибини не вистачає)
+            self.rejected_by_depth += 1
+            return None
+
+        return {
+            'pair': pair,
+            'buy_ex': buy_ex,
+            'sell_ex': sell_ex,
+            'buy_price': buy_ask,
+            'sell_price': sell_bid,
+            'spread': spread,
+            'buy_vwap': depth['buy_vwap'],
+            'sell_vwap': depth['sell_vwap'],
+            'executable_spread': depth['spread'],
+            'target_notional': target,
+            'max_notional': depth['max_notional'],
+        }
+
+    async def stream(self, candidate_pairs, min_spread_percent, max_spread_percent):
+        """
+        Асинхронний генератор: віддає (pair, buy_ex, sell_ex, result) у порядку завершення.
+        result — dict можливості або None, якщо пара не пройшла перевірку.
+        """
+        async def verify(pair, buy_ex, sell_ex):
+            res = await self.analyze_pair(pair, buy_ex, sell_ex, min_spread_percent, max_spread_percent)
+            return pair, buy_ex, sell_ex, res
+
+        tasks = [
+            asyncio.create_task(verify(pair, buy_ex, sell_ex))
+            for pair, ex_dict in candidate_pairs.items()
+            for buy_ex in ex_dict.get('buy', [])
+            for sell_ex in ex_dict.get('sell', [])
+            if buy_ex != sell_ex
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run(self, candidate_pairs, min_spread_percent, max_spread_percent):
+        results = []
+        excluded = []
+        async for pair, buy_ex, sell_ex, res in self.stream(candidate_pairs, min_spread_percent, max_spread_percent):
+            if res:
+                results.append(res)
+            else:
+                excluded.append((pair, buy_ex, sell_ex))
+        return results, excluded
+
+
+async def analyze_pair(pair, buy_ex, sell_ex, min_spread_percent, max_spread_percent, http):
+    verifier = ArbitrageVerifier(http)
+    return await verifier.analyze_pair(pair, buy_ex, sell_ex, min_spread_percent, max_spread_percent)
 
 
-async def analyze_pair(pair, buy_ex, sell_ex, min_spread_percent, max_spread_percent):
-    sell_bid, sell_ask = await fetch_order_book_price(sell_ex, pair)
-    buy_bid, buy_ask = await fetch_order_book_price(buy_ex, pair)
-
-    if sell_bid is None or buy_ask is None:
-        return None
-
-    spread = (sell_bid - buy_ask) / buy_ask * 100
-    if spread < min_spread_percent or spread > max_spread_percent:
-        return None
-
-    return {
-        'pair': pair,
-        'buy_ex': buy_ex,
-        'sell_ex': sell_ex,
-        'buy_price': buy_ask,
-        'sell_price': sell_bid,
-        'spread': spread,
-    }
-
-
-async def analyze_arbitrage_opportunities(candidate_pairs, min_spread_percent, max_spread_percent):
-    results = []
-    excluded = []
-    for pair, ex_dict in candidate_pairs.items():
-        for buy_ex in ex_dict.get('buy', []):
-            for sell_ex in ex_dict.get('sell', []):
-                if buy_ex == sell_ex:
-                    continue
-                res = await analyze_pair(pair, buy_ex, sell_ex, min_spread_percent, max_spread_percent)
-                if res:
-                    results.append(res)
-                else:
-                    excluded.append((pair, buy_ex, sell_ex))
-    return results, excluded
+async def analyze_arbitrage_opportunities(candidate_pairs, min_spread_percent, max_spread_percent, http):
+    verifier = ArbitrageVerifier(http)
+    return await verifier.run(candidate_pairs, min_spread_percent, max_spread_percent)
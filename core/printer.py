@@ -1,5 +1,7 @@
 from prettytable import PrettyTable
 
+from utils.logger import echo
+
 
 def print_candidates_by_last_price(candidates, last_prices, min_spread_percent, max_spread_percent):
     """
@@ -7,7 +9,7 @@ def print_candidates_by_last_price(candidates, last_prices, min_spread_percent,
     last_prices — це словник {exchange: {pair: price}}.
     """
     if not candidates:
-        print("🚫 No candidates found by last price.")
+        echo("🚫 No candidates found by last price.")
         return
     table = PrettyTable()
     table.field_names = ["Pair", "Buy Exchange", "Sell Exchange", "Buy Price", "Sell Price", "Approx Spread %"]
@@ -33,13 +35,13 @@ def print_candidates_by_last_price(candidates, last_prices, min_spread_percent,
                     f"{sell_price:.8f}",
                     f"{spread:.4f}"
                 ])
-    print("🟢 Candidates based on last prices:")
-    print(table)
+    echo("🟢 Candidates based on last prices:")
+    echo(table)
 
 
 def print_candidates_table(candidates, quick_prices, min_spread_percent, max_spread_percent):
     if not candidates:
-        print("🚫 No candidates found in quick prices.")
+        echo("🚫 No candidates found in quick prices.")
         return
     table = PrettyTable()
     table.field_names = ["Pair", "Buy Exchange", "Sell Exchange", "Buy Ask", "Sell Bid", "Approx Spread %"]
@@ -65,23 +67,28 @@ def print_candidates_table(candidates, quick_prices, min_spread_percent, max_spr
                     f"{sell_bid:.8f}",
                     f"{spread:.4f}"
                 ])
-    print("🟡 Candidates based on quick prices:")
-    print(table)
+    echo("🟡 Candidates based on quick prices:")
+    echo(table)
 
 
 def print_arbitrage_opportunities(opportunities):
     if not opportunities:
-        print("🚫 No arbitrage opportunities found.")
+        echo("🚫 No arbitrage opportunities found.")
         return
     table = PrettyTable()
-    table.field_names = ["Pair", "Buy Exchange", "Sell Exchange", "Buy Price", "Sell Price", "Spread %"]
+    table.field_names = ["Pair", "Buy Exchange", "Sell Exchange", "Buy Price", "Sell Price", "Spread %",
+                         "Exec Spread %", "Max Size"]
     for opp in opportunities:
+        executable = opp.get('executable_spread')
+        max_notional = opp.get('max_notional')
         table.add_row([
             opp['pair'],
             opp['buy_ex'],
             opp['sell_ex'],
             f"{opp['buy_price']:.8f}",
             f"{opp['sell_price']:.8f}",
-            f"{opp['spread']:.4f}"
+            f"{opp['spread']:.4f}",
+            f"{executable:.4f}" if executable is not None else "-",
+            f"{max_notional:.2f}" if max_notional is not None else "-"
         ])
-    print(table)
+    echo(table)
@@ -0,0 +1,142 @@
+import numpy as np
+
+from utils.logger import log, writer as log_writer
+from utils.symbols import registry
+from utils.constants import SPREAD_LIFETIME_LOG
+
+# Поля активного епізоду (список, а не dict — O(1) пам'яті на маршрут)
+OPENED_AT, LAST_AT, PEAK, PEAK_AT, SAMPLES = range(5)
+
+
+class SpreadLifetimeTracker:
+    """
+    Тривалість життя спредів по маршрутах (symbol, buy_ex, sell_ex).
+    Епізод відкривається, коли спред у межах [min_spread_percent, max_spread_percent], і закривається
+    першою котировкою, за якої він поза ними (або одна з цін зникла). Спред понад max_spread_percent —
+    колізія тикерів чи погані дані, як і в пошуку кандидатів. Час — з котировок, а не з опитування.
+    Закриті епізоди віддаються в sink(episode); активні зберігають лише кілька чисел.
+    """
+
+    def __init__(self, min_spread_percent, max_spread_percent, sink=None):
+        self.min_spread_percent = min_spread_percent
+        self.max_spread_percent = max_spread_percent
+        self.sink = sink
+        self.active = {}  # {(symbol_id, buy_row, sell_row): [opened_at, last_at, peak, peak_at, samples]}
+        self.board = None
+        self.updates = 0
+        self.opened = 0
+        self.closed = 0
+
+    def observe(self, board, exchange, symbol, ts):
+        """
+        Нова котировка exchange/symbol вже записана в board: перераховуються лише
+        маршрути, що її зачіпають — купівля і продаж на exchange проти кожної іншої біржі.
+        """
+        self.board = board
+        self.updates += 1
+        row = board.rows[exchange]
+        col = board.symbol_id(symbol)
+        bids = board.bids[:, col].tolist()
+        asks = board.asks[:, col].tolist()
+        for other in range(len(bids)):
+            if other != row:
+                self.sample((col, row, other), asks[row], bids[other], ts)
+                self.sample((col, other, row), asks[other], bids[row], ts)
+
+    def observe_board(self, board, ts):
+        """Весь знімок QuoteBoard векторно (REST-режим): маршрути поза знімком закриваються."""
+        self.board = board
+        bids = board.bids
+        asks = board.asks
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # spreads[buy, sell, symbol] = (bid продажу - ask купівлі) / ask купівлі
+            spreads = (bids[None, :, :] - asks[:, None, :]) / asks[:, None, :] * 100
+            inside = (spreads >= self.min_spread_percent) & (spreads <= self.max_spread_percent)
+        # Купівля й продаж на одній біржі — не маршрут (перехрещена чи застаріла книга однієї біржі)
+        inside &= ~np.eye(len(board.exchanges), dtype=bool)[:, :, None]
+        buys, sells, cols = np.nonzero(inside)
+        self.updates += int(np.count_nonzero(~np.isnan(bids)))
+        values = spreads[buys, sells, cols].tolist()
+        seen = set()
+        for buy, sell, col, spread in zip(buys.tolist(), sells.tolist(), cols.tolist(), values):
+            key = (col, buy, sell)
+            seen.add(key)
+            self.extend(key, spread, ts)
+        for key in [key for key in self.active if key not in seen]:
+            self.close(key, ts)
+
+    def sample(self, key, ask, bid, ts):
+        # NaN (відсутня ціна) не проходить жодного порівняння і закриває епізод
+        if ask > 0 and bid > ask:
+            spread = (bid - ask) / ask * 100
+            if self.min_spread_percent <= spread <= self.max_spread_percent:
+                self.extend(key, spread, ts)
+                return
+        if key in self.active:
+            self.close(key, ts)
+
+    def extend(self, key, spread, ts):
+        episode = self.active.get(key)
+        if episode is None:
+            self.active[key] = [ts, ts, spread, ts, 1]
+            self.opened += 1
+            return
+        episode[LAST_AT] = ts
+        episode[SAMPLES] += 1
+        if spread > episode[PEAK]:
+            episode[PEAK] = spread
+            episode[PEAK_AT] = ts
+
+    def close(self, key, ts, truncated=False):
+        episode = self.active.pop(key)
+        self.closed += 1
+        if self.sink is not None:
+            self.sink(self.describe(key, episode, ts, truncated))
+
+    def close_all(self, ts):
+        """Завершення роботи: активні епізоди віддаються з truncated=True."""
+        for key in list(self.active):
+            self.close(key, ts, truncated=True)
+
+    def describe(self, key, episode, closed_at, truncated=False):
+        col, buy, sell = key
+        return {
+            'pair': self.board.symbols.names[col],
+            'buy': self.board.exchanges[buy],
+            'sell': self.board.exchanges[sell],
+            'opened_at': episode[OPENED_AT],
+            'closed_at': closed_at,
+            'duration': closed_at - episode[OPENED_AT],
+            'peak': episode[PEAK],
+            'peak_at': episode[PEAK_AT],
+            'samples': episode[SAMPLES],
+            'truncated': truncated,
+        }
+
+    def stats(self):
+        return {'updates': self.updates, 'opened': self.opened, 'closed': self.closed, 'active': len(self.active)}
+
+
+class SpreadLifetimeLog:
+    """Sink, що дописує епізоди в spread_lifetime_log.txt у форматі 'BASE BUY->SELL: N сек (max spread: X%)'."""
+
+    def __init__(self, path=SPREAD_LIFETIME_LOG, symbols=registry):
+        self.path = path
+        self.symbols = symbols
+        self.written = 0
+
+    def __call__(self, episode):
+        # Рядок форматується і пишеться фоновим потоком логера
+        log_writer.submit(self.path, self.format, episode)
+        self.written += 1
+
+    def format(self, episode):
+        base = self.symbols.split(episode['pair'])[0] or episode['pair']
+        suffix = " [still open]" if episode['truncated'] else ""
+        return (f"{base} {episode['buy']}->{episode['sell']}: {episode['duration']:.2f} сек "
+                f"(max spread: {episode['peak']:.2f}%){suffix}\n")
+
+    def close(self):
+        if self.written:
+            log_writer.flush()
+            log(f"[Info] Spread lifetimes written to {self.path}")
@@ -0,0 +1,158 @@
+import numpy as np
+
+
+class SpreadMatrix:
+    """
+    Ціни всіх бірж у щільних масивах (exchanges × symbols).
+    Символи відображаються на індекси один раз, після чого всі попарні спреди
+    та фільтри min/max рахуються кількома векторними операціями.
+    Відсутня ціна — NaN, тому такі клітинки автоматично не проходять фільтри.
+    """
+
+    def __init__(self, exchanges, symbols):
+        self.exchanges = list(exchanges)
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        shape = (len(self.exchanges), len(self.symbols))
+        self.bids = np.full(shape, np.nan)
+        self.asks = np.full(shape, np.nan)
+
+    @classmethod
+    def from_quick_prices(cls, quick_prices):
+        """quick_prices: {exchange: {symbol: {'bid': float, 'ask': float}}}"""
+        symbols = set()
+        for quotes in quick_prices.values():
+            symbols.update(quotes)
+        matrix = cls(quick_prices.keys(), sorted(symbols))
+        for row, quotes in enumerate(quick_prices.values()):
+            if not quotes:
+                continue
+            cols = [matrix.index[s] for s in quotes]
+            matrix.bids[row, cols] = [q['bid'] for q in quotes.values()]
+            matrix.asks[row, cols] = [q['ask'] for q in quotes.values()]
+        return matrix
+
+    @classmethod
+    def from_board(cls, board, cols=None):
+        """
+        Те саме, що from_quick_prices, але прямо з масивів QuoteBoard — без проходу по dict.
+        cols — лише ці колонки (dirty-символи режиму спостереження), інакше вся дошка.
+        """
+        if cols is None:
+            bids, asks = board.bids, board.asks
+        else:
+            bids, asks = board.bids[:, cols], board.asks[:, cols]
+        present = ~(np.isnan(bids) | np.isnan(asks))
+        names = board.symbols.names
+        picked = np.flatnonzero(present.any(axis=0)).tolist()
+        ids = picked if cols is None else np.asarray(cols)[picked].tolist()
+        order = sorted(range(len(ids)), key=lambda k: names[ids[k]])
+        picked = [picked[k] for k in order]
+        matrix = cls(board.exchanges, [names[ids[k]] for k in order])
+        if picked:
+            matrix.bids[:] = np.where(present[:, picked], bids[:, picked], np.nan)
+            matrix.asks[:] = np.where(present[:, picked], asks[:, picked], np.nan)
+        return matrix
+
+    @classmethod
+    def from_board_last(cls, board, exchanges, allowed_pairs, symbol_filter):
+        """Те саме, що from_last_prices, але з колонки last у QuoteBoard."""
+        names = board.symbols.names
+        cols = np.flatnonzero((~np.isnan(board.lasts)).any(axis=0)).tolist()
+        symbols = sorted(names[col] for col in cols if symbol_filter(names[col]))
+        matrix = cls(exchanges, symbols)
+        if not symbols:
+            return matrix
+        cols = [board.symbols.id_of(s) for s in symbols]
+        for row, ex in enumerate(matrix.exchanges):
+            if ex not in board.rows:
+                continue
+            allowed = allowed_pairs.get(ex, set())
+            keep = np.fromiter((s in allowed for s in symbols), dtype=bool, count=len(symbols))
+            values = np.where(keep, board.lasts[board.rows[ex], cols], np.nan)
+            matrix.bids[row] = values
+            matrix.asks[row] = values
+        return matrix
+
+    @classmethod
+    def from_last_prices(cls, last_prices, exchanges, allowed_pairs, symbol_filter):
+        """
+        Одна ціна на символ: last price кладеться і в bids, і в asks.
+        Враховуються тільки символи з allowed_pairs[exchange], що проходять symbol_filter.
+        """
+        symbols = set()
+        for prices in last_prices.values():
+            symbols.update(prices)
+        matrix = cls(exchanges, sorted(s for s in symbols if symbol_filter(s)))
+        for row, ex in enumerate(matrix.exchanges):
+            prices = last_prices.get(ex, {})
+            allowed = allowed_pairs.get(ex, set())
+            tracked = [s for s in prices if s in allowed and s in matrix.index]
+            if not tracked:
+                continue
+            cols = [matrix.index[s] for s in tracked]
+            values = [prices[s] for s in tracked]
+            matrix.bids[row, cols] = values
+            matrix.asks[row, cols] = values
+        return matrix
+
+    def spreads(self):
+        """
+        Масив (buy_ex, sell_ex, symbol) зі спредом (sell_bid - buy_ask) / buy_ask * 100.
+        """
+        buy_ask = self.asks[:, None, :]
+        sell_bid = self.bids[None, :, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (sell_bid - buy_ask) / buy_ask * 100
+
+    def candidate_mask(self, spreads, min_spread_percent, max_spread_percent):
+        buy_ask = self.asks[:, None, :]
+        sell_bid = self.bids[None, :, :]
+        with np.errstate(invalid='ignore'):
+            mask = (buy_ask > 0) & (sell_bid > 0) & (buy_ask < sell_bid)
+            mask &= (spreads >= min_spread_percent) & (spreads <= max_spread_percent)
+        same_exchange = np.eye(len(self.exchanges), dtype=bool)
+        mask &= ~same_exchange[:, :, None]
+        return mask
+
+    def candidates(self, min_spread_percent, max_spread_percent, with_spread=True):
+        """
+        Повертає кандидатів у форматі find_candidates_by_quick_prices_all:
+        {pair: {'buy': [...], 'sell': [...], 'spread': float}}.
+        Порядок бірж у списках і 'spread' — як у попарному переборі buy_ex × sell_ex.
+        """
+        n_ex = len(self.exchanges)
+        if n_ex == 0 or not self.symbols:
+            return {}
+
+        spreads = self.spreads()
+        mask = self.candidate_mask(spreads, min_spread_percent, max_spread_percent)
+        flat_mask = mask.reshape(n_ex * n_ex, -1)
+        columns = np.flatnonzero(flat_mask.any(axis=0))
+        if columns.size == 0:
+            return {}
+
+        flat_mask = flat_mask[:, columns]
+        buy_any = mask[:, :, columns].any(axis=1)
+        # Позиція першої появи sell-біржі у переборі (buy_ex, sell_ex) — для порядку списку 'sell'
+        order = np.arange(n_ex * n_ex).reshape(n_ex, n_ex)[:, :, None]
+        sell_first = np.where(mask[:, :, columns], order, n_ex * n_ex).min(axis=0)
+        if with_spread:
+            first = flat_mask.argmax(axis=0)
+            first_spread = spreads.reshape(n_ex * n_ex, -1)[first, columns].tolist()
+
+        # Далі лише збірка результату; списки Python тут швидші за поелементний доступ до numpy
+        none = n_ex * n_ex
+        buy_rows = buy_any.T.tolist()
+        sell_rows = sell_first.T.tolist()
+        candidates = {}
+        for k, col in enumerate(columns.tolist()):
+            sells = sorted((pos, j) for j, pos in enumerate(sell_rows[k]) if pos < none)
+            entry = {
+                'buy': [ex for ex, hit in zip(self.exchanges, buy_rows[k]) if hit],
+                'sell': [self.exchanges[j] for _, j in sells],
+            }
+            if with_spread:
+                entry['spread'] = first_spread[k]
+            candidates[self.symbols[col]] = entry
+        return candidates
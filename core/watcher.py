@@ -0,0 +1,115 @@
+import numpy as np
+
+from core.quick_price import find_candidates_by_quick_prices_all
+from core.spread_matrix import SpreadMatrix
+from utils.quote_board import QuickPricesView
+from utils.constants import WATCH_FULL_SCAN_FRACTION
+
+
+class SpreadWatcher:
+    """
+    Стан режиму спостереження між циклами.
+    Кандидати й підтверджені можливості живуть між тіками; кожен тік
+    перераховує спред лише для символів, котировки яких змінились (dirty set).
+    """
+
+    def __init__(self, min_spread_percent, max_spread_percent):
+        self.min_spread_percent = min_spread_percent
+        self.max_spread_percent = max_spread_percent
+        self.candidates = {}  # {pair: {'buy': [...], 'sell': [...], 'spread': float}}
+        self.opportunities = {}  # {pair: {(buy_ex, sell_ex): result}}
+        self.previous = {}  # {exchange: {symbol: (bid, ask)}} — для REST-режиму без стріму
+        self.previous_bids = None  # копії масивів QuoteBoard з попереднього тіку
+        self.previous_asks = None
+        self.scanned = False  # перший тік рахується повним проходом
+
+    def changed_symbols(self, quick_prices):
+        """Порівнює REST-знімок з попереднім і повертає символи, що змінились."""
+        if isinstance(quick_prices, QuickPricesView):
+            return self.changed_on_board(quick_prices.board)
+        dirty = set()
+        for ex, quotes in quick_prices.items():
+            prev = self.previous.setdefault(ex, {})
+            for symbol, quote in quotes.items():
+                current = (quote['bid'], quote['ask'])
+                if prev.get(symbol) != current:
+                    prev[symbol] = current
+                    dirty.add(symbol)
+            gone = prev.keys() - quotes.keys()
+            for symbol in gone:
+                del prev[symbol]
+            dirty |= gone
+        return dirty
+
+    def changed_on_board(self, board):
+        # Порівняння цілих масивів; буфери попереднього тіку перевикористовуються
+        if self.previous_bids is None or self.previous_bids.shape != board.bids.shape:
+            self.previous_bids = np.full(board.bids.shape, np.nan)
+            self.previous_asks = np.full(board.asks.shape, np.nan)
+        with np.errstate(invalid='ignore'):
+            changed = (board.bids != self.previous_bids) & ~(np.isnan(board.bids) & np.isnan(self.previous_bids))
+            changed |= (board.asks != self.previous_asks) & ~(np.isnan(board.asks) & np.isnan(self.previous_asks))
+        np.copyto(self.previous_bids, board.bids)
+        np.copyto(self.previous_asks, board.asks)
+        names = board.symbols.names
+        return {names[col] for col in np.flatnonzero(changed.any(axis=0)).tolist()}
+
+    def update(self, quick_prices, dirty=None):
+        """
+        Перераховує кандидатів для dirty-символів.
+        Повертає множину пар, які є кандидатами після зміни і потребують перевірки.
+        """
+        if dirty is None:
+            dirty = self.changed_symbols(quick_prices)
+        if not dirty:
+            return set()
+
+        fresh = self.evaluate(quick_prices, dirty)
+        to_verify = set()
+        for pair in dirty:
+            candidate = fresh.get(pair)
+            # Старі підтвердження пари більше не актуальні: або зникла, або буде перевірена заново
+            self.opportunities.pop(pair, None)
+            if candidate is None:
+                self.candidates.pop(pair, None)
+            else:
+                self.candidates[pair] = candidate
+                to_verify.add(pair)
+        return to_verify
+
+    def evaluate(self, quick_prices, dirty):
+        """
+        Кандидати серед dirty-символів: SpreadMatrix лише на їхніх колонках.
+        На першому тіку або коли змінилась велика частка символів — повний векторний прохід.
+        """
+        if isinstance(quick_prices, QuickPricesView):
+            board = quick_prices.board
+            total = len(board.symbols)
+        else:
+            board = None
+            total = max((len(quotes) for quotes in quick_prices.values()), default=0)
+        if not self.scanned or len(dirty) > total * WATCH_FULL_SCAN_FRACTION:
+            self.scanned = True
+            return find_candidates_by_quick_prices_all(quick_prices, self.min_spread_percent, self.max_spread_percent)
+
+        if board is not None:
+            ids = (board.symbols.id_of(symbol) for symbol in dirty)
+            cols = np.fromiter((col for col in ids if col is not None and col < board.capacity), dtype=np.intp)
+            matrix = SpreadMatrix.from_board(board, cols)
+        else:
+            matrix = SpreadMatrix.from_quick_prices({
+                ex: {symbol: quotes[symbol] for symbol in dirty if symbol in quotes}
+                for ex, quotes in quick_prices.items()
+            })
+        return matrix.candidates(self.min_spread_percent, self.max_spread_percent)
+
+    def record(self, pair, buy_ex, sell_ex, result):
+        if result:
+            self.opportunities.setdefault(pair, {})[(buy_ex, sell_ex)] = result
+        elif pair in self.opportunities:
+            self.opportunities[pair].pop((buy_ex, sell_ex), None)
+            if not self.opportunities[pair]:
+                del self.opportunities[pair]
+
+    def all_opportunities(self):
+        return [res for by_route in self.opportunities.values() for res in by_route.values()]
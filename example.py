@@ -4,6 +4,8 @@ from datetime import datetime
 from prettytable import PrettyTable
 from asyncio import Semaphore
 
+from utils.symbols import normalize_symbol
+
 MIN_VOLUME_USDT_24H = 100000  # мінімальний обсяг для фільтрації
 
 
@@ -138,25 +140,11 @@ class ArbitrageBot:
 
     @staticmethod
     def normalize_spot_symbol(exchange: str, symbol: str) -> str:
-        if exchange == 'KUCOIN':
-            return symbol.replace('-', '').upper()
-        elif exchange == 'MEXC':
-            return symbol.replace('_', '').upper()
-        else:  # BINANCE та інші
-            return symbol.upper()
+        return normalize_symbol(exchange, symbol)
 
     @staticmethod
     def normalize_futures_symbol(exchange: str, symbol: str) -> str:
-        if exchange == 'KUCOIN':
-            if symbol.endswith('M'):
-                return symbol[:-1].upper()
-            return symbol.upper()
-        elif exchange == 'MEXC':
-            return symbol.replace('_', '').upper()
-        elif exchange == 'BINANCE':
-            return symbol.upper()
-        else:
-            return symbol.upper()
+        return normalize_symbol(exchange, symbol, market='futures')
 
     async def start(self):
         timeout = aiohttp.ClientTimeout(total=60)
@@ -4,6 +4,8 @@ from datetime import datetime
 from prettytable import PrettyTable
 from asyncio import Semaphore
 
+from utils.symbols import normalize_symbol
+
 
 def log(msg):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}")
@@ -34,25 +36,11 @@ class ArbitrageBot:
 
     @staticmethod
     def normalize_spot_symbol(exchange: str, symbol: str) -> str:
-        if exchange == 'KUCOIN':
-            return symbol.replace('-', '').upper()
-        elif exchange == 'MEXC':
-            return symbol.replace('_', '').upper()
-        else:  # BINANCE та інші
-            return symbol.upper()
+        return normalize_symbol(exchange, symbol)
 
     @staticmethod
     def normalize_futures_symbol(exchange: str, symbol: str) -> str:
-        if exchange == 'KUCOIN':
-            if symbol.endswith('M'):
-                return symbol[:-1].upper()
-            return symbol.upper()
-        elif exchange == 'MEXC':
-            return symbol.replace('_', '').upper()
-        elif exchange == 'BINANCE':
-            return symbol.upper()
-        else:
-            return symbol.upper()
+        return normalize_symbol(exchange, symbol, market='futures')
 
     async def load_all_pairs(self):
         tasks = [self.fetch_spot_pairs(ex) for ex in self.exchanges]
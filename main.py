@@ -1,6 +1,13 @@
 import asyncio
+import sys
 from bot import ArbitrageBot
+from utils.logger import set_log_level
 
 if __name__ == "__main__":
-    bot = ArbitrageBot()
-    asyncio.run(bot.start())
\ No newline at end of file
+    if "--debug" in sys.argv:
+        set_log_level("DEBUG")
+    bot = ArbitrageBot(profile="--profile" in sys.argv)
+    if "--watch" in sys.argv:
+        asyncio.run(bot.watch())
+    else:
+        asyncio.run(bot.start())
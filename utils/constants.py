@@ -11,7 +11,146 @@ EXCHANGES = [
     "BINANCE",
     "KUCOIN",
     "MEXC",
-    # додай інші біржі за потреби
+    "OKX",
+    # інші біржі — з адаптером, зареєстрованим в api/exchanges.py
 ]
 MIN_VOLUME_USDT_24H = 100000
 STABLECOINS = ["USDT", "USDC", "BUSD", "DAI"]
+
+# Котирувальні валюти для розбору BASEQUOTE без exchangeInfo (найдовші — першими)
+QUOTE_ASSETS = ["FDUSD", "USDT", "USDC", "BUSD", "TUSD", "USDE", "DAI", "EUR", "TRY", "BTC", "ETH", "BNB", "USD"]
+# Різні назви одного активу на біржах (KuCoin Futures називає BTC як XBT)
+ASSET_ALIASES = {"XBT": "BTC"}
+
+# Налаштування спільного пулу HTTP-з'єднань
+HTTP_TIMEOUT = 60  # секунд на весь запит
+HTTP_CONNECTION_LIMIT = 100
+HTTP_LIMIT_PER_HOST = 20
+HTTP_KEEPALIVE_TIMEOUT = 60  # скільки тримати простоюче з'єднання відкритим
+HTTP_DNS_CACHE_TTL = 300
+
+# Прогрів з'єднань до хостів бірж перед першим скануванням (URL оголошують адаптери api/exchanges.py)
+HTTP_WARMUP = True
+
+# Таймаут на один біржовий запит у масових фазах (пари, ціни, обсяги), секунд.
+# Біржа, що не встигла, просто пропускається в цьому циклі.
+EXCHANGE_FETCH_TIMEOUT = 15
+
+# Паралельна перевірка кандидатів по orderbook:
+# скільки запитів глибини може бути в польоті одночасно, загалом і на кожну біржу
+VERIFY_MAX_CONCURRENCY = 20
+VERIFY_EXCHANGE_CONCURRENCY = {
+    "BINANCE": 10,
+    "KUCOIN": 5,
+    "MEXC": 5,
+    "OKX": 10,  # books — 40 запитів за 2 с
+}
+VERIFY_DEFAULT_EXCHANGE_CONCURRENCY = 5
+
+# Кеш orderbook: скільки секунд відповідь вважається свіжою.
+# Більше значення — менше запитів, але старіші ціни при перевірці.
+DEPTH_CACHE_TTL = 0.3
+DEPTH_CACHE_MAX_ENTRIES = 5000
+# Рівнів стакану з кожного боку (Binance: вага depth однакова для limit 1..100; KuCoin: level2_20)
+DEPTH_LEVELS = 20
+# Обсяг угоди (у котирувальному стейблкоїні), для якого рахується спред за VWAP;
+# None — перевіряти лише спред верхівки стакану
+DEPTH_TARGET_NOTIONAL = 100
+
+# Локальні стакани з diff-depth стрімів (api/depth_stream.py) для кандидатів режиму спостереження
+LOCAL_ORDER_BOOKS = False
+LOCAL_BOOK_SNAPSHOT_LEVELS = 100  # рівнів у REST-знімку (Binance: та сама вага 5, що й для limit=20)
+LOCAL_BOOK_MAX_LEVELS = 200  # скільки найкращих рівнів тримати з кожного боку
+LOCAL_BOOK_MAX_AGE = 5  # секунд без повідомлень від біржі, після яких стакани не вважаються свіжими
+LOCAL_BOOK_BUFFER = 1000  # diff-оновлень на символ, що чекають REST-знімка
+LOCAL_BOOK_RESYNC_DELAY = 1  # секунд між невдалими спробами знімка
+
+# WebSocket-стріми best bid/ask замість REST bookTicker
+QUOTE_STREAMING = False
+QUOTE_STREAM_WARMUP = 5  # секунд чекати перших котировок перед пошуком кандидатів
+BINANCE_WS_URL = "wss://stream.binance.com:9443/ws"
+KUCOIN_WS_TOKEN_URL = "https://api.kucoin.com/api/v1/bullet-public"
+MEXC_WS_URL = "wss://wbs.mexc.com/ws"
+WS_RECONNECT_DELAY = 1
+WS_MAX_RECONNECT_DELAY = 30
+
+# Режим спостереження (python main.py --watch): пауза між тіками, секунд
+WATCH_INTERVAL = 2
+# Якщо за тік змінилась більша частка символів — кандидати перераховуються повним проходом
+WATCH_FULL_SCAN_FRACTION = 0.25
+
+# Кеш метаданих бірж (списки spot/futures пар) на диску.
+# Якщо кеш молодший за TTL — старт іде з нього, а свіжі дані довантажуються у фоні.
+EXCHANGE_METADATA_CACHE_FILE = "exchange_metadata_cache.json"
+EXCHANGE_METADATA_CACHE_TTL = 6 * 60 * 60  # секунд
+
+# Розбір JSON великих відповідей поза event loop:
+# "thread" — пул потоків, "process" — пул процесів, None — завжди в event loop
+DECODE_EXECUTOR = "thread"
+DECODE_OFFLOAD_BYTES = 256 * 1024  # менші відповіді розбираються на місці
+DECODE_WORKERS = 2
+
+# Початковий розмір QuoteBoard (кількість ID символів); масиви подвоюються за потреби
+QUOTE_BOARD_CAPACITY = 4096
+
+# Ліміти на IP по хостах і вага endpoint'ів оголошуються в адаптерах бірж (api/exchanges.py)
+RATE_LIMIT_HEADROOM = 0.8  # використовуємо лише частину ліміту, решта — запас на чужі запити з того ж IP
+
+DEFAULT_ENDPOINT_WEIGHT = 1
+
+# Пріоритети черги запитів: менше число — раніше
+PRIORITY_VERIFY = 0  # стакани для перевірки кандидатів
+PRIORITY_MARKET = 1  # масові тікери
+PRIORITY_METADATA = 2  # exchangeInfo і списки пар
+RATE_LIMIT_PAUSE = 60  # пауза після 429/418 без Retry-After, секунд
+RATE_LIMIT_MAX_REQUEUE = 2  # скільки разів ставити запит назад у чергу після 429
+
+# Політика запитів стаканів: повтори з jitter backoff, hedging і дедлайни
+ORDERBOOK_RETRIES = 2  # додаткові спроби після першої
+RETRY_BASE_DELAY = 0.2  # секунд, подвоюється з кожною спробою
+RETRY_MAX_DELAY = 2
+REQUEST_DEADLINES = {"BINANCE": 3, "KUCOIN": 4, "MEXC": 5, "OKX": 4}  # загальний дедлайн запиту стакану з повторами, секунд
+DEFAULT_REQUEST_DEADLINE = 5
+HEDGE_QUANTILE = 0.95  # другий запит летить, якщо перший довший за цей квантиль латентності
+HEDGE_MIN_SAMPLES = 20  # до цього hedging вимкнено — квантиль ще ненадійний
+LATENCY_WINDOW = 200  # скільки останніх латентностей пам'ятати на endpoint
+
+# Circuit breaker на (біржа, сімейство endpoint'ів); хости й сімейства — в адаптерах api/exchanges.py
+DEFAULT_ENDPOINT_FAMILY = "other"
+# Таймаут одного запиту за сімейством — замість загальних 60 секунд HTTP_TIMEOUT
+ENDPOINT_FAMILY_TIMEOUTS = {"depth": 5, "tickers": 10, "metadata": 30, "futures": 30}
+BREAKER_FAILURE_THRESHOLD = 5  # поспіль невдалих запитів до відкриття
+BREAKER_RESET_TIMEOUT = 30  # секунд у стані open до пробного запиту
+BREAKER_MAX_RESET_TIMEOUT = 300  # невдала проба подвоює паузу до цієї межі
+BREAKER_FAILURE_STATUSES = (403, 451)  # гео-блокування; 5xx рахуються завжди
+
+# Метрики HTTP-запитів
+METRICS_WINDOW = 1024  # скільки останніх спостережень тримає кожна гістограма для квантилів
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # секунд, для Prometheus
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7)  # байт
+METRICS_PORT = None  # порт для /metrics у форматі Prometheus; None — не запускати
+METRICS_SUMMARY_INTERVAL = 300  # секунд між зведеннями метрик у лог (режим спостереження)
+
+# Таймінги стадій циклу і профілювання
+STAGE_TIMING = True  # False — span'и стають no-op
+PROFILE_DIR = "profiles"  # куди писати .prof при запуску з --profile
+
+# Запис тиків у бінарне сховище (utils/tick_store.py)
+TICK_RECORDING = False  # True — писати котировки і знайдені спреди в TICK_STORE_DIR
+TICK_STORE_DIR = "ticks"
+TICK_BLOCK_ROWS = 8192  # рядків у блоці; один запис розрідженого індексу на блок
+TICK_FLUSH_INTERVAL = 1.0  # секунд: неповний блок скидається не рідше ніж раз на цей інтервал
+TICK_SEGMENT_MAX_BYTES = 256 * 1024 * 1024  # ротація сегмента за розміром
+TICK_SEGMENT_MAX_AGE = 3600  # ротація сегмента за часом, секунд
+
+# Тривалість життя спредів (core/spread_lifetime.py)
+SPREAD_LIFETIME_TRACKING = False  # відстежувати епізоди спреду з кожної котировки
+SPREAD_LIFETIME_LOG = "spread_lifetime_log.txt"  # куди дописувати закриті епізоди
+
+# Лог (utils/logger.py): запис фоновим потоком пачками
+LOG_LEVEL = "INFO"  # DEBUG, INFO або ERROR; --debug у main.py вмикає DEBUG
+LOG_QUEUE_SIZE = 10000  # записів у черзі; надлишок відкидається, а не гальмує цикл
+LOG_BATCH_SIZE = 256  # записів у пачці
+LOG_FLUSH_INTERVAL = 0.2  # секунд: неповна пачка пишеться не пізніше за цей час
+SPREADS_LOG = "spreads_log.txt"  # знайдені спреди; None — не писати
+SPREADS_LOG_FORMAT = "text"  # "text" — 'дата | символ | ...', "jsonl" — JSON lines
@@ -0,0 +1,102 @@
+import numpy as np
+
+from utils.constants import DEPTH_LEVELS
+
+PRICE, QTY = 0, 1
+
+
+def parse_levels(levels, size=DEPTH_LEVELS):
+    """[[price, qty, ...], ...] з відповіді біржі -> масив (size, 2); бракуючі рівні — нульові."""
+    array = np.zeros((size, 2))
+    count = min(len(levels), size)
+    if count:
+        array[:count] = np.array([level[:2] for level in levels[:count]], dtype=float)
+    return array
+
+
+def cumulative(levels):
+    """(2, size + 1): накопичена кількість і вартість по рівнях, з нулем на початку."""
+    curve = np.zeros((2, len(levels) + 1))
+    np.cumsum(levels[:, QTY], out=curve[0, 1:])
+    np.cumsum(levels[:, PRICE] * levels[:, QTY], out=curve[1, 1:])
+    return curve
+
+
+class DepthBook:
+    """
+    Кілька рівнів стакану у масивах фіксованого розміру (DEPTH_LEVELS × [ціна, кількість]).
+    bids — за спаданням ціни, asks — за зростанням, як їх віддає біржа.
+    Накопичені криві рахуються один раз: з DepthCache одна книга обслуговує кілька маршрутів.
+    """
+
+    __slots__ = ('bids', 'asks', 'bid_curve', 'ask_curve')
+
+    def __init__(self, bids, asks):
+        self.bids = bids
+        self.asks = asks
+        self.bid_curve = cumulative(bids)
+        self.ask_curve = cumulative(asks)
+
+    @classmethod
+    def from_levels(cls, bids, asks, size=DEPTH_LEVELS):
+        return cls(parse_levels(bids, size), parse_levels(asks, size))
+
+    @property
+    def bid(self):
+        return float(self.bids[0, PRICE]) if self.bids[0, QTY] > 0 else None
+
+    @property
+    def ask(self):
+        return float(self.asks[0, PRICE]) if self.asks[0, QTY] > 0 else None
+
+
+def executable_spread(buy_book, sell_book, min_spread_percent, target_notional=None):
+    """
+    Спред з урахуванням глибини: купуємо по asks buy_book, продаємо по bids sell_book.
+
+    Вартість купівлі C(q) і виручка продажу R(q) кусково-лінійні за кількістю q, тому спред
+    за VWAP (R - C) / C не зростає з q. Повертає dict:
+    - max_qty, max_notional — найбільший обсяг (у базовій і котирувальній валюті), за якого
+      спред за VWAP ще не нижчий за min_spread_percent; обмежений глибиною обох стаканів
+    - buy_vwap, sell_vwap, spread — для target_notional (у котирувальній валюті), або None,
+      якщо target_notional не задано чи стаканів не вистачає, щоб його заповнити
+    """
+    buy_qty, buy_cost = buy_book.ask_curve
+    sell_qty, sell_rev = sell_book.bid_curve
+    depth = min(buy_qty[-1], sell_qty[-1])
+    result = {'max_qty': 0.0, 'max_notional': 0.0, 'buy_vwap': None, 'sell_vwap': None, 'spread': None}
+    if depth <= 0:
+        return result
+
+    # Точки зламу обох кривих у межах спільної глибини
+    points = np.sort(np.concatenate((buy_qty, sell_qty)))
+    points = points[points <= depth]
+    cost = np.interp(points, buy_qty, buy_cost)
+    revenue = np.interp(points, sell_qty, sell_rev)
+    # f(q) = R(q) - (1 + m) * C(q) >= 0  <=>  спред за VWAP >= m
+    ratio = 1 + min_spread_percent / 100
+    margin = revenue - ratio * cost
+    # margin[0] = 0 у точці q = 0; знак на першому відрізку задає спред верхівки стакану
+    above = margin[1:] >= 0
+    if above.all():
+        max_qty = depth
+    else:
+        k = int(np.argmin(above))  # перший відрізок (points[k], points[k + 1]], де f < 0
+        if k == 0:
+            max_qty = 0.0
+        else:
+            q0, q1 = points[k], points[k + 1]
+            f0, f1 = margin[k], margin[k + 1]
+            max_qty = q0 + f0 / (f0 - f1) * (q1 - q0)
+    result['max_qty'] = float(max_qty)
+    result['max_notional'] = float(np.interp(max_qty, buy_qty, buy_cost))
+
+    if target_notional and target_notional <= buy_cost[-1]:
+        qty = float(np.interp(target_notional, buy_cost, buy_qty))
+        if 0 < qty <= sell_qty[-1]:
+            buy_vwap = target_notional / qty
+            sell_vwap = float(np.interp(qty, sell_qty, sell_rev)) / qty
+            result['buy_vwap'] = buy_vwap
+            result['sell_vwap'] = sell_vwap
+            result['spread'] = (sell_vwap - buy_vwap) / buy_vwap * 100
+    return result
@@ -1,6 +1,11 @@
 from .constants import STABLECOINS
+from .symbols import registry
 
 def is_stablecoin_pair(symbol: str) -> bool:
+    # Зареєстровані символи — O(1) з довідника, решта — перевірка суфікса
+    known = registry.is_stablecoin(symbol)
+    if known is not None:
+        return known
     for stablecoin in STABLECOINS:
         if symbol.endswith(stablecoin):
             return True
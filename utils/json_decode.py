@@ -0,0 +1,56 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from utils.constants import DECODE_EXECUTOR, DECODE_OFFLOAD_BYTES, DECODE_WORKERS
+
+try:
+    import orjson
+    loads = orjson.loads
+    JSON_BACKEND = 'orjson'
+except ImportError:  # orjson необов'язковий, стандартний json теж приймає bytes
+    import json
+    loads = json.loads
+    JSON_BACKEND = 'json'
+
+_executors = {}
+
+
+def get_executor(mode):
+    if mode not in _executors:
+        if mode == 'process':
+            _executors[mode] = ProcessPoolExecutor(max_workers=DECODE_WORKERS)
+        else:
+            _executors[mode] = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix='json-decode')
+    return _executors[mode]
+
+
+def decode_and_parse(raw, parser=None):
+    """
+    Сирі bytes -> JSON -> parser(data).
+    parser відбирає потрібні символи й будує компактні рядки одразу,
+    щоб не тримати зайві dict на кожен тікер.
+    Для режиму 'process' parser має бути функцією рівня модуля (або partial від неї).
+    """
+    data = loads(raw)
+    return parser(data) if parser is not None else data
+
+
+async def decode_payload(raw, parser=None, mode=DECODE_EXECUTOR, offload_bytes=DECODE_OFFLOAD_BYTES):
+    """
+    Розбирає payload; великі (від offload_bytes) — у пулі потоків або процесів,
+    щоб не блокувати event loop. Повертає (result, секунд на розбір).
+    """
+    started = time.perf_counter()
+    if mode and len(raw) >= offload_bytes:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(get_executor(mode), decode_and_parse, raw, parser)
+    else:
+        result = decode_and_parse(raw, parser)
+    return result, time.perf_counter() - started
+
+
+def shutdown_executors():
+    for executor in _executors.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+    _executors.clear()
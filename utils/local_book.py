@@ -0,0 +1,112 @@
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+from utils.depth_book import DepthBook
+from utils.constants import DEPTH_LEVELS, LOCAL_BOOK_MAX_LEVELS
+
+
+class BookSide:
+    """
+    Один бік стакану: відсортовані ключі й кількості у двох array('d') (8 байт на число).
+    Ключ — ціна для asks і мінус ціна для bids, тож найкращий рівень завжди перший.
+    Тримається не більше max_levels найкращих рівнів; глибші відкидаються.
+    """
+
+    __slots__ = ('sign', 'max_levels', 'keys', 'qtys')
+
+    def __init__(self, sign, max_levels=LOCAL_BOOK_MAX_LEVELS):
+        self.sign = sign
+        self.max_levels = max_levels
+        self.keys = array('d')
+        self.qtys = array('d')
+
+    def __len__(self):
+        return len(self.keys)
+
+    def load(self, levels):
+        pairs = sorted((self.sign * float(level[0]), float(level[1])) for level in levels if float(level[1]) > 0)
+        pairs = pairs[:self.max_levels]
+        self.keys = array('d', [key for key, _ in pairs])
+        self.qtys = array('d', [qty for _, qty in pairs])
+
+    def set(self, price, qty):
+        """Кількість на рівні; 0 — видалити рівень."""
+        key = self.sign * price
+        keys = self.keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            if qty > 0:
+                self.qtys[i] = qty
+            else:
+                del keys[i]
+                del self.qtys[i]
+        elif qty > 0 and i < self.max_levels:
+            keys.insert(i, key)
+            self.qtys.insert(i, qty)
+            if len(keys) > self.max_levels:
+                keys.pop()
+                self.qtys.pop()
+
+    def best(self):
+        return self.sign * self.keys[0] if self.keys else None
+
+    def top(self, size):
+        """Перші size рівнів як масив (size, 2) [ціна, кількість], доповнений нулями."""
+        levels = np.zeros((size, 2))
+        count = min(size, len(self.keys))
+        if count:
+            levels[:count, 0] = np.frombuffer(self.keys, count=count)
+            levels[:count, 0] *= self.sign
+            levels[:count, 1] = np.frombuffer(self.qtys, count=count)
+        return levels
+
+
+class LocalBook:
+    """
+    Локальна копія стакану: REST-знімок + diff-оновлення зі стріму.
+    sequence — номер останнього застосованого оновлення (lastUpdateId / sequence / version біржі).
+    """
+
+    __slots__ = ('bids', 'asks', 'sequence', 'synced', 'retry_at', 'cached')
+
+    def __init__(self, max_levels=LOCAL_BOOK_MAX_LEVELS):
+        self.bids = BookSide(-1, max_levels)
+        self.asks = BookSide(1, max_levels)
+        self.sequence = 0
+        self.synced = False
+        self.retry_at = 0.0  # monotonic: не раніше цього часу повторювати невдалий знімок
+        self.cached = None  # DepthBook до наступної зміни — повторні читання без перебудови
+
+    def load_snapshot(self, sequence, bids, asks):
+        self.bids.load(bids)
+        self.asks.load(asks)
+        self.sequence = sequence
+        self.cached = None
+
+    def apply(self, bids, asks):
+        """
+        Рівні [price, qty] або [price, qty, sequence] (KuCoin дає номер на кожну зміну:
+        зміни, вже враховані знімком, пропускаються).
+        """
+        sequence = self.sequence
+        self.cached = None
+        for side, levels in ((self.bids, bids), (self.asks, asks)):
+            for level in levels:
+                if len(level) > 2 and int(level[2]) <= sequence:
+                    continue
+                side.set(float(level[0]), float(level[1]))
+
+    @property
+    def bid(self):
+        return self.bids.best()
+
+    @property
+    def ask(self):
+        return self.asks.best()
+
+    def depth_book(self, levels=DEPTH_LEVELS):
+        if self.cached is None:
+            self.cached = DepthBook(self.bids.top(levels), self.asks.top(levels))
+        return self.cached
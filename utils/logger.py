@@ -1,4 +1,196 @@
+"""
+Асинхронний лог: виклик log() лише кладе запис у обмежену чергу, а форматування
+і запис у термінал/файли робить фоновий потік пачками — за розміром або за часом.
+Рівень фільтрується до форматування: вимкнений [Debug] коштує одне порівняння.
+"""
+import atexit
+import json
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
 
-def log(msg):
-    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}")
+from utils.constants import LOG_LEVEL, LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL, SPREADS_LOG, SPREADS_LOG_FORMAT
+
+DEBUG, INFO, ERROR = 10, 20, 40
+LEVELS = {'DEBUG': DEBUG, 'INFO': INFO, 'ERROR': ERROR}
+# Рівень за тегом на початку повідомлення; решта тегів ([Info], [Start], [Found]) — INFO
+TAG_LEVELS = {'[Debug]': DEBUG, '[Error]': ERROR}
+FLUSH = ()  # маркер у черзі: записати пачку, не чекаючи LOG_FLUSH_INTERVAL
+
+
+class BatchWriter:
+    """
+    Обмежена черга записів (target, format_fn, args) і потік, що пише їх пачками.
+    target — потік (sys.stdout) або шлях до файлу (відкривається в режимі 'a').
+    Коли черга повна, запис відкидається, а не блокує event loop; кількість відкинутих
+    повідомляється наступною пачкою.
+    """
+
+    def __init__(self, queue_size=LOG_QUEUE_SIZE, batch_size=LOG_BATCH_SIZE, flush_interval=LOG_FLUSH_INTERVAL):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.files = {}
+        self.thread = None
+        self.lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, target, format_fn, *args):
+        if self.thread is None:
+            self.start()
+        try:
+            self.queue.put_nowait((target, format_fn, args))
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='log-writer', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        stop = False
+        while not stop:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Добираємо пачку, поки вона не заповнилась, не вийшов час або не попросили flush
+            while len(batch) < self.batch_size and batch[-1] is not FLUSH and batch[-1] is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if None in batch:
+                stop = True
+            self.write_batch([entry for entry in batch if entry is not None and entry is not FLUSH])
+            for _ in batch:
+                self.queue.task_done()
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+
+    def write_batch(self, batch):
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            batch.append((sys.stdout, format_line, (time.time(), f"[Error] Log queue full: {dropped} lines dropped")))
+        chunks = {}
+        for target, format_fn, args in batch:
+            try:
+                text = format_fn(*args)
+            except Exception as e:
+                text = format_line(time.time(), f"[Error] Log record formatting failed: {e}")
+            chunks.setdefault(id(target), (target, []))[1].append(text)
+        for target, texts in chunks.values():
+            try:
+                stream = self.stream_for(target)
+                stream.write(''.join(texts))
+                stream.flush()
+            except (OSError, ValueError):
+                # закритий потік (наприклад, тимчасово перенаправлений stdout) — пачка губиться
+                pass
+
+    def stream_for(self, target):
+        if not isinstance(target, str):
+            return target
+        f = self.files.get(target)
+        if f is None:
+            f = self.files[target] = open(target, 'a', encoding='utf-8')
+        return f
+
+    def flush(self):
+        """Чекає, поки все з черги буде записано."""
+        if self.thread is not None:
+            self.queue.put(FLUSH)
+            self.queue.join()
+
+    def close(self):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+
+writer = BatchWriter()
+log_level = LEVELS[LOG_LEVEL]
+
+
+def set_log_level(name):
+    global log_level
+    log_level = LEVELS[name]
+
+
+def log_enabled(level):
+    """Для дорогих діагностичних блоків: if log_enabled(DEBUG): ..."""
+    return level >= log_level
+
+
+def format_line(ts, msg):
+    return f"[{datetime.fromtimestamp(ts).strftime('%H:%M:%S')}] {msg}\n"
+
+
+def format_args(ts, msg, args):
+    return format_line(ts, msg % args)
+
+
+def log(msg, *args, level=None):
+    """
+    log("[Info] ...") — як і раніше; рівень визначається тегом.
+    Для ледачого форматування: log("[Debug] %s: %d", ex, count) — рядок не збирається,
+    якщо рівень вимкнено. Час фіксується тут, форматування — у фоновому потоці.
+    """
+    if not isinstance(msg, str):
+        # log(exc), log(dict) — як у старому log(msg) через f-рядок; str() одразу, поки об'єкт не змінився
+        msg = str(msg)
+    if level is None:
+        level = TAG_LEVELS.get(msg[:7], INFO)
+    if level < log_level:
+        return
+    if args:
+        writer.submit(sys.stdout, format_args, time.time(), msg, args)
+    else:
+        writer.submit(sys.stdout, format_line, time.time(), msg)
+
+
+def format_text(obj):
+    return f"{obj}\n"
+
+
+def echo(obj):
+    """
+    print() через ту саму чергу, щоб вивід не обганяв log(); str(obj) викликається
+    у фоновому потоці — для PrettyTable це і є вся вартість рендерингу.
+    Об'єкт після передачі не змінювати.
+    """
+    writer.submit(sys.stdout, format_text, obj)
+
+
+def format_spread_text(ts, symbol, buy_ex, buy_price, sell_ex, sell_price, spread):
+    return (f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')} | {symbol} | {buy_ex} | {buy_price:.6f} | "
+            f"{sell_ex} | {sell_price:.6f} | {spread:.2f}%\n")
+
+
+def format_spread_json(ts, symbol, buy_ex, buy_price, sell_ex, sell_price, spread):
+    return json.dumps({
+        'time': ts, 'symbol': symbol, 'buy_exchange': buy_ex, 'buy_price': buy_price,
+        'sell_exchange': sell_ex, 'sell_price': sell_price, 'spread': spread,
+    }) + '\n'
+
+
+SPREAD_FORMATS = {'text': format_spread_text, 'jsonl': format_spread_json}
+
+
+def log_spread(symbol, buy_ex, buy_price, sell_ex, sell_price, spread, ts=None, path=SPREADS_LOG, fmt=SPREADS_LOG_FORMAT):
+    """Рядок у spreads_log.txt: 'дата | символ | біржа купівлі | ціна | біржа продажу | ціна | спред%' або JSON lines."""
+    writer.submit(path, SPREAD_FORMATS[fmt], ts or time.time(), symbol, buy_ex, buy_price, sell_ex, sell_price, spread)
+
+
+def flush_logs():
+    writer.flush()
+
+
+atexit.register(writer.close)
@@ -0,0 +1,50 @@
+import json
+import os
+from datetime import datetime
+
+from utils.logger import log
+from utils.constants import EXCHANGE_METADATA_CACHE_FILE, EXCHANGE_METADATA_CACHE_TTL
+
+
+def load_metadata_cache(path=EXCHANGE_METADATA_CACHE_FILE, ttl=EXCHANGE_METADATA_CACHE_TTL):
+    """
+    Повертає {'spot': {ex: set}, 'futures': {ex: set}, 'symbols': [...], 'age': секунд}
+    або None, якщо кешу немає, він пошкоджений чи старший за ttl.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        age = (datetime.now() - datetime.fromisoformat(data['_cache_time'])).total_seconds()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log(f"[Error] Reading metadata cache {path}: {e}")
+        return None
+
+    if age > ttl:
+        log(f"[Info] Metadata cache is {age / 60:.0f} min old, reloading from exchanges")
+        return None
+
+    return {
+        'spot': {ex: set(pairs) for ex, pairs in data['spot'].items()},
+        'futures': {ex: set(pairs) for ex, pairs in data['futures'].items()},
+        'symbols': data.get('symbols', []),
+        'age': age,
+    }
+
+
+def save_metadata_cache(spot_pairs, futures_pairs, symbols, path=EXCHANGE_METADATA_CACHE_FILE):
+    data = {
+        '_cache_time': datetime.now().isoformat(),
+        'spot': {ex: sorted(pairs) for ex, pairs in spot_pairs.items()},
+        'futures': {ex: sorted(pairs) for ex, pairs in futures_pairs.items()},
+        'symbols': symbols,
+    }
+    # Пишемо у тимчасовий файл і підміняємо: читач ніколи не побачить напівзаписаний кеш
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        log(f"[Error] Writing metadata cache {path}: {e}")
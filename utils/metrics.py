@@ -0,0 +1,110 @@
+import numpy as np
+
+from utils.constants import METRICS_WINDOW, LATENCY_BUCKETS
+
+
+class Histogram:
+    """
+    Кумулятивні бакети для Prometheus плюс кільцевий буфер останніх значень
+    для ковзних квантилів (p50/p95/p99) без зростання пам'яті.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, window=METRICS_WINDOW):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = np.empty(window)
+        self.position = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+        self.recent[self.position % len(self.recent)] = value
+        self.position += 1
+
+    def window(self):
+        return self.recent[:min(self.position, len(self.recent))]
+
+    def quantile(self, q):
+        values = self.window()
+        return float(np.quantile(values, q)) if values.size else None
+
+
+class MetricsRegistry:
+    """
+    Метрики процесу: лічильники, gauge'і і гістограми з мітками.
+    Ключ — (назва, мітки як кортеж пар), тож одна назва має окрему серію на кожну (біржа, endpoint).
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.help = {}
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def set_counter(self, name, value, **labels):
+        """Лічильник, що ведеться деінде (напр. у CircuitBreaker): записується накопичене значення."""
+        self.counters[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+    def histogram(self, name, **labels):
+        return self.histograms.get((name, tuple(sorted(labels.items()))))
+
+    def series(self, name):
+        """[(labels dict, Histogram)] для всіх серій гістограми name."""
+        return [(dict(labels), h) for (n, labels), h in self.histograms.items() if n == name]
+
+    def prometheus_text(self):
+        lines = []
+        emitted = set()
+
+        def header(name, kind):
+            if name not in emitted:
+                emitted.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            header(name, 'counter')
+            lines.append(f"{name}{format_labels(labels)} {value}")
+        for (name, labels), value in sorted(self.gauges.items()):
+            header(name, 'gauge')
+            lines.append(f"{name}{format_labels(labels)} {value}")
+        for (name, labels), h in sorted(self.histograms.items(), key=lambda item: item[0]):
+            header(name, 'histogram')
+            for bound, count in zip(h.buckets, h.bucket_counts):
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', repr(float(bound))),))} {count}")
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {h.count}")
+            lines.append(f"{name}_sum{format_labels(labels)} {h.sum}")
+            lines.append(f"{name}_count{format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+metrics = MetricsRegistry()
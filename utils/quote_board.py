@@ -0,0 +1,200 @@
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
+from utils.symbols import registry
+from utils.constants import QUOTE_BOARD_CAPACITY
+
+
+class QuoteBoard:
+    """
+    Котировки всіх бірж у заздалегідь виділених масивах (exchanges × symbol_id).
+    Індекс символу — ID з SymbolRegistry, тож запис і читання не створюють dict на символ;
+    масиви оновлюються на місці й лише зрідка подвоюються, коли з'являються нові ID.
+    Відсутнє або нульове значення — NaN.
+    """
+
+    def __init__(self, exchanges, symbols=registry, capacity=QUOTE_BOARD_CAPACITY):
+        self.exchanges = list(exchanges)
+        self.rows = {ex: i for i, ex in enumerate(self.exchanges)}
+        self.symbols = symbols
+        shape = (len(self.exchanges), max(capacity, len(symbols)))
+        self.bids = np.full(shape, np.nan)
+        self.asks = np.full(shape, np.nan)
+        self.lasts = np.full(shape, np.nan)
+        self.volumes = np.full(shape, np.nan)
+        self.updated = np.zeros(shape)  # time.time() останнього оновлення
+
+    @property
+    def capacity(self):
+        return self.bids.shape[1]
+
+    def ensure_capacity(self, size):
+        if size <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < size:
+            capacity *= 2
+        for name in ('bids', 'asks', 'lasts', 'volumes', 'updated'):
+            old = getattr(self, name)
+            new = np.full((len(self.exchanges), capacity), 0.0 if name == 'updated' else np.nan)
+            new[:, :old.shape[1]] = old
+            setattr(self, name, new)
+
+    def symbol_id(self, symbol):
+        symbol_id = self.symbols.id_for(symbol)
+        if symbol_id >= self.capacity:
+            self.ensure_capacity(len(self.symbols))
+        return symbol_id
+
+    def set_quote(self, exchange, symbol, bid, ask, ts=None):
+        """Оновлює bid/ask на місці. Повертає True, якщо ціна змінилась."""
+        row = self.rows[exchange]
+        col = self.symbol_id(symbol)
+        bid = bid if bid > 0 else np.nan
+        ask = ask if ask > 0 else np.nan
+        self.updated[row, col] = ts or time.time()
+        if same_price(self.bids[row, col], bid) and same_price(self.asks[row, col], ask):
+            return False
+        self.bids[row, col] = bid
+        self.asks[row, col] = ask
+        return True
+
+    def load_rows(self, exchange, rows, ts=None):
+        """
+        Замінює дані біржі знімком {symbol: [bid, ask, last, volume]} одним векторним записом.
+        Символи, яких немає у знімку, стають NaN.
+        """
+        row = self.rows[exchange]
+        for column in (self.bids, self.asks, self.lasts, self.volumes):
+            column[row].fill(np.nan)
+        if not rows:
+            return
+        cols = np.fromiter((self.symbols.id_for(sym) for sym in rows), dtype=np.intp, count=len(rows))
+        self.ensure_capacity(len(self.symbols))
+        values = np.array(list(rows.values()), dtype=float)
+        values[values <= 0] = np.nan
+        self.bids[row, cols] = values[:, 0]
+        self.asks[row, cols] = values[:, 1]
+        self.lasts[row, cols] = values[:, 2]
+        self.volumes[row, cols] = values[:, 3]
+        self.updated[row, cols] = ts or time.time()
+
+    def clear(self, exchange=None):
+        rows = [self.rows[exchange]] if exchange is not None else slice(None)
+        for column in (self.bids, self.asks, self.lasts, self.volumes):
+            column[rows] = np.nan
+        self.updated[rows] = 0.0
+
+    def updated_at(self, exchange, symbol):
+        symbol_id = self.symbols.id_of(symbol)
+        if symbol_id is None or symbol_id >= self.capacity:
+            return None
+        return self.updated[self.rows[exchange], symbol_id] or None
+
+    def quick_prices(self):
+        """Живий read-only вигляд {exchange: {symbol: {'bid', 'ask'}}}."""
+        return QuickPricesView(self)
+
+    def last_prices(self):
+        """Живий read-only вигляд {exchange: {symbol: last}}."""
+        return LastPricesView(self)
+
+
+def same_price(old, new):
+    # NaN != NaN, тому «обидва відсутні» перевіряємо окремо
+    return old == new or (old != old and new != new)
+
+
+class BoardView(Mapping):
+    """Вигляд дошки як вкладеного dict: {exchange: ExchangeView}."""
+
+    exchange_view = None
+
+    def __init__(self, board):
+        self.board = board
+
+    def __getitem__(self, exchange):
+        if exchange not in self.board.rows:
+            raise KeyError(exchange)
+        return self.exchange_view(self.board, exchange)
+
+    def __iter__(self):
+        return iter(self.board.exchanges)
+
+    def __len__(self):
+        return len(self.board.exchanges)
+
+
+class ExchangeView(Mapping):
+    """
+    Котировки однієї біржі. Значення будуються ліниво при зверненні,
+    тож цикли по кількох символах не матеріалізують усю біржу.
+    """
+
+    def __init__(self, board, exchange):
+        self.board = board
+        self.row = board.rows[exchange]
+
+    def present(self):
+        """Маска присутніх символів по всьому рядку — для ітерації."""
+        raise NotImplementedError
+
+    def has(self, col):
+        raise NotImplementedError
+
+    def value(self, col):
+        raise NotImplementedError
+
+    def column(self, symbol):
+        col = self.board.symbols.id_of(symbol)
+        if col is None or col >= self.board.capacity or not self.has(col):
+            return None
+        return col
+
+    def __getitem__(self, symbol):
+        col = self.column(symbol)
+        if col is None:
+            raise KeyError(symbol)
+        return self.value(col)
+
+    def __contains__(self, symbol):
+        return self.column(symbol) is not None
+
+    def __iter__(self):
+        names = self.board.symbols.names
+        return (names[col] for col in np.flatnonzero(self.present()).tolist())
+
+    def __len__(self):
+        return int(np.count_nonzero(self.present()))
+
+
+class QuickExchangeView(ExchangeView):
+    def present(self):
+        return ~(np.isnan(self.board.bids[self.row]) | np.isnan(self.board.asks[self.row]))
+
+    def has(self, col):
+        return not (np.isnan(self.board.bids[self.row, col]) or np.isnan(self.board.asks[self.row, col]))
+
+    def value(self, col):
+        return {'bid': float(self.board.bids[self.row, col]), 'ask': float(self.board.asks[self.row, col])}
+
+
+class LastExchangeView(ExchangeView):
+    def present(self):
+        return ~np.isnan(self.board.lasts[self.row])
+
+    def has(self, col):
+        return not np.isnan(self.board.lasts[self.row, col])
+
+    def value(self, col):
+        return float(self.board.lasts[self.row, col])
+
+
+class QuickPricesView(BoardView):
+    exchange_view = QuickExchangeView
+
+
+class LastPricesView(BoardView):
+    exchange_view = LastExchangeView
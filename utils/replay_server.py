@@ -0,0 +1,114 @@
+"""
+Локальний WebSocket-сервер, що програє записані кадри біржі.
+Потрібен, щоб перевіряти стріми без живого з'єднання з біржею.
+
+Кадри — JSONL-файл, один кадр на рядок (саме такий пише QuoteEngine з record_path).
+Запуск: python -m utils.replay_server frames.jsonl --port 8765
+"""
+import argparse
+import asyncio
+import json
+
+from aiohttp import web
+
+from utils.logger import log
+
+
+def load_frames(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+
+class ReplayServer:
+    def __init__(self, frames, host='127.0.0.1', port=8765, interval=0.0, close_after=False):
+        """
+        - frames: список рядків (JSON) або шлях до JSONL-файлу
+        - interval: пауза між кадрами, секунд
+        - close_after: закрити з'єднання після останнього кадру (перевірка перепідключення)
+        - port: 0 — вільний порт; справжній доступний у self.port / self.url після start()
+        """
+        self.frames = load_frames(frames) if isinstance(frames, str) else list(frames)
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.close_after = close_after
+        self.received = []  # повідомлення від клієнта (підписки, ping)
+        self.connections = 0
+        self.runner = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/ws"
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+
+        # Чекаємо першу підписку, як справжня біржа
+        msg = await ws.receive()
+        if msg.type == web.WSMsgType.TEXT:
+            self.received.append(json.loads(msg.data))
+
+        reader = asyncio.create_task(self.read_client(ws))
+        try:
+            for frame in self.frames:
+                await ws.send_str(frame)
+                if self.interval:
+                    await asyncio.sleep(self.interval)
+        except ConnectionResetError:
+            # Клієнт пішов посеред програвання (зупинка або перепідключення) — це не помилка сервера
+            reader.cancel()
+            return ws
+
+        if self.close_after:
+            await ws.close()
+        else:
+            await reader
+        reader.cancel()
+        return ws
+
+    async def read_client(self, ws):
+        async for msg in ws:
+            if msg.type == web.WSMsgType.TEXT:
+                data = json.loads(msg.data)
+                self.received.append(data)
+                if data.get('type') == 'ping':
+                    await ws.send_json({'id': data.get('id'), 'type': 'pong'})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/ws', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        if not self.port:
+            self.port = self.runner.addresses[0][1]  # port=0 — вільний порт від ОС
+        log(f"[Info] Replay server on {self.url} with {len(self.frames)} frames")
+        return self
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay recorded exchange WebSocket frames")
+    parser.add_argument('frames')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--interval', type=float, default=0.0)
+    parser.add_argument('--close-after', action='store_true')
+    args = parser.parse_args()
+
+    server = ReplayServer(args.frames, args.host, args.port, args.interval, args.close_after)
+    await server.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
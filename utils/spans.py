@@ -0,0 +1,105 @@
+import cProfile
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.logger import log
+from utils.constants import STAGE_TIMING, PROFILE_DIR
+
+
+class Span:
+    """Одна стадія циклу: wall і CPU час, кількості елементів і HTTP-запитів."""
+
+    def __init__(self, tracer, name, counts):
+        self.tracer = tracer
+        self.name = name
+        self.counts = counts
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.requests = 0
+
+    def count(self, **counts):
+        self.counts.update(counts)
+
+    def __enter__(self):
+        self.requests = self.tracer.request_counter() if self.tracer.request_counter else 0
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall = time.perf_counter() - self.wall
+        self.cpu = time.process_time() - self.cpu
+        if self.tracer.request_counter:
+            self.requests = self.tracer.request_counter() - self.requests
+        self.tracer.finish(self)
+        return False
+
+
+class NullSpan:
+    """Вимкнений span: жодних таймерів і записів."""
+
+    def count(self, **counts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """
+    Таймінги стадій: with tracer.span('quick candidates', symbols=n) as span: ...; span.count(candidates=m).
+    Повтори однієї стадії (режим спостереження) сумуються; report() логує і скидає підсумки.
+    CPU час — process_time() усього процесу: для async-стадій включає паралельні корутини.
+    """
+
+    def __init__(self, enabled=STAGE_TIMING, request_counter=None):
+        self.enabled = enabled
+        self.request_counter = request_counter  # функція без аргументів: скільки HTTP-запитів зроблено
+        self.totals = {}  # name -> [runs, wall, cpu, requests, останні counts]
+
+    def span(self, name, **counts):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, counts)
+
+    def finish(self, span):
+        total = self.totals.get(span.name)
+        if total is None:
+            self.totals[span.name] = [1, span.wall, span.cpu, span.requests, span.counts]
+        else:
+            total[0] += 1
+            total[1] += span.wall
+            total[2] += span.cpu
+            total[3] += span.requests
+            total[4] = span.counts
+
+    def report(self):
+        for name, (runs, wall, cpu, requests, counts) in self.totals.items():
+            details = ", ".join(f"{key} {value}" for key, value in counts.items())
+            runs_text = f" over {runs} runs" if runs > 1 else ""
+            log(f"[Info] Stage {name}: wall {wall * 1000:.1f} ms, cpu {cpu * 1000:.1f} ms, "
+                f"{requests} requests{runs_text}" + (f" ({details})" if details else ""))
+        self.totals = {}
+
+
+@contextmanager
+def profile_cycle(directory=PROFILE_DIR, label='cycle'):
+    """cProfile на весь блок; результат — directory/<label>-<час>.prof (дивитись snakeviz або pstats)."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{label}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.prof")
+        profiler.dump_stats(path)
+        log(f"[Info] Profile written to {path}")
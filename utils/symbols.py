@@ -0,0 +1,136 @@
+from .constants import STABLECOINS, ASSET_ALIASES, QUOTE_ASSETS
+
+
+class SymbolRegistry:
+    """
+    Єдиний довідник символів, що будується з exchangeInfo бірж.
+    Кожна пара (base, quote) отримує канонічне ім'я BASEQUOTE і маленький цілий ID;
+    біржові символи (BTC-USDT, BTC_USDT, XBTUSDTM, ...) мапляться на них і назад.
+    """
+
+    def __init__(self):
+        self.ids = {}  # canonical name -> id
+        self.names = []  # id -> canonical name
+        self.assets = []  # id -> (base, quote)
+        self.stable_ids = set()
+        self.to_canonical = {}  # (exchange, market) -> {native: canonical name}
+        self.to_native = {}  # (exchange, market) -> {canonical name: native}
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, base, quote):
+        base = ASSET_ALIASES.get(base.upper(), base.upper())
+        quote = ASSET_ALIASES.get(quote.upper(), quote.upper())
+        name = base + quote
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = len(self.names)
+            self.ids[name] = symbol_id
+            self.names.append(name)
+            self.assets.append((base, quote))
+            if quote in STABLECOINS:
+                self.stable_ids.add(symbol_id)
+        return symbol_id
+
+    def register(self, exchange, native, base, quote, market='spot'):
+        """Реєструє біржовий символ і повертає канонічне ім'я."""
+        name = self.names[self.intern(base, quote)]
+        self.to_canonical.setdefault((exchange, market), {})[native] = name
+        self.to_native.setdefault((exchange, market), {})[name] = native
+        return name
+
+    def export(self):
+        """Усі біржові символи як [exchange, market, native, base, quote] — для кешу на диску."""
+        rows = []
+        for (exchange, market), mapping in self.to_canonical.items():
+            for native, name in mapping.items():
+                base, quote = self.assets[self.ids[name]]
+                rows.append([exchange, market, native, base, quote])
+        return rows
+
+    def load(self, rows):
+        for exchange, market, native, base, quote in rows:
+            self.register(exchange, native, base, quote, market)
+
+    def canonical_map(self, exchange, market='spot'):
+        """{native: canonical} для гарячих циклів: один dict.get замість replace/upper."""
+        return self.to_canonical.get((exchange, market), {})
+
+    def native(self, exchange, name, market='spot'):
+        native = self.to_native.get((exchange, market), {}).get(name)
+        if native is None:
+            native = guess_native_symbol(exchange, name, market)
+        return native
+
+    def id_for(self, name):
+        """ID канонічного імені; невідоме ім'я реєструється через split_symbol."""
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            base, quote = split_symbol(name)
+            symbol_id = self.intern(base, quote) if base else self.intern(name, '')
+        return symbol_id
+
+    def id_of(self, name):
+        return self.ids.get(name)
+
+    def split(self, name):
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            return split_symbol(name)
+        return self.assets[symbol_id]
+
+    def is_stablecoin(self, name):
+        """True/False для відомих символів, None — якщо символ ще не зареєстрований."""
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            return None
+        return symbol_id in self.stable_ids
+
+
+def split_symbol(name):
+    """Розбиває BASEQUOTE по найдовшій відомій котирувальній валюті. (None, None), якщо не вдалося."""
+    for quote in QUOTE_ASSETS:
+        if name.endswith(quote) and len(name) > len(quote):
+            return name[:-len(quote)], quote
+    return None, None
+
+
+def guess_native_symbol(exchange, name, market='spot'):
+    if exchange == 'KUCOIN' and market == 'spot':
+        base, quote = split_symbol(name)
+        return f"{base}-{quote}" if base else name
+    if exchange == 'MEXC' and market == 'futures':
+        base, quote = split_symbol(name)
+        return f"{base}_{quote}" if base else name
+    if exchange == 'OKX':
+        base, quote = split_symbol(name)
+        if not base:
+            return name
+        return f"{base}-{quote}-SWAP" if market == 'futures' else f"{base}-{quote}"
+    return name
+
+
+def normalize_symbol(exchange, symbol, market='spot'):
+    name = registry.canonical_map(exchange, market).get(symbol)
+    if name is not None:
+        return name
+    # символ ще не в довіднику — старі правила нормалізації
+    if exchange == 'KUCOIN':
+        symbol = symbol.replace('-', '').upper()
+        if market == 'futures' and symbol.endswith('M'):
+            symbol = symbol[:-1]
+        if symbol.startswith('XBT'):
+            symbol = 'BTC' + symbol[3:]
+        return symbol
+    elif exchange == 'MEXC':
+        return symbol.replace('_', '').upper()
+    elif exchange == 'OKX':
+        if market == 'futures' and symbol.endswith('-SWAP'):
+            symbol = symbol[:-5]
+        return symbol.replace('-', '').upper()
+    else:  # BINANCE та інші
+        return symbol.upper()
+
+
+registry = SymbolRegistry()
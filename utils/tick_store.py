@@ -0,0 +1,340 @@
+"""
+Бінарне append-only сховище тиків.
+
+Сегмент — три файли з однаковою основою:
+    <name>.bin   блоки по стовпцях: заголовок, далі ts, bid, ask, symbol, exchange, aux, kind
+    <name>.idx   розріджений індекс: один запис (t_min, t_max, offset, count) на блок
+    <name>.json  словники ID -> ім'я для бірж і символів (ID символів — з SymbolRegistry цього процесу)
+
+kind: 0 — котировка (bid/ask біржі exchange), 1 — подія спреду
+(bid — ціна купівлі на exchange, ask — ціна продажу на aux).
+Читач відкриває .bin через mmap і віддає стовпці блоків як numpy-вигляди без копіювання.
+"""
+import glob
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from utils.logger import log
+from utils.symbols import registry
+from utils.constants import (
+    TICK_STORE_DIR,
+    TICK_BLOCK_ROWS,
+    TICK_FLUSH_INTERVAL,
+    TICK_SEGMENT_MAX_BYTES,
+    TICK_SEGMENT_MAX_AGE,
+)
+
+MAGIC = b'TCK1'
+BLOCK_HEADER = struct.Struct('<4sIqq')  # magic, count, t_min, t_max (ns)
+INDEX_DTYPE = np.dtype([('t_min', '<i8'), ('t_max', '<i8'), ('offset', '<u8'), ('count', '<u4'), ('pad', '<u4')])
+# Порядок стовпців — від ширших до вужчих, щоб кожен стовпець лишався вирівняним
+COLUMNS = (
+    ('ts', np.dtype('<i8')),
+    ('bid', np.dtype('<f8')),
+    ('ask', np.dtype('<f8')),
+    ('symbol', np.dtype('<u4')),
+    ('exchange', np.dtype('<u2')),
+    ('aux', np.dtype('<u2')),
+    ('kind', np.dtype('u1')),
+)
+ROW_BYTES = sum(dtype.itemsize for _, dtype in COLUMNS)
+QUOTE = 0
+SPREAD = 1
+
+
+def block_size(count):
+    size = BLOCK_HEADER.size + ROW_BYTES * count
+    return size + (-size) % 8
+
+
+class TickRecorder:
+    """
+    Запис тиків без блокування event loop: record_* лише кладе значення у заздалегідь
+    виділені numpy-буфери; повний блок (або раз на flush_interval) віддається потоку-писачу.
+    """
+
+    def __init__(self, directory=TICK_STORE_DIR, block_rows=TICK_BLOCK_ROWS, flush_interval=TICK_FLUSH_INTERVAL,
+                 max_bytes=TICK_SEGMENT_MAX_BYTES, max_age=TICK_SEGMENT_MAX_AGE, symbols=registry):
+        self.directory = directory
+        self.block_rows = block_rows
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.symbols = symbols
+        self.exchange_ids = {}
+        self.buffers = self.new_buffers()
+        self.rows = 0
+        self.flushed_at = time.monotonic()
+        self.queue = queue.Queue()
+        self.thread = None
+        self.recorded = 0
+        self.dropped = 0
+
+    def new_buffers(self):
+        return {name: np.empty(self.block_rows, dtype) for name, dtype in COLUMNS}
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.thread = threading.Thread(target=self.writer, name='tick-writer', daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.flush()
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def exchange_id(self, exchange):
+        exchange_id = self.exchange_ids.get(exchange)
+        if exchange_id is None:
+            exchange_id = self.exchange_ids[exchange] = len(self.exchange_ids)
+        return exchange_id
+
+    def append(self, ts, kind, exchange, aux, symbol, bid, ask):
+        i = self.rows
+        b = self.buffers
+        b['ts'][i] = ts
+        b['kind'][i] = kind
+        b['exchange'][i] = exchange
+        b['aux'][i] = aux
+        b['symbol'][i] = symbol
+        b['bid'][i] = bid
+        b['ask'][i] = ask
+        self.rows = i + 1
+        if self.rows == self.block_rows:
+            self.flush()
+
+    def record_quote(self, exchange, symbol, bid, ask, ts=None):
+        ts_ns = int((ts or time.time()) * 1e9)
+        self.append(ts_ns, QUOTE, self.exchange_id(exchange), 0, self.symbols.id_for(symbol), bid, ask)
+        self.maybe_flush()
+
+    def record_spread(self, symbol, buy_ex, sell_ex, buy_price, sell_price, ts=None):
+        ts_ns = int((ts or time.time()) * 1e9)
+        self.append(ts_ns, SPREAD, self.exchange_id(buy_ex), self.exchange_id(sell_ex),
+                    self.symbols.id_for(symbol), buy_price, sell_price)
+        self.maybe_flush()
+
+    def record_board(self, board, ts=None):
+        """Знімок усіх присутніх bid/ask з QuoteBoard — векторно, без циклу по символах."""
+        ts_ns = int((ts or time.time()) * 1e9)
+        for exchange, row in board.rows.items():
+            bids = board.bids[row]
+            asks = board.asks[row]
+            cols = np.flatnonzero(~(np.isnan(bids) | np.isnan(asks)))
+            exchange_id = self.exchange_id(exchange)
+            start = 0
+            while start < cols.size:
+                take = min(cols.size - start, self.block_rows - self.rows)
+                part = cols[start:start + take]
+                i, j = self.rows, self.rows + take
+                b = self.buffers
+                b['ts'][i:j] = ts_ns
+                b['kind'][i:j] = QUOTE
+                b['exchange'][i:j] = exchange_id
+                b['aux'][i:j] = 0
+                b['symbol'][i:j] = part
+                b['bid'][i:j] = bids[part]
+                b['ask'][i:j] = asks[part]
+                self.rows = j
+                start += take
+                if self.rows == self.block_rows:
+                    self.flush()
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if self.rows and time.monotonic() - self.flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.flushed_at = time.monotonic()
+        if not self.rows:
+            return
+        if self.thread is None:
+            self.dropped += self.rows
+            self.rows = 0
+            return
+        # Буфери передаються писачу цілком, а запис продовжується в нові — без копіювання
+        self.queue.put((self.buffers, self.rows, dict(self.exchange_ids)))
+        self.recorded += self.rows
+        self.buffers = self.new_buffers()
+        self.rows = 0
+
+    def writer(self):
+        segment = None
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            buffers, count, exchange_ids = item
+            try:
+                if segment is None or segment.should_rotate(self.max_bytes, self.max_age):
+                    if segment is not None:
+                        segment.close()
+                    segment = SegmentWriter(self.directory)
+                segment.write_block(buffers, count)
+                segment.write_meta(exchange_ids, self.symbols.names)
+            except Exception as e:
+                log(f"[Error] Tick store write failed: {e}")
+        if segment is not None:
+            segment.close()
+
+
+class SegmentWriter:
+    def __init__(self, directory):
+        name = datetime.now().strftime('ticks-%Y%m%d-%H%M%S-%f')
+        self.base = os.path.join(directory, name)
+        self.data = open(self.base + '.bin', 'ab')
+        self.index = open(self.base + '.idx', 'ab')
+        self.opened_at = time.monotonic()
+        self.size = 0
+        self.meta_sizes = (-1, -1)
+
+    def should_rotate(self, max_bytes, max_age):
+        return self.size >= max_bytes or time.monotonic() - self.opened_at >= max_age
+
+    def write_block(self, buffers, count):
+        ts = buffers['ts'][:count]
+        t_min, t_max = int(ts.min()), int(ts.max())
+        offset = self.size
+        parts = [BLOCK_HEADER.pack(MAGIC, count, t_min, t_max)]
+        parts.extend(buffers[name][:count].tobytes() for name, _ in COLUMNS)
+        payload = b''.join(parts)
+        payload += b'\0' * ((-len(payload)) % 8)
+        self.data.write(payload)
+        self.data.flush()
+        entry = np.zeros(1, INDEX_DTYPE)
+        entry[0] = (t_min, t_max, offset, count, 0)
+        self.index.write(entry.tobytes())
+        self.index.flush()
+        self.size += len(payload)
+
+    def write_meta(self, exchange_ids, symbol_names):
+        sizes = (len(exchange_ids), len(symbol_names))
+        if sizes == self.meta_sizes:
+            return
+        meta = {
+            'exchanges': sorted(exchange_ids, key=exchange_ids.get),
+            'symbols': list(symbol_names),
+        }
+        tmp_path = self.base + '.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.base + '.json')
+        self.meta_sizes = sizes
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+
+class TickReader:
+    """Один сегмент: mmap .bin, розріджений індекс .idx і словники з .json."""
+
+    def __init__(self, path):
+        self.base = path[:-4] if path.endswith('.bin') else path
+        with open(self.base + '.idx', 'rb') as f:
+            self.index = np.frombuffer(f.read(), INDEX_DTYPE)
+        with open(self.base + '.json', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.exchanges = meta['exchanges']
+        self.symbols = meta['symbols']
+        self.file = open(self.base + '.bin', 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        # Блок із записом, що не встиг потрапити в індекс або обрізаний, не читаємо
+        if self.map is not None:
+            ends = self.index['offset'] + np.array([block_size(int(c)) for c in self.index['count']], dtype='<u8')
+            self.index = self.index[ends <= size]
+        else:
+            self.index = self.index[:0]
+
+    def close(self):
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                # стовпці-вигляди ще живі: mmap звільниться разом з останнім із них
+                pass
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def block(self, i):
+        """Стовпці блоку i як numpy-вигляди над mmap (без копіювання)."""
+        offset = int(self.index['offset'][i])
+        count = int(self.index['count'][i])
+        magic, _, _, _ = BLOCK_HEADER.unpack_from(self.map, offset)
+        if magic != MAGIC:
+            raise ValueError(f"{self.base}.bin: bad block at offset {offset}")
+        position = offset + BLOCK_HEADER.size
+        columns = {}
+        for name, dtype in COLUMNS:
+            columns[name] = np.frombuffer(self.map, dtype, count, position)
+            position += dtype.itemsize * count
+        return columns
+
+    def blocks_between(self, t_start=None, t_end=None):
+        """Номери блоків, що перетинають [t_start, t_end] (секунди unix); пошук по індексу."""
+        t_min = self.index['t_min']
+        t_max = self.index['t_max']
+        mask = np.ones(len(self.index), dtype=bool)
+        if t_start is not None:
+            mask &= t_max >= int(t_start * 1e9)
+        if t_end is not None:
+            mask &= t_min <= int(t_end * 1e9)
+        return np.flatnonzero(mask)
+
+    def iter_range(self, t_start=None, t_end=None):
+        """Віддає стовпці блоків у діапазоні; рядки поза діапазоном відсікаються маскою."""
+        start_ns = None if t_start is None else int(t_start * 1e9)
+        end_ns = None if t_end is None else int(t_end * 1e9)
+        for i in self.blocks_between(t_start, t_end).tolist():
+            columns = self.block(i)
+            ts = columns['ts']
+            if (start_ns is None or ts.min() >= start_ns) and (end_ns is None or ts.max() <= end_ns):
+                yield columns
+                continue
+            keep = np.ones(ts.size, dtype=bool)
+            if start_ns is not None:
+                keep &= ts >= start_ns
+            if end_ns is not None:
+                keep &= ts <= end_ns
+            yield {name: column[keep] for name, column in columns.items()}
+
+    def read_range(self, t_start=None, t_end=None):
+        parts = list(self.iter_range(t_start, t_end))
+        if not parts:
+            return {name: np.empty(0, dtype) for name, dtype in COLUMNS}
+        return {name: np.concatenate([p[name] for p in parts]) for name, _ in COLUMNS}
+
+
+class TickStore:
+    """Усі сегменти каталогу в хронологічному порядку."""
+
+    def __init__(self, directory=TICK_STORE_DIR):
+        self.directory = directory
+
+    def segments(self):
+        return sorted(glob.glob(os.path.join(self.directory, 'ticks-*.bin')))
+
+    def iter_range(self, t_start=None, t_end=None):
+        """(reader, columns) для кожного блоку в діапазоні по всіх сегментах."""
+        for path in self.segments():
+            with TickReader(path) as reader:
+                for columns in reader.iter_range(t_start, t_end):
+                    yield reader, columns